@@ -64,20 +64,25 @@ def analyze_files(file_paths: List[str]) -> Dict[str, Any]:
         print(f"Text extraction warnings: {extraction_errors}")
     
     # --- Extract topics (use Mistral if available, else simple extraction) ---
+    # A fallback result (Mistral failed, or the placeholder topics below) is flagged as
+    # degraded so callers don't keep it in place of a real analysis
+    degraded = False
     if USE_MISTRAL_ANALYSIS and text_dict:
         try:
             topics = extract_topics_with_mistral(text_dict)
         except Exception as e:
             print(f"Mistral analysis failed, using simple extraction: {e}")
             topics = extract_topics(text_dict, structured_slides)
+            degraded = True
     else:
         topics = extract_topics(text_dict, structured_slides)
     
     # Store text_dict for RAG later
     # (we'll need it in session state for topic tutor)
     
-    # If no topics found, use fallback
+    # If no topics found, use fallback (extract_topics_with_mistral also returns [] on API errors)
     if not topics:
+        degraded = True
         topics = [
             {
                 "name": "Backpropagation & Gradient Descent",
@@ -181,4 +186,5 @@ def analyze_files(file_paths: List[str]) -> Dict[str, Any]:
         "text_dict": text_dict,  # Store for RAG
         "structured_slides": structured_slides,  # Store structured slide data for RAG
         "extraction_errors": extraction_errors,  # Store errors for display
+        "degraded": degraded,  # Fallback topics: worth retrying rather than caching
     }
@@ -1,4 +1,6 @@
 # app.py
+import logging
+
 import streamlit as st
 
 from screens.welcome import show_welcome
@@ -16,6 +18,10 @@ st.set_page_config(
     initial_sidebar_state="collapsed",
 )
 
+# --------- LOGGING ----------
+# Services log through logging.getLogger(__name__); no-op if already configured
+logging.basicConfig(level=logging.WARNING, format="%(asctime)s %(name)s %(levelname)s: %(message)s")
+
 # --------- SESSION STATE ----------
 if "page" not in st.session_state:
     st.session_state["page"] = "welcome"   # "welcome" | "analyzing" | "dashboard" | "concept_map" | "topic_tutor" | "edge_tutor"
@@ -1,25 +1,72 @@
 # components/chat.py
 import streamlit as st
-from typing import Dict
+import time
+from typing import Dict, List
 
 try:
-    from services.dashboard_chat_service import ask_about_rankings
+    from services.dashboard_chat_service import ask_about_rankings_stream, is_acknowledgement
+    from services.evaluation_service import RevisionInterrupted
     HAS_MISTRAL = True
 except Exception:
     HAS_MISTRAL = False
 
+from utils.chat_keys import register_chat_keys
 from utils.safe_render import safe_markdown
 
+# Streaming redraw cadence: every N chunks or every T seconds, whichever first
+_STREAM_FLUSH_EVERY = 16
+_STREAM_FLUSH_SECONDS = 0.05
+
 
 # Evaluation display functions removed - evaluator works invisibly
 
 
+def _stream_dashboard_answer(topics: List[Dict], request: Dict) -> str:
+    """
+    Stream the tutor's reply into a chat bubble as it is generated and return
+    the full text to store in the chat history.
+    """
+    result = st.session_state.get("analysis_result")
+    text_dict = result.get("text_dict") if result else None
+    structured_slides = result.get("structured_slides") if result else None
+    with st.chat_message("assistant"):
+        placeholder = st.empty()
+        # Collect chunks in a list and join on flush, redrawing only every few chunks
+        chunks: List[str] = []
+        last_flush = time.monotonic()
+        try:
+            for chunk in ask_about_rankings_stream(
+                topics,
+                request["question"],
+                text_dict,
+                structured_slides,
+                request["part"],
+                request["teaching_topic"],
+                request["history"],
+            ):
+                chunks.append(chunk)
+                now = time.monotonic()
+                if len(chunks) % _STREAM_FLUSH_EVERY == 0 or now - last_flush >= _STREAM_FLUSH_SECONDS:
+                    with placeholder.container():
+                        safe_markdown("".join(chunks), cache=False)
+                    last_flush = now
+        except RevisionInterrupted as e:
+            # A connection revision broke off partway: show the full draft instead
+            chunks = [e.draft]
+        answer = "".join(chunks)
+        with placeholder.container():
+            safe_markdown(answer)
+        return answer
+
+
 def show_dashboard_chat() -> None:
     """
     Chat panel for dashboard that explains topic rankings using Mistral.
     Shows chat history (can be inside columns).
     """
     chat_key = "dashboard_chat_messages"
+    pending_key = f"{chat_key}_pending_response"
+    register_chat_keys(chat_key, pending_key)
 
     # Get topics from analysis result
     result = st.session_state.get("analysis_result")
@@ -50,12 +97,31 @@ def show_dashboard_chat() -> None:
             safe_markdown(msg["content"])
             # Evaluator works invisibly - students only see perfected responses
 
+    # --------- PENDING ANSWER (queued by handle_dashboard_chat_input) ----------
+    # Streamed here so it appears under the history, inside the chat column
+    request = st.session_state.pop(pending_key, None)
+    if request is not None:
+        try:
+            answer = _stream_dashboard_answer(topics, request)
+        except Exception as e:
+            answer = (
+                "⚠️ **Error connecting to Mistral AI**\n\n"
+                f"Error: `{str(e)}`\n\n"
+                "Please check your API key and try again."
+            )
+        
+        # Add assistant reply (already perfected by evaluator)
+        st.session_state[chat_key].append({"role": "assistant", "content": answer})
+        st.rerun()
+
 
 def handle_dashboard_chat_input() -> None:
     """
     Handle chat input for dashboard (must be called outside columns).
     """
     chat_key = "dashboard_chat_messages"
+    pending_key = f"{chat_key}_pending_response"
+    register_chat_keys(chat_key, pending_key)
     
     # Get topics from analysis result
     result = st.session_state.get("analysis_result")
@@ -98,42 +164,34 @@ def handle_dashboard_chat_input() -> None:
         
         if is_teaching_question:
             # Extract topic name for tracking
-            from services.dashboard_chat_service import _extract_topic_names
-            topic_info = _extract_topic_names(user_input, topics)
+            from services.dashboard_chat_service import _build_topic_index, _extract_topic_names
+            topic_info = _extract_topic_names(question_lower, _build_topic_index(topics))
             if topic_info and topic_info[0]:
                 st.session_state[teaching_topic_key] = topic_info[0]
                 st.session_state[teaching_part_key] = 0
                 current_part = 0
-        elif is_continue and current_teaching_topic:
+        elif is_continue and current_teaching_topic and not is_acknowledgement(user_input):
             # Continue teaching
             st.session_state[teaching_part_key] = current_part + 1
             current_part = current_part + 1
         
-        # Get answer from Mistral if available
-        try:
-            if HAS_MISTRAL and topics:
-                with st.spinner("Thinking..."):
-                    result = st.session_state.get("analysis_result")
-                    text_dict = result.get("text_dict") if result else None
-                    structured_slides = result.get("structured_slides") if result else None
-                    # Pass chat history so teaching chain knows what was already taught
-                    chat_history = st.session_state[chat_key][:-1] if len(st.session_state[chat_key]) > 1 else []
-                    answer = ask_about_rankings(topics, user_input, text_dict, structured_slides, current_part if current_teaching_topic else None, current_teaching_topic, chat_history)
-            else:
-                answer = (
-                    "⚠️ **Mistral API not configured**\n\n"
-                    "To get intelligent explanations, please set your MISTRAL_API_KEY in a `.env` file.\n\n"
-                    f"For now, I'm acknowledging your question: {user_input}"
-                )
-        except Exception as e:
+        # Answer is streamed by show_dashboard_chat on the rerun; without Mistral reply right away
+        if HAS_MISTRAL and topics:
+            # Pass chat history so teaching chain knows what was already taught
+            chat_history = st.session_state[chat_key][:-1] if len(st.session_state[chat_key]) > 1 else []
+            st.session_state[pending_key] = {
+                "question": user_input,
+                "part": current_part if current_teaching_topic else None,
+                "teaching_topic": current_teaching_topic,
+                "history": chat_history,
+            }
+        else:
             answer = (
-                "⚠️ **Error connecting to Mistral AI**\n\n"
-                f"Error: `{str(e)}`\n\n"
-                "Please check your API key and try again."
+                "⚠️ **Mistral API not configured**\n\n"
+                "To get intelligent explanations, please set your MISTRAL_API_KEY in a `.env` file.\n\n"
+                f"For now, I'm acknowledging your question: {user_input}"
             )
-        
-        # Add assistant reply (already perfected by evaluator)
-        st.session_state[chat_key].append({"role": "assistant", "content": answer})
+            st.session_state[chat_key].append({"role": "assistant", "content": answer})
         
         # Rerun to display the new messages
         st.rerun()
@@ -1,16 +1,68 @@
 # components/edge_chat.py
 import streamlit as st
+import time
 from typing import List, Dict
 
 try:
-    from services.edge_tutor_service import explain_topic_connection
+    from services.edge_tutor_service import explain_topic_connection_stream, pop_suggested_correction
+    from services.evaluation_service import RevisionInterrupted
     from services.rag_service import retrieve_co_occurrence_snippets
     HAS_EDGE_SERVICE = True
 except Exception:
     HAS_EDGE_SERVICE = False
 
+from utils.chat_keys import register_chat_keys
 from utils.safe_render import safe_markdown
 
+# Streaming redraw cadence: every N chunks or every T seconds, whichever first
+_STREAM_FLUSH_EVERY = 16
+_STREAM_FLUSH_SECONDS = 0.05
+
+
+def _stream_edge_answer(
+    topic_a_label: str,
+    topic_b_label: str,
+    question: str,
+    context_snippets: List[str],
+    edge_signals: str,
+    turn: int,
+) -> str:
+    """
+    Stream the perfected connection explanation into a chat bubble as it arrives
+    and return the full text to store in the chat history.
+    """
+    with st.chat_message("assistant"):
+        placeholder = st.empty()
+        with st.spinner("Thinking..."):
+            stream = explain_topic_connection_stream(
+                topic_a_label,
+                topic_b_label,
+                question,
+                context_snippets,
+                edge_signals=edge_signals,
+                turn=turn,
+            )
+            # Nothing arrives until the draft has been checked
+            chunks: List[str] = [next(stream, "")]
+        with placeholder.container():
+            safe_markdown(chunks[0], cache=False)
+        last_flush = time.monotonic()
+        try:
+            for chunk in stream:
+                chunks.append(chunk)
+                now = time.monotonic()
+                if len(chunks) % _STREAM_FLUSH_EVERY == 0 or now - last_flush >= _STREAM_FLUSH_SECONDS:
+                    with placeholder.container():
+                        safe_markdown("".join(chunks), cache=False)
+                    last_flush = now
+        except RevisionInterrupted as e:
+            # The revision broke off partway: show the full draft, not half a revision
+            chunks = [e.draft]
+        answer = "".join(chunks).strip()
+        with placeholder.container():
+            safe_markdown(answer)
+        return answer
+
 
 def _display_edge_evaluation(evaluation: Dict):
     """Display edge evaluation scores in a clean, transparent format."""
@@ -78,6 +130,7 @@ def _display_edge_evaluation(evaluation: Dict):
 def show_edge_chat(topic_a_label: str, topic_b_label: str, topic_a_id: str, topic_b_id: str):
     """Chat for explaining topic connections."""
     chat_key = f"edge_chat_{topic_a_id}_{topic_b_id}"
+    register_chat_keys(chat_key)
     
     # Initial message
     if chat_key not in st.session_state:
@@ -94,6 +147,13 @@ def show_edge_chat(topic_a_label: str, topic_b_label: str, topic_a_id: str, topi
             }
         ]
     
+    # Answers shown before their review: swap in the revision if the review found issues
+    messages = st.session_state[chat_key]
+    if HAS_EDGE_SERVICE and len(messages) > 1 and messages[-1]["role"] == "assistant":
+        correction = pop_suggested_correction(messages[-1]["content"])
+        if correction:
+            messages[-1] = {"role": "assistant", "content": correction}
+    
     # Render history
     for idx, msg in enumerate(st.session_state[chat_key]):
         with st.chat_message(msg["role"]):
@@ -119,25 +179,27 @@ def show_edge_chat(topic_a_label: str, topic_b_label: str, topic_a_id: str, topi
         
         try:
             if HAS_EDGE_SERVICE:
-                with st.spinner("Thinking..."):
-                    # Get edge signals from analysis result if available
-                    edge_signals = "Topics appear together in slides (co-occurrence detected)"
-                    result = st.session_state.get("analysis_result")
-                    if result and result.get("topic_graph"):
-                        edges = result["topic_graph"].get("edges", [])
-                        # Check if this edge exists
-                        for edge in edges:
-                            if len(edge) == 2 and (edge[0] == topic_a_id and edge[1] == topic_b_id) or (edge[0] == topic_b_id and edge[1] == topic_a_id):
-                                edge_signals = "Topics co-occur on same slide or have hierarchical relationship"
-                                break
-                    
-                    answer = explain_topic_connection(
-                        topic_a_label,
-                        topic_b_label,
-                        user_input,
-                        context_snippets,
-                        edge_signals=edge_signals
-                    )
+                # Get edge signals from analysis result if available
+                edge_signals = "Topics appear together in slides (co-occurrence detected)"
+                result = st.session_state.get("analysis_result")
+                if result and result.get("topic_graph"):
+                    edges = result["topic_graph"].get("edges", [])
+                    # Check if this edge exists
+                    for edge in edges:
+                        if len(edge) == 2 and (edge[0] == topic_a_id and edge[1] == topic_b_id) or (edge[0] == topic_b_id and edge[1] == topic_a_id):
+                            edge_signals = "Topics co-occur on same slide or have hierarchical relationship"
+                            break
+                
+                # Earlier questions in this chat (follow-ups never reuse an earlier turn's answer)
+                turn = sum(1 for msg in st.session_state[chat_key][:-1] if msg["role"] == "user")
+                answer = _stream_edge_answer(
+                    topic_a_label,
+                    topic_b_label,
+                    user_input,
+                    context_snippets,
+                    edge_signals,
+                    turn,
+                )
             else:
                 answer = (
                     "⚠️ **Mistral API not configured**\n\n"
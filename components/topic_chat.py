@@ -1,10 +1,24 @@
 # components/topic_chat.py
 import streamlit as st
-from typing import Optional, List, Dict
+import itertools
+import time
+from typing import Iterator, Optional, List, Dict
 
-from services.mistral_service import ask_mistral_about_topic
+from services.mistral_service import (
+    cached_topic_answer,
+    perfect_topic_answer_stream,
+    pop_suggested_topic_correction,
+    review_topic_answer_in_background,
+    stream_mistral_about_topic,
+)
+from services.evaluation_service import RevisionInterrupted
 from services.rag_service import retrieve_relevant_snippets
-from utils.safe_render import safe_markdown
+from utils.chat_keys import register_chat_keys
+from utils.safe_render import markdown_to_html, safe_markdown
+
+# Streaming redraw cadence: every N chunks or every T seconds, whichever first
+_STREAM_FLUSH_EVERY = 16
+_STREAM_FLUSH_SECONDS = 0.05
 
 
 # Evaluation display function removed - evaluator works invisibly
@@ -128,6 +142,105 @@ def _display_evaluation_removed(evaluation: Dict):
     )
 
 
+def _stream_into(placeholder, stream: Iterator[str]) -> str:
+    """Render a stream of chunks into a placeholder as they arrive and return the full text."""
+    # Collect chunks in a list and join on flush (no quadratic str +=),
+    # and only redraw every few chunks to keep websocket traffic down
+    chunks: List[str] = []
+    last_flush = time.monotonic()
+    try:
+        for chunk in stream:
+            chunks.append(chunk)
+            now = time.monotonic()
+            if len(chunks) % _STREAM_FLUSH_EVERY == 0 or now - last_flush >= _STREAM_FLUSH_SECONDS:
+                with placeholder.container():
+                    safe_markdown("".join(chunks), cache=False)
+                last_flush = now
+    except RevisionInterrupted as e:
+        # The revision broke off partway: show the full draft, not half a revision
+        chunks = [e.draft]
+    text = "".join(chunks)
+    with placeholder.container():
+        safe_markdown(text)
+    return text
+
+
+def _stream_topic_answer(
+    topic_name: str,
+    importance_label: str,
+    question: str,
+    context_snippets: Optional[List[str]] = None,
+    use_answer_cache: bool = True,
+) -> str:
+    """
+    Stream the tutor's reply into a chat bubble as it is generated, then stream the
+    evaluator-perfected text over it and return that to store in the chat history.
+    A question already answered (or a close paraphrase) shows the stored answer at once,
+    and a draft that passes the quick gate stays as is while it is reviewed in the
+    background (a revision is swapped in on a later run).
+    Generated follow-up prompts (continue / re-explain) pass use_answer_cache=False:
+    their wording repeats every turn, but each turn needs a new answer.
+    """
+    with st.chat_message("assistant"):
+        placeholder = st.empty()
+        cached = (
+            cached_topic_answer(topic_name, importance_label, question, context_snippets)
+            if use_answer_cache else None
+        )
+        if cached is not None:
+            with placeholder.container():
+                safe_markdown(cached)
+            return cached
+        
+        answer = _stream_into(placeholder, stream_mistral_about_topic(
+            topic_name=topic_name,
+            importance_label=importance_label,
+            question=question,
+            context_snippets=context_snippets,
+        ))
+        
+        if review_topic_answer_in_background(
+            topic_name, importance_label, question, answer, context_snippets, use_answer_cache
+        ):
+            return answer.strip()
+        
+        # The draft stays on screen until the evaluator decides; a revision then replaces it
+        # token by token, an approved draft is redrawn unchanged
+        with st.spinner("Double-checking the answer..."):
+            perfected = perfect_topic_answer_stream(
+                topic_name, importance_label, question, answer, context_snippets, use_answer_cache
+            )
+            first = next(perfected, answer)
+        return _stream_into(placeholder, itertools.chain([first], perfected)).strip()
+
+
+def _render_history(chat_key: str) -> None:
+    """
+    Render a chat history. Each message's HTML is converted once and kept in
+    session state, so a rerun only converts the messages added since the last one.
+    """
+    messages = st.session_state[chat_key]
+    html_cache = st.session_state.setdefault("_chat_html", {})
+    rendered = html_cache.get(chat_key, [])
+    
+    # Keep the cached prefix that still matches the history (it can be replaced on restore)
+    valid = 0
+    for (content, _), msg in zip(rendered, messages):
+        if content != msg["content"]:
+            break
+        valid += 1
+    rendered = rendered[:valid]
+    rendered.extend(
+        (msg["content"], markdown_to_html(msg["content"])) for msg in messages[valid:]
+    )
+    html_cache[chat_key] = rendered
+    
+    for msg, (content, html_text) in zip(messages, rendered):
+        with st.chat_message(msg["role"]):
+            if content:
+                st.markdown(html_text, unsafe_allow_html=True)
+
+
 def _infer_importance_label(subtitle: Optional[str]) -> str:
     """
     Turn the subtitle text ('Exam-critical — ...', 'Core concept — ...', etc.)
@@ -152,11 +265,14 @@ def show_topic_chat(topic_name: str, importance_subtitle: Optional[str] = None)
     Chat panel for a specific topic.
 
     - Keeps your existing chat UI (st.chat_message etc.)
-    - Uses Mistral + LangChain (ask_mistral_about_topic) for answers.
+    - Uses Mistral + LangChain (stream_mistral_about_topic) for answers.
     """
 
     chat_key = f"topic_chat_{topic_name}"
     auto_explained_key = f"{chat_key}_auto_explained"
+    register_chat_keys(
+        chat_key, auto_explained_key, f"{chat_key}_part", f"{chat_key}_pending_response"
+    )
 
     # --------- AUTO-START EXPLANATION WHEN TOPIC IS SELECTED ----------
     if chat_key not in st.session_state:
@@ -196,13 +312,12 @@ def show_topic_chat(topic_name: str, importance_subtitle: Optional[str] = None)
                 "Don't explain everything at once - just give a brief overview first."
             )
             
-            with st.spinner("Preparing your personalized explanation..."):
-                answer = ask_mistral_about_topic(
-                    topic_name=topic_name,
-                    importance_label=importance_label,
-                    question=auto_question,
-                    context_snippets=context_snippets if context_snippets else None,
-                )
+            answer = _stream_topic_answer(
+                topic_name=topic_name,
+                importance_label=importance_label,
+                question=auto_question,
+                context_snippets=context_snippets if context_snippets else None,
+            )
             
             st.session_state[chat_key] = [
                 {"role": "assistant", "content": answer},
@@ -219,6 +334,8 @@ def show_topic_chat(topic_name: str, importance_subtitle: Optional[str] = None)
                 {"role": "assistant", "content": intro},
             ]
             st.session_state[auto_explained_key] = False
+        # The streamed bubble isn't part of the history render below
+        st.rerun()
 
     # --------- RENDER HISTORY ----------
     # Find the last assistant message index to show evaluation only there
@@ -228,11 +345,16 @@ def show_topic_chat(topic_name: str, importance_subtitle: Optional[str] = None)
             last_assistant_idx = idx
             break
     
-    for idx, msg in enumerate(st.session_state[chat_key]):
-        with st.chat_message(msg["role"]):
-            safe_markdown(msg["content"])
-            
-            # Evaluator works invisibly - students only see perfected responses
+    # Answers shown before their review: swap in the revision if the review found issues
+    messages = st.session_state[chat_key]
+    if messages and messages[-1]["role"] == "assistant":
+        correction = pop_suggested_topic_correction(messages[-1]["content"])
+        if correction:
+            messages[-1] = {"role": "assistant", "content": correction}
+            st.toast("Updated the last answer after a second check.")
+    
+    # Evaluator works invisibly - students only see perfected responses
+    _render_history(chat_key)
 
     # --------- CHECK FOR PENDING USER MESSAGES (from buttons) ----------
     # If last message is from user and no assistant reply yet, generate response
@@ -271,13 +393,12 @@ def show_topic_chat(topic_name: str, importance_subtitle: Optional[str] = None)
                 )
             
             try:
-                with st.spinner("Thinking..."):
-                    answer = ask_mistral_about_topic(
-                        topic_name=topic_name,
-                        importance_label=importance_label,
-                        question=user_question,
-                        context_snippets=context_snippets if context_snippets else None,
-                    )
+                answer = _stream_topic_answer(
+                    topic_name=topic_name,
+                    importance_label=importance_label,
+                    question=user_question,
+                    context_snippets=context_snippets if context_snippets else None,
+                )
             except Exception as e:
                 answer = (
                     "⚠️ **Error**\n\n"
@@ -365,14 +486,17 @@ def show_topic_chat(topic_name: str, importance_subtitle: Optional[str] = None)
                 else:
                     question = user_input
             
-            # Call Mistral through our helper (with RAG context)
-            with st.spinner("Thinking..."):
-                answer = ask_mistral_about_topic(
-                    topic_name=topic_name,
-                    importance_label=importance_label,
-                    question=question,
-                    context_snippets=context_snippets if context_snippets else None,
-                )
+            # Call Mistral through our helper (with RAG context), streaming the reply
+            with st.chat_message("user"):
+                safe_markdown(user_input)
+            answer = _stream_topic_answer(
+                topic_name=topic_name,
+                importance_label=importance_label,
+                question=question,
+                context_snippets=context_snippets if context_snippets else None,
+                # Only the student's own question is looked up in / added to the answer cache
+                use_answer_cache=question == user_input,
+            )
         except RuntimeError as e:
             # API key missing or configuration error
             answer = (
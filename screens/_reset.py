@@ -0,0 +1,282 @@
+# screens/_reset.py
+"""
+Shared helpers for the "New Upload" / reset flow used by several screens.
+"""
+import streamlit as st
+import os
+import pickle
+import shelve
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from utils.chat_keys import clear_chat_keys, get_chat_keys
+
+# Where previous-session snapshots are persisted
+_SESSIONS_DIR = ".sessions"
+# Recent snapshots also kept in memory (shared by the process)
+_HOT_SNAPSHOTS = 8
+# The store is shared by every browser session, and a session that just ends never
+# deletes its snapshots: they are dropped after this long (seconds), and only the
+# most recent ones are kept beyond the global cap
+_SNAPSHOT_MAX_AGE = 14 * 24 * 60 * 60
+_MAX_STORED_SNAPSHOTS = 200
+# Store key of the {store_key: saved_at} index, so pruning never unpickles a snapshot
+_STORE_INDEX_KEY = "_index"
+
+# Per-analysis keys (and caches derived from them) dropped on every reset
+_STATIC_CLEAR_SET = frozenset({
+    "analysis_result",
+    "saved_files",
+    "uploaded_files",
+    "analysis_start_time",
+    "selected_topic",
+    "selected_edge",
+    "_chat_html",
+})
+
+# Lays out the Confirm / Undo reset buttons side by side inside the
+# st.container(key="undo_row") (Streamlit exposes the key as .st-key-undo_row)
+_UNDO_ROW_CSS = """
+<style>
+    .st-key-undo_row {
+        flex-direction: row !important;
+        flex-wrap: wrap;
+        gap: 1rem;
+    }
+    .st-key-undo_row div.stButton {
+        display: inline-block;
+        width: auto !important;
+    }
+</style>
+"""
+
+
+@st.cache_data(show_spinner=False)
+def _make_session_name(saved_files: Tuple[str, ...]) -> str:
+    """Build a short display name for a saved session from its file names (memoized per file tuple)."""
+    if not saved_files:
+        return "Previous Session"
+
+    session_name = ", ".join(os.path.basename(f) for f in saved_files[:3])
+    file_count = len(saved_files)
+    if file_count > 3:
+        session_name = f"{session_name} +{file_count - 3} more"
+    return session_name
+
+
+def _perform_reset(clear_chats: bool = True):
+    """Helper to perform reset with optional chat clearing."""
+    # Preserve reset flags
+    reset_performed = st.session_state.get("_reset_performed", False)
+    reset_backup = st.session_state.get("_reset_backup")
+    
+    # Chat keys come from their index, so session state is never scanned
+    if clear_chats:
+        clear_chat_keys()
+    for key in _STATIC_CLEAR_SET:
+        st.session_state.pop(key, None)
+    
+    # Restore reset flags if they were set
+    if reset_performed:
+        st.session_state["_reset_performed"] = True
+    if reset_backup is not None:
+        st.session_state["_reset_backup"] = reset_backup
+    
+    # Go back to welcome page
+    st.session_state["page"] = "welcome"
+    st.rerun()
+
+
+def _prune_store(store: shelve.Shelf, scan_keys: bool = False) -> List[str]:
+    """
+    Delete expired snapshots and the oldest beyond _MAX_STORED_SNAPSHOTS; returns the
+    deleted keys. scan_keys also expires snapshots missing from the index (saved before
+    it existed). Callers hold the store lock.
+    """
+    index = store.get(_STORE_INDEX_KEY, {})
+    if scan_keys:
+        for key in store.keys():
+            if key != _STORE_INDEX_KEY:
+                index.setdefault(key, 0.0)
+    
+    cutoff = time.time() - _SNAPSHOT_MAX_AGE
+    newest = sorted(index.items(), key=lambda item: item[1], reverse=True)
+    keep = {key: saved_at for key, saved_at in newest[:_MAX_STORED_SNAPSHOTS] if saved_at >= cutoff}
+    dropped = [key for key in index if key not in keep]
+    for key in dropped:
+        store.pop(key, None)
+    if dropped or scan_keys:
+        store[_STORE_INDEX_KEY] = keep
+    return dropped
+
+
+@st.cache_resource(show_spinner=False)
+def _sessions_store() -> Tuple[shelve.Shelf, threading.Lock]:
+    """
+    Disk-backed store for previous-session snapshots, shared by the process
+    (pruned when opened and on every save, see _prune_store).
+    shelve/dbm is not thread-safe, so callers hold the returned lock.
+    """
+    os.makedirs(_SESSIONS_DIR, exist_ok=True)
+    store = shelve.open(os.path.join(_SESSIONS_DIR, "prev.db"), protocol=pickle.HIGHEST_PROTOCOL)
+    _prune_store(store, scan_keys=True)
+    return store, threading.Lock()
+
+
+@st.cache_resource(show_spinner=False)
+def _snapshot_cache() -> "OrderedDict[str, Dict[str, Any]]":
+    """In-process LRU of recently saved snapshots, in front of the disk store."""
+    return OrderedDict()
+
+
+def _referenced_upload_dirs() -> Set[str]:
+    """
+    Upload directories (uploads/<hash>) used by any stored snapshot, read from the
+    index keys ("<id>:<path>|<path>...") so no snapshot is unpickled.
+    """
+    store, lock = _sessions_store()
+    with lock:
+        store_keys = list(store.get(_STORE_INDEX_KEY, {}))
+    # A "|" in a file name splits a path, but the uploads/<hash> prefix stays intact
+    return {
+        os.path.dirname(path)
+        for store_key in store_keys
+        for path in store_key.partition(":")[2].split("|")
+        if path
+    }
+
+
+def _session_store_id() -> str:
+    """Per-browser-session id used to namespace snapshot keys in the store."""
+    if "_session_store_id" not in st.session_state:
+        st.session_state["_session_store_id"] = uuid.uuid4().hex
+    return st.session_state["_session_store_id"]
+
+
+def _session_fingerprint(saved_files: List[str]) -> Tuple[str, ...]:
+    """Order-independent identity of a session's uploaded files."""
+    return tuple(sorted(saved_files))
+
+
+def _get_session_fingerprints() -> Set[Tuple[str, ...]]:
+    """Fingerprints of everything in previous_sessions, kept alongside it."""
+    if "_session_fingerprints" not in st.session_state:
+        st.session_state["_session_fingerprints"] = {
+            session.get("fingerprint") or _session_fingerprint(session.get("saved_files", []))
+            for session in st.session_state.get("previous_sessions", [])
+        }
+    return st.session_state["_session_fingerprints"]
+
+
+def _save_current_session():
+    """Snapshot the current analysis and chats into previous_sessions (keeps last 5)."""
+    if "analysis_result" not in st.session_state:
+        return
+    
+    # Check if this session already exists (by comparing saved_files) before
+    # doing any snapshot work - repeat "New Upload" clicks stop here
+    saved_files = st.session_state.get("saved_files", [])
+    fingerprint = _session_fingerprint(saved_files)
+    fingerprints = _get_session_fingerprints()
+    if fingerprint in fingerprints:
+        return
+    
+    # Initialize previous_sessions if not exists
+    if "previous_sessions" not in st.session_state:
+        st.session_state["previous_sessions"] = []
+    previous_sessions = st.session_state["previous_sessions"]
+    
+    # Collect all chat data
+    chats = {
+        key: st.session_state[key]
+        for key in get_chat_keys()
+        if key in st.session_state
+    }
+    analysis_result = st.session_state.get("analysis_result")
+    
+    # Heavy payload goes to disk; previous_sessions only keeps metadata.
+    # Uploads are kept as their saved paths, not the UploadedFile objects
+    store_key = f"{_session_store_id()}:{'|'.join(fingerprint)}"
+    saved_at = time.time()
+    snapshot = {
+        "analysis_result": analysis_result,
+        "saved_files": saved_files,
+        "chats": chats,
+        "saved_at": saved_at,
+    }
+    store, lock = _sessions_store()
+    hot = _snapshot_cache()
+    with lock:
+        store[store_key] = snapshot
+        index = store.get(_STORE_INDEX_KEY, {})
+        index[store_key] = saved_at
+        store[_STORE_INDEX_KEY] = index
+        # Keep the live objects too, so restoring a recent session skips unpickling
+        hot[store_key] = snapshot
+        while len(hot) > _HOT_SNAPSHOTS:
+            hot.popitem(last=False)
+        for key in _prune_store(store):
+            hot.pop(key, None)
+    
+    session_meta = {
+        "name": _make_session_name(tuple(saved_files)),
+        "fingerprint": fingerprint,
+        "store_key": store_key,
+        "file_count": len(saved_files),
+        "topic_count": len(analysis_result.get("topics", [])) if analysis_result else 0,
+    }
+    
+    # Add to previous sessions (keep last 5)
+    previous_sessions.insert(0, session_meta)
+    fingerprints.add(fingerprint)
+    for dropped in previous_sessions[5:]:
+        _drop_session_snapshot(dropped)
+    del previous_sessions[5:]
+
+
+def _load_session_snapshot(session_meta: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Fetch the stored payload for a previous_sessions entry (None if it is gone)."""
+    store_key = session_meta.get("store_key", "")
+    store, lock = _sessions_store()
+    hot = _snapshot_cache()
+    with lock:
+        snapshot = hot.get(store_key)
+        if snapshot is None:
+            return store.get(store_key)
+    # Fresh chat lists so appending after a restore doesn't edit the cached snapshot
+    return {**snapshot, "chats": {key: list(value) for key, value in snapshot["chats"].items()}}
+
+
+def _drop_session_snapshot(session_meta: Dict[str, Any]):
+    """Forget a previous_sessions entry's fingerprint and delete its stored payload."""
+    _get_session_fingerprints().discard(session_meta.get("fingerprint"))
+    store_key = session_meta.get("store_key", "")
+    store, lock = _sessions_store()
+    hot = _snapshot_cache()
+    with lock:
+        store.pop(store_key, None)
+        hot.pop(store_key, None)
+        index = store.get(_STORE_INDEX_KEY, {})
+        if index.pop(store_key, None) is not None:
+            store[_STORE_INDEX_KEY] = index
+
+
+def _confirm_reset() -> None:
+    """on_click callback: keep the reset and drop the undo backup."""
+    st.session_state["_reset_performed"] = False
+    st.session_state.pop("_reset_backup", None)
+
+
+def _undo_reset(restore_page: bool = False) -> None:
+    """on_click callback: restore session state from the reset backup."""
+    backup = st.session_state.pop("_reset_backup", None)
+    if backup:
+        for key, value in backup.items():
+            st.session_state[key] = value
+    st.session_state["_reset_performed"] = False
+    if restore_page:
+        # Go back to the page they were on (or dashboard if we have analysis_result)
+        st.session_state["page"] = "dashboard" if "analysis_result" in st.session_state else "welcome"
@@ -1,6 +1,7 @@
 # screens/concept_map.py
 import streamlit as st
 import graphviz
+from screens._reset import _UNDO_ROW_CSS, _confirm_reset, _undo_reset
 
 
 def _wrap_text(text: str, max_line_length: int = 20) -> str:
@@ -34,42 +35,6 @@ def _wrap_text(text: str, max_line_length: int = 20) -> str:
     return "\n".join(lines)
 
 
-def _perform_reset(clear_chats: bool = True):
-    """Helper to perform reset with optional chat clearing."""
-    # Preserve reset flags
-    reset_performed = st.session_state.get("_reset_performed", False)
-    reset_backup = st.session_state.get("_reset_backup")
-    
-    keys_to_clear = [
-        "analysis_result",
-        "saved_files",
-        "uploaded_files",
-        "analysis_start_time",
-        "selected_topic",
-        "selected_edge",
-    ]
-    
-    if clear_chats:
-        # Clear chat histories
-        for key in list(st.session_state.keys()):
-            if key.startswith("topic_chat_") or key.startswith("edge_chat_") or key == "dashboard_chat_messages":
-                del st.session_state[key]
-    
-    for key in keys_to_clear:
-        if key in st.session_state:
-            del st.session_state[key]
-    
-    # Restore reset flags if they were set
-    if reset_performed:
-        st.session_state["_reset_performed"] = True
-    if reset_backup is not None:
-        st.session_state["_reset_backup"] = reset_backup
-    
-    # Go back to welcome page
-    st.session_state["page"] = "welcome"
-    st.rerun()
-
-
 def show_concept_map():
     # --------- CSS ----------
     st.markdown(
@@ -118,23 +83,10 @@ def show_concept_map():
     # Check if we need to show undo option
     if st.session_state.get("_reset_performed", False):
         st.warning("⚠️ Reset performed. You can undo this action.")
-        col1, col2 = st.columns(2)
-        with col1:
-            if st.button("✅ Confirm Reset", key="confirm_reset"):
-                st.session_state["_reset_performed"] = False
-                if "_reset_backup" in st.session_state:
-                    del st.session_state["_reset_backup"]
-                st.rerun()
-        with col2:
-            if st.button("↩️ Undo Reset", key="undo_reset"):
-                # Restore from backup
-                if "_reset_backup" in st.session_state:
-                    backup = st.session_state["_reset_backup"]
-                    for key, value in backup.items():
-                        st.session_state[key] = value
-                    del st.session_state["_reset_backup"]
-                st.session_state["_reset_performed"] = False
-                st.rerun()
+        st.markdown(_UNDO_ROW_CSS, unsafe_allow_html=True)
+        with st.container(key="undo_row"):
+            st.button("✅ Confirm Reset", key="confirm_reset", on_click=_confirm_reset)
+            st.button("↩️ Undo Reset", key="undo_reset", on_click=_undo_reset)
         return
     
     # --------- GET TOPICS FROM ANALYSIS RESULT ----------
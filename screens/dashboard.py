@@ -1,43 +1,30 @@
 # screens/dashboard.py
 import streamlit as st
-import os
-from components.chat import show_dashboard_chat, handle_dashboard_chat_input
+import streamlit.components.v1 as components
+from types import MappingProxyType
+from screens._reset import (
+    _perform_reset,
+    _save_current_session,
+    _UNDO_ROW_CSS,
+    _confirm_reset,
+    _undo_reset,
+)
 
-
-def _perform_reset(clear_chats: bool = True):
-    """Helper to perform reset with optional chat clearing."""
-    # Preserve reset flags
-    reset_performed = st.session_state.get("_reset_performed", False)
-    reset_backup = st.session_state.get("_reset_backup")
-    
-    keys_to_clear = [
-        "analysis_result",
-        "saved_files",
-        "uploaded_files",
-        "analysis_start_time",
-        "selected_topic",
-        "selected_edge",
-    ]
-    
-    if clear_chats:
-        # Clear chat histories
-        for key in list(st.session_state.keys()):
-            if key.startswith("topic_chat_") or key.startswith("edge_chat_") or key == "dashboard_chat_messages":
-                del st.session_state[key]
-    
-    for key in keys_to_clear:
-        if key in st.session_state:
-            del st.session_state[key]
-    
-    # Restore reset flags if they were set
-    if reset_performed:
-        st.session_state["_reset_performed"] = True
-    if reset_backup is not None:
-        st.session_state["_reset_backup"] = reset_backup
-    
-    # Go back to welcome page
-    st.session_state["page"] = "welcome"
-    st.rerun()
+# Importance level -> card dot colour and subtitle (read-only, shared across reruns)
+_IMPORTANCE_MAPPING = MappingProxyType({
+    "exam_critical": {
+        "importance_color": "dot-red",
+        "subtitle": "Exam-critical — deeper understanding required",
+    },
+    "core": {
+        "importance_color": "dot-yellow",
+        "subtitle": "Core concept — focus on intuition",
+    },
+    "extra": {
+        "importance_color": "dot-green",
+        "subtitle": "Extra — helpful but not essential",
+    },
+})
 
 
 def show_dashboard():
@@ -223,52 +210,45 @@ def show_dashboard():
     )
     
     # Check if we just came from concept map and scroll to top
-    if st.session_state.get("_from_concept_map", False):
-        st.markdown("""
-        <script>
-            window.scrollTo(0, 0);
-        </script>
-        """, unsafe_allow_html=True)
-        st.session_state["_from_concept_map"] = False
+    # (st.markdown strips <script>, so the JS goes through a zero-height component iframe)
+    if st.session_state.pop("_from_concept_map", False):
+        components.html(
+            """
+            <script>
+                const main = window.parent.document.querySelector('section.main');
+                if (main) { main.scrollTo(0, 0); }
+                window.parent.scrollTo(0, 0);
+            </script>
+            """,
+            height=0,
+        )
 
     # --------- GET TOPICS FROM ANALYSIS RESULT ----------
     result = st.session_state.get("analysis_result")
     
     # Map importance to color and subtitle
-    importance_mapping = {
-        "exam_critical": {
-            "color": "dot-red",
-            "subtitle": "Exam-critical — deeper understanding required",
-        },
-        "core": {
-            "color": "dot-yellow",
-            "subtitle": "Core concept — focus on intuition",
-        },
-        "extra": {
-            "color": "dot-green",
-            "subtitle": "Extra — helpful but not essential",
-        },
-    }
+    importance_mapping = _IMPORTANCE_MAPPING
     
     # Show extraction errors if any
-    if result and result.get("extraction_errors"):
-        st.warning("⚠️ Some files had extraction issues: " + "; ".join(result["extraction_errors"][:3]))
-        if len(result["extraction_errors"]) > 3:
-            st.caption(f"... and {len(result['extraction_errors']) - 3} more")
+    extraction_errors = result.get("extraction_errors") if result else None
+    if extraction_errors:
+        st.warning("⚠️ Some files had extraction issues: " + "; ".join(extraction_errors[:3]))
+        error_count = len(extraction_errors)
+        if error_count > 3:
+            st.caption(f"... and {error_count - 3} more")
     
     if result and result.get("topics"):
         # Use real analysis results
         raw_topics = result["topics"]
-        topics = []
-        for t in raw_topics:
-            importance = t.get("importance", "extra")
-            mapping = importance_mapping.get(importance, importance_mapping["extra"])
-            topics.append({
+        default_mapping = importance_mapping["extra"]
+        topics = [
+            {
                 "name": t.get("name", "Unknown topic"),
-                "importance_color": mapping["color"],
-                "subtitle": mapping["subtitle"],
-                "importance": importance,  # Keep for reference
-            })
+                **importance_mapping.get(t.get("importance", "extra"), default_mapping),
+                "importance": t.get("importance", "extra"),  # Keep for reference
+            }
+            for t in raw_topics
+        ]
     else:
         # Fallback to static topics if no analysis result
         topics = [
@@ -317,23 +297,10 @@ def show_dashboard():
     # Check if we need to show undo option
     if st.session_state.get("_reset_performed", False):
         st.warning("⚠️ Reset performed. You can undo this action.")
-        col1, col2 = st.columns(2)
-        with col1:
-            if st.button("✅ Confirm Reset", key="confirm_reset"):
-                st.session_state["_reset_performed"] = False
-                if "_reset_backup" in st.session_state:
-                    del st.session_state["_reset_backup"]
-                st.rerun()
-        with col2:
-            if st.button("↩️ Undo Reset", key="undo_reset"):
-                # Restore from backup
-                if "_reset_backup" in st.session_state:
-                    backup = st.session_state["_reset_backup"]
-                    for key, value in backup.items():
-                        st.session_state[key] = value
-                    del st.session_state["_reset_backup"]
-                st.session_state["_reset_performed"] = False
-                st.rerun()
+        st.markdown(_UNDO_ROW_CSS, unsafe_allow_html=True)
+        with st.container(key="undo_row"):
+            st.button("✅ Confirm Reset", key="confirm_reset", on_click=_confirm_reset)
+            st.button("↩️ Undo Reset", key="undo_reset", on_click=_undo_reset)
         return
     
     
@@ -389,53 +356,7 @@ def show_dashboard():
         
         if st.button("📄 Upload new slides here", key="reset_btn", use_container_width=True):
             # Save current session before resetting (only if it's a new session, not already saved)
-            if "analysis_result" in st.session_state:
-                # Collect all chat data
-                chats = {}
-                for key in list(st.session_state.keys()):
-                    if key.startswith("topic_chat_") or key.startswith("edge_chat_") or key == "dashboard_chat_messages":
-                        chats[key] = st.session_state[key]
-                
-                # Create session name from file names
-                saved_files = st.session_state.get("saved_files", [])
-                if saved_files:
-                    file_names = [os.path.basename(f) for f in saved_files[:3]]
-                    session_name = ", ".join(file_names)
-                    if len(saved_files) > 3:
-                        session_name += f" +{len(saved_files) - 3} more"
-                else:
-                    session_name = "Previous Session"
-                
-                # Initialize previous_sessions if not exists
-                if "previous_sessions" not in st.session_state:
-                    st.session_state["previous_sessions"] = []
-                
-                # Check if this session already exists (by comparing saved_files)
-                session_exists = False
-                current_saved_files = st.session_state.get("saved_files", [])
-                for existing_session in st.session_state["previous_sessions"]:
-                    existing_files = existing_session.get("saved_files", [])
-                    # Compare file lists
-                    if len(current_saved_files) == len(existing_files):
-                        if all(f1 == f2 for f1, f2 in zip(sorted(current_saved_files), sorted(existing_files))):
-                            session_exists = True
-                            break
-                
-                # Only save if it's a new session (not already in previous_sessions)
-                if not session_exists:
-                    # Save session
-                    session_data = {
-                        "name": session_name,
-                        "analysis_result": st.session_state.get("analysis_result"),
-                        "saved_files": st.session_state.get("saved_files", []),
-                        "uploaded_files": st.session_state.get("uploaded_files"),
-                        "chats": chats,
-                    }
-                    
-                    # Add to previous sessions (keep last 5)
-                    st.session_state["previous_sessions"].insert(0, session_data)
-                    if len(st.session_state["previous_sessions"]) > 5:
-                        st.session_state["previous_sessions"] = st.session_state["previous_sessions"][:5]
+            _save_current_session()
             
             # Reset and go to welcome page
             _perform_reset(clear_chats=True)
@@ -468,6 +389,8 @@ def show_dashboard():
         st.write("")  # spacer
         
         # ---- Chat component in right column ----
+        # Imported lazily so other pages don't pay for the chat/LLM imports
+        from components.chat import show_dashboard_chat, handle_dashboard_chat_input
         show_dashboard_chat()
     
     # Chat input must be outside columns
@@ -1,43 +1,12 @@
 # screens/edge_tutor.py
 import streamlit as st
-import os
-from components.edge_chat import show_edge_chat
-
-
-def _perform_reset(clear_chats: bool = True):
-    """Helper to perform reset with optional chat clearing."""
-    # Preserve reset flags
-    reset_performed = st.session_state.get("_reset_performed", False)
-    reset_backup = st.session_state.get("_reset_backup")
-    
-    keys_to_clear = [
-        "analysis_result",
-        "saved_files",
-        "uploaded_files",
-        "analysis_start_time",
-        "selected_topic",
-        "selected_edge",
-    ]
-    
-    if clear_chats:
-        # Clear chat histories
-        for key in list(st.session_state.keys()):
-            if key.startswith("topic_chat_") or key.startswith("edge_chat_") or key == "dashboard_chat_messages":
-                del st.session_state[key]
-    
-    for key in keys_to_clear:
-        if key in st.session_state:
-            del st.session_state[key]
-    
-    # Restore reset flags if they were set
-    if reset_performed:
-        st.session_state["_reset_performed"] = True
-    if reset_backup is not None:
-        st.session_state["_reset_backup"] = reset_backup
-    
-    # Go back to welcome page
-    st.session_state["page"] = "welcome"
-    st.rerun()
+from screens._reset import (
+    _perform_reset,
+    _save_current_session,
+    _UNDO_ROW_CSS,
+    _confirm_reset,
+    _undo_reset,
+)
 
 
 def show_edge_tutor():
@@ -54,23 +23,10 @@ def show_edge_tutor():
     # Check if we need to show undo option
     if st.session_state.get("_reset_performed", False):
         st.warning("⚠️ Reset performed. You can undo this action.")
-        col1, col2 = st.columns(2)
-        with col1:
-            if st.button("✅ Confirm Reset", key="confirm_reset"):
-                st.session_state["_reset_performed"] = False
-                if "_reset_backup" in st.session_state:
-                    del st.session_state["_reset_backup"]
-                st.rerun()
-        with col2:
-            if st.button("↩️ Undo Reset", key="undo_reset"):
-                # Restore from backup
-                if "_reset_backup" in st.session_state:
-                    backup = st.session_state["_reset_backup"]
-                    for key, value in backup.items():
-                        st.session_state[key] = value
-                    del st.session_state["_reset_backup"]
-                st.session_state["_reset_performed"] = False
-                st.rerun()
+        st.markdown(_UNDO_ROW_CSS, unsafe_allow_html=True)
+        with st.container(key="undo_row"):
+            st.button("✅ Confirm Reset", key="confirm_reset", on_click=_confirm_reset)
+            st.button("↩️ Undo Reset", key="undo_reset", on_click=_undo_reset)
         return
     
     topic_a = edge_info.get("topic_a", "Topic A")
@@ -143,7 +99,8 @@ def show_edge_tutor():
         
         st.write("")
         
-        # Edge chat
+        # Edge chat (imported lazily so other pages don't pay for the LLM imports)
+        from components.edge_chat import show_edge_chat
         show_edge_chat(topic_a_label, topic_b_label, topic_a, topic_b)
         
         st.write("")
@@ -157,50 +114,7 @@ def show_edge_tutor():
         with col2:
             if st.button("🔄 New Upload"):
                 # Save current session before resetting (only if it's a new session, not already saved)
-                if "analysis_result" in st.session_state:
-                    chats = {}
-                    for key in list(st.session_state.keys()):
-                        if key.startswith("topic_chat_") or key.startswith("edge_chat_") or key == "dashboard_chat_messages":
-                            chats[key] = st.session_state[key]
-                    
-                    saved_files = st.session_state.get("saved_files", [])
-                    if saved_files:
-                        file_names = [os.path.basename(f) for f in saved_files[:3]]
-                        session_name = ", ".join(file_names)
-                        if len(saved_files) > 3:
-                            session_name += f" +{len(saved_files) - 3} more"
-                    else:
-                        session_name = "Previous Session"
-                    
-                    # Initialize previous_sessions if not exists
-                    if "previous_sessions" not in st.session_state:
-                        st.session_state["previous_sessions"] = []
-                    
-                    # Check if this session already exists (by comparing saved_files)
-                    session_exists = False
-                    current_saved_files = st.session_state.get("saved_files", [])
-                    for existing_session in st.session_state["previous_sessions"]:
-                        existing_files = existing_session.get("saved_files", [])
-                        # Compare file lists
-                        if len(current_saved_files) == len(existing_files):
-                            if all(f1 == f2 for f1, f2 in zip(sorted(current_saved_files), sorted(existing_files))):
-                                session_exists = True
-                                break
-                    
-                    # Only save if it's a new session (not already in previous_sessions)
-                    if not session_exists:
-                        session_data = {
-                            "name": session_name,
-                            "analysis_result": st.session_state.get("analysis_result"),
-                            "saved_files": st.session_state.get("saved_files", []),
-                            "uploaded_files": st.session_state.get("uploaded_files"),
-                            "chats": chats,
-                        }
-                        
-                        # Add to previous sessions (keep last 5)
-                        st.session_state["previous_sessions"].insert(0, session_data)
-                        if len(st.session_state["previous_sessions"]) > 5:
-                            st.session_state["previous_sessions"] = st.session_state["previous_sessions"][:5]
+                _save_current_session()
                 
                 # Reset and go to welcome page
                 _perform_reset(clear_chats=True)
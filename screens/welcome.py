@@ -1,132 +1,293 @@
 # screens/welcome.py
 import streamlit as st
 import os
+import hashlib
+import shutil
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import repeat
+from typing import Tuple
+from utils.chat_keys import register_chat_keys
+from screens._reset import (
+    _UNDO_ROW_CSS,
+    _confirm_reset,
+    _undo_reset,
+    _load_session_snapshot,
+    _drop_session_snapshot,
+    _referenced_upload_dirs,
+)
+
+# Previous sessions rendered in the sidebar before "Show more"
+_VISIBLE_SESSIONS = 3
+
+# Analyses kept in memory, and for how long (seconds). Not persisted: Streamlit
+# ignores ttl on disk-persisted caches, so they would never expire
+_ANALYSIS_CACHE_TTL = 7 * 24 * 60 * 60
+_ANALYSIS_CACHE_ENTRIES = 32
+
+# Upload directories no stored session uses are deleted at startup once they are
+# this old (seconds); younger ones may belong to a session that is still open
+_UPLOAD_SWEEP_GRACE = 24 * 60 * 60
+
+# Max threads used to write uploaded files to disk
+_UPLOAD_WORKERS = 8
+_WRITE_CHUNK_BYTES = 1 << 20
+
+# Page styles (static, so built once at import rather than on every rerun)
+_WELCOME_CSS = """
+<style>
+    #MainMenu, header, footer {visibility: hidden;}
+
+    .main .block-container {
+        max-width: 1400px !important;
+        padding-top: 3rem !important;
+        padding-bottom: 2rem !important;
+        margin: 0 auto !important;
+    }
+    
+    /* Style session buttons like ChatGPT - tiny square rectangle, white with borders */
+    button[key^="restore_session_"] {
+        background: #ffffff !important;
+        border: 1px solid #e5e7eb !important;
+        border-radius: 4px !important;
+        padding: 8px 12px !important;
+        margin-bottom: 6px !important;
+        cursor: pointer !important;
+        transition: all 0.15s !important;
+        text-align: left !important;
+        box-shadow: none !important;
+        color: #1a0d2e !important;
+        font-weight: 400 !important;
+        font-size: 13px !important;
+        width: 100% !important;
+        height: auto !important;
+        line-height: 1.4 !important;
+        white-space: normal !important;
+    }
+    button[key^="restore_session_"]:hover {
+        background: #f9fafb !important;
+        border-color: #d1d5db !important;
+    }
+
+    .title-center {
+        text-align: center;
+        font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, sans-serif;
+        color: #1a0d2e;
+        letter-spacing: -1px;
+        font-size: 46px;
+        font-weight: 700;
+    }
+
+    .subtitle-center {
+        text-align: center;
+        font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, sans-serif;
+        color: #6b46c1;
+        font-size: 20px;
+    }
+
+    .body-center {
+        text-align: center;
+        font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, sans-serif;
+        color: #4b5563;
+        font-size: 15px;
+    }
+
+    .upload-message {
+        text-align: center;
+        font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, sans-serif;
+        color: #6b21a8;
+        font-size: 17px;
+        font-weight: 600;
+    }
+
+    /* Purple buttons - all buttons visible */
+    div.stButton > button {
+        background-color: #8b5cf6 !important;
+        color: white !important;
+        border-radius: 999px !important;
+        border: none !important;
+        font-weight: 500 !important;
+        padding: 10px 26px !important;
+        font-size: 15px !important;
+        visibility: visible !important;
+        display: block !important;
+    }
+
+    .start-btn button {
+        background-color: #8b5cf6 !important;
+        color: white !important;
+        border-radius: 10px !important;
+        border: none !important;
+        font-weight: 700 !important;
+        padding: 20px 40px !important;
+        font-size: 22px !important;
+        width: 100% !important;
+        height: auto !important;
+        visibility: visible !important;
+        display: block !important;
+    }
+</style>
+"""
+
+
+def _sweep_uploads(uploads_dir: str) -> None:
+    """Delete uploads/<hash> directories that are old and used by no stored session."""
+    referenced = _referenced_upload_dirs()
+    cutoff = time.time() - _UPLOAD_SWEEP_GRACE
+    with os.scandir(uploads_dir) as entries:
+        for entry in entries:
+            try:
+                if not entry.is_dir() or entry.path in referenced or entry.stat().st_mtime >= cutoff:
+                    continue
+            except OSError:
+                continue
+            shutil.rmtree(entry.path, ignore_errors=True)
+
+
+@st.cache_resource(show_spinner=False)
+def _uploads_dir() -> str:
+    """Create the uploads directory (and sweep unused uploads) once per process."""
+    os.makedirs("uploads", exist_ok=True)
+    _sweep_uploads("uploads")
+    return "uploads"
+
+
+@st.cache_resource(show_spinner=False)
+def _get_validator():
+    """Import the upload validator once per process."""
+    from utils.file_validation import validate_files
+    return validate_files
+
+
+def _save_uploaded_file(uploaded_file, uploads_dir: str) -> str:
+    """
+    Write one uploaded file into the uploads directory and return its path.
+    Files are stored under a content hash (uploads/<hash>/<name>), so re-uploading
+    the same bytes reuses the existing file instead of writing it again.
+    """
+    # getbuffer() is a zero-copy view of the upload's in-memory bytes
+    data = uploaded_file.getbuffer()
+    digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+    file_dir = os.path.join(uploads_dir, digest)
+    path = os.path.join(file_dir, uploaded_file.name)
+    if os.path.exists(path):
+        # Reused: mark the directory as recently used for _sweep_uploads
+        os.utime(file_dir)
+        return path
+    
+    os.makedirs(file_dir, exist_ok=True)
+    # Written to a temp file and renamed into place, so a concurrent or interrupted
+    # write never leaves a truncated file at the path later uploads reuse
+    fd, tmp_path = tempfile.mkstemp(dir=file_dir, prefix=".", suffix=".part")
+    try:
+        # Raw fd writes skip Python's buffered-IO layer (and its extra copy);
+        # os.write may write less than asked, so loop over 1 MiB slices
+        try:
+            view = memoryview(data)
+            offset = 0
+            while offset < len(view):
+                offset += os.write(fd, view[offset:offset + _WRITE_CHUNK_BYTES])
+        finally:
+            os.close(fd)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    return path
+
+
+class _UncachedAnalysis(Exception):
+    """Carries a degraded analysis out of _analyze_cached (exceptions are never cached)."""
+
+    def __init__(self, result):
+        super().__init__("Analysis used fallback topics")
+        self.result = result
+
+
+@st.cache_data(ttl=_ANALYSIS_CACHE_TTL, max_entries=_ANALYSIS_CACHE_ENTRIES, show_spinner=False)
+def _analyze_cached(saved_files: Tuple[str, ...]):
+    """
+    analyze_files() memoized per process. Paths are content-addressed, so the same
+    set of uploads is only analyzed once. A degraded result (fallback topics after
+    a Mistral failure) is raised as _UncachedAnalysis instead, so the next upload
+    of the same files gets a real analysis.
+    """
+    from analysis.pipeline import analyze_files
+    result = analyze_files(list(saved_files))
+    if result.get("degraded"):
+        raise _UncachedAnalysis(result)
+    return result
+
+
+def _analyze(saved_files: Tuple[str, ...]):
+    """Analysis for the uploads, from the cache when a real one is stored."""
+    try:
+        return _analyze_cached(saved_files)
+    except _UncachedAnalysis as e:
+        return e.result
+
+
+def _on_restore_session(idx: int):
+    """on_click callback: restore a previous session and open its dashboard."""
+    session = _load_session_snapshot(st.session_state["previous_sessions"][idx])
+    if session is None:
+        st.error("❌ This session is no longer available.")
+        return
+    st.session_state["analysis_result"] = session.get("analysis_result")
+    st.session_state["saved_files"] = session.get("saved_files", [])
+    # Snapshots keep the uploads as saved_files paths only
+    st.session_state.pop("uploaded_files", None)
+    
+    # Restore all chats
+    chats = session.get("chats", {})
+    for key, value in chats.items():
+        st.session_state[key] = value
+    register_chat_keys(*chats)
+    
+    st.session_state["page"] = "dashboard"
+
+
+def _on_delete_session(idx: int):
+    """on_click callback: drop a previous session from the sidebar."""
+    _drop_session_snapshot(st.session_state["previous_sessions"].pop(idx))
+
+
+def _on_show_all_sessions():
+    """on_click callback: render every previous session in the sidebar."""
+    st.session_state["_show_all_sessions"] = True
+
+
+def _on_start_analysis():
+    """on_click callback: run analysis and go directly to dashboard."""
+    st.session_state["analysis_start_time"] = None
+    saved_files = st.session_state.get("saved_files", [])
+    if saved_files:
+        try:
+            with st.spinner("🔄 Analyzing your slides..."):
+                result = _analyze(tuple(saved_files))
+                st.session_state["analysis_result"] = result
+        except Exception as e:
+            st.error(f"❌ Analysis failed: {str(e)}")
+            return
+    st.session_state["page"] = "dashboard"
+
 
 def show_welcome():
     # Check if we need to show undo option after reset
     if st.session_state.get("_reset_performed", False):
         st.warning("⚠️ Reset performed. You can undo this action if you didn't mean to upload new files.")
-        col1, col2 = st.columns(2)
-        with col1:
-            if st.button("✅ Confirm Reset", key="confirm_reset_welcome"):
-                st.session_state["_reset_performed"] = False
-                if "_reset_backup" in st.session_state:
-                    del st.session_state["_reset_backup"]
-                st.rerun()
-        with col2:
-            if st.button("↩️ Undo Reset", key="undo_reset_welcome"):
-                # Restore from backup
-                if "_reset_backup" in st.session_state:
-                    backup = st.session_state["_reset_backup"]
-                    for key, value in backup.items():
-                        st.session_state[key] = value
-                    del st.session_state["_reset_backup"]
-                st.session_state["_reset_performed"] = False
-                # Go back to the page they were on (or dashboard if we have analysis_result)
-                if "analysis_result" in st.session_state:
-                    st.session_state["page"] = "dashboard"
-                else:
-                    st.session_state["page"] = "welcome"
-                st.rerun()
+        st.markdown(_UNDO_ROW_CSS, unsafe_allow_html=True)
+        with st.container(key="undo_row"):
+            st.button("✅ Confirm Reset", key="confirm_reset_welcome", on_click=_confirm_reset)
+            st.button("↩️ Undo Reset", key="undo_reset_welcome", on_click=_undo_reset, args=(True,))
     
     # --------- CSS ----------
-    st.markdown(
-        """
-    <style>
-        #MainMenu, header, footer {visibility: hidden;}
-
-        .main .block-container {
-            max-width: 1400px !important;
-            padding-top: 3rem !important;
-            padding-bottom: 2rem !important;
-            margin: 0 auto !important;
-        }
-        
-        /* Style session buttons like ChatGPT - tiny square rectangle, white with borders */
-        button[key^="restore_session_"] {
-            background: #ffffff !important;
-            border: 1px solid #e5e7eb !important;
-            border-radius: 4px !important;
-            padding: 8px 12px !important;
-            margin-bottom: 6px !important;
-            cursor: pointer !important;
-            transition: all 0.15s !important;
-            text-align: left !important;
-            box-shadow: none !important;
-            color: #1a0d2e !important;
-            font-weight: 400 !important;
-            font-size: 13px !important;
-            width: 100% !important;
-            height: auto !important;
-            line-height: 1.4 !important;
-            white-space: normal !important;
-        }
-        button[key^="restore_session_"]:hover {
-            background: #f9fafb !important;
-            border-color: #d1d5db !important;
-        }
-
-        .title-center {
-            text-align: center;
-            font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, sans-serif;
-            color: #1a0d2e;
-            letter-spacing: -1px;
-            font-size: 46px;
-            font-weight: 700;
-        }
-
-        .subtitle-center {
-            text-align: center;
-            font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, sans-serif;
-            color: #6b46c1;
-            font-size: 20px;
-        }
-
-        .body-center {
-            text-align: center;
-            font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, sans-serif;
-            color: #4b5563;
-            font-size: 15px;
-        }
-
-        .upload-message {
-            text-align: center;
-            font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, sans-serif;
-            color: #6b21a8;
-            font-size: 17px;
-            font-weight: 600;
-        }
-
-        /* Purple buttons - all buttons visible */
-        div.stButton > button {
-            background-color: #8b5cf6 !important;
-            color: white !important;
-            border-radius: 999px !important;
-            border: none !important;
-            font-weight: 500 !important;
-            padding: 10px 26px !important;
-            font-size: 15px !important;
-            visibility: visible !important;
-            display: block !important;
-        }
-
-        .start-btn button {
-            background-color: #8b5cf6 !important;
-            color: white !important;
-            border-radius: 10px !important;
-            border: none !important;
-            font-weight: 700 !important;
-            padding: 20px 40px !important;
-            font-size: 22px !important;
-            width: 100% !important;
-            height: auto !important;
-            visibility: visible !important;
-            display: block !important;
-        }
-    </style>
-    """,
-        unsafe_allow_html=True,
-    )
+    st.markdown(_WELCOME_CSS, unsafe_allow_html=True)
 
     # Initialize previous sessions storage
     if "previous_sessions" not in st.session_state:
@@ -140,35 +301,49 @@ def show_welcome():
         st.markdown("### 📚 Previous Sessions")
         previous_sessions = st.session_state.get("previous_sessions", [])
         if previous_sessions:
-            for idx, session in enumerate(previous_sessions):
+            # Only the first few entries are rendered until the user asks for the rest;
+            # entries are metadata only, the payload is loaded on restore
+            if st.session_state.get("_show_all_sessions", False):
+                visible_sessions = previous_sessions
+            else:
+                visible_sessions = previous_sessions[:_VISIBLE_SESSIONS]
+            
+            for idx, session in enumerate(visible_sessions):
                 session_name = session.get("name", f"Session {idx + 1}")
-                file_count = len(session.get("saved_files", []))
-                analysis_result = session.get("analysis_result", {})
-                topic_count = len(analysis_result.get("topics", [])) if analysis_result else 0
+                file_count = session.get("file_count", 0)
+                topic_count = session.get("topic_count", 0)
                 
                 col_session, col_delete = st.columns([3, 1])
                 with col_session:
                     # Create button with session name (ChatGPT style - clean text)
                     button_text = f"{session_name}"
-                    if st.button(button_text, key=f"restore_session_{idx}", use_container_width=True):
-                        # Restore session
-                        st.session_state["analysis_result"] = session.get("analysis_result")
-                        st.session_state["saved_files"] = session.get("saved_files", [])
-                        st.session_state["uploaded_files"] = session.get("uploaded_files")
-                        
-                        # Restore all chats
-                        for key, value in session.get("chats", {}).items():
-                            st.session_state[key] = value
-                        
-                        st.session_state["page"] = "dashboard"
-                        st.rerun()
+                    st.button(
+                        button_text,
+                        key=f"restore_session_{idx}",
+                        help=f"{file_count} file(s), {topic_count} topic(s)",
+                        use_container_width=True,
+                        on_click=_on_restore_session,
+                        args=(idx,),
+                    )
                 
                 with col_delete:
-                    if st.button("🗑️", key=f"delete_session_{idx}", help="Delete session"):
-                        st.session_state["previous_sessions"].pop(idx)
-                        st.rerun()
+                    st.button(
+                        "🗑️",
+                        key=f"delete_session_{idx}",
+                        help="Delete session",
+                        on_click=_on_delete_session,
+                        args=(idx,),
+                    )
                 
                 st.write("")  # spacer between sessions
+            
+            hidden_count = len(previous_sessions) - len(visible_sessions)
+            if hidden_count:
+                st.button(
+                    f"Show {hidden_count} more",
+                    key="show_all_sessions",
+                    on_click=_on_show_all_sessions,
+                )
         else:
             st.info("No previous sessions. Upload files to create your first session!")
     
@@ -201,29 +376,22 @@ def show_welcome():
 
             if uploaded_files:
                 # Validate files before saving
-                from utils.file_validation import validate_files
-                
-                os.makedirs("uploads", exist_ok=True)
-                temp_saved_files = []
+                validate_files = _get_validator()
+                uploads_dir = _uploads_dir()
                 
-                # Save files temporarily for validation
-                for f in uploaded_files:
-                    path = os.path.join("uploads", f.name)
-                    with open(path, "wb") as buf:
-                        buf.write(f.getbuffer())
-                    temp_saved_files.append(path)
+                # Save files temporarily for validation (in parallel; disk I/O releases the GIL)
+                with ThreadPoolExecutor(max_workers=min(_UPLOAD_WORKERS, len(uploaded_files))) as pool:
+                    temp_saved_files = list(
+                        pool.map(_save_uploaded_file, uploaded_files, repeat(uploads_dir))
+                    )
                 
                 # Validate files
                 is_valid, valid_files, error_msg = validate_files(temp_saved_files)
                 
                 if not is_valid:
-                    # Remove invalid files
-                    for f in temp_saved_files:
-                        if f not in valid_files and os.path.exists(f):
-                            try:
-                                os.remove(f)
-                            except:
-                                pass
+                    # Rejected files are only left unreferenced, not deleted: upload paths are
+                    # content-addressed, so a saved session or another user may share them
+                    # (_sweep_uploads removes them once nothing uses them)
                     st.error(f"❌ {error_msg}")
                     st.info("💡 Please upload files smaller than 50 MB each, with total size under 200 MB.")
                 else:
@@ -240,19 +408,5 @@ def show_welcome():
                     
                     # Center the button
                     st.markdown("<div class='start-btn'>", unsafe_allow_html=True)
-                    if st.button("Start analysis", use_container_width=True):
-                        # Run analysis and go directly to dashboard
-                        st.session_state["analysis_start_time"] = None
-                        from analysis.pipeline import analyze_files
-                        saved_files = st.session_state.get("saved_files", [])
-                        if saved_files:
-                            try:
-                                with st.spinner("🔄 Analyzing your slides..."):
-                                    result = analyze_files(saved_files)
-                                    st.session_state["analysis_result"] = result
-                            except Exception as e:
-                                st.error(f"❌ Analysis failed: {str(e)}")
-                                st.rerun()
-                        st.session_state["page"] = "dashboard"
-                        st.rerun()
+                    st.button("Start analysis", use_container_width=True, on_click=_on_start_analysis)
                     st.markdown("</div>", unsafe_allow_html=True)
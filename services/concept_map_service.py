@@ -4,135 +4,552 @@ Use Mistral to intelligently determine parent-child relationships between topics
 """
 
 import os
-from typing import List, Dict, Any, Tuple, Optional
+import atexit
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import List, Dict, Any, FrozenSet, Iterable, Iterator, Tuple, Optional
 from dotenv import load_dotenv
 from langchain_mistralai import ChatMistralAI
+from langchain_core.messages import SystemMessage
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
+import httpx
 import json
-import re
+
+from services.rag_service import HAS_EMBEDDINGS, _get_embedding_model
+
+if HAS_EMBEDDINGS:
+    import numpy as np
+
+# Optional: budget the content context in real Mistral tokens rather than characters
+try:
+    from mistral_common.tokens.tokenizers.mistral import MistralTokenizer
+    HAS_TOKENIZER = True
+except ImportError:
+    HAS_TOKENIZER = False
+_tokenizer = None
 
 load_dotenv()
 
-_concept_map_chain = None
+logger = logging.getLogger(__name__)
+
+# Read once (after load_dotenv) instead of on every chain build
+_API_KEY = os.environ.get("MISTRAL_API_KEY")
+
+# Parent/child extraction from a short topic list is small enough for the fast model;
+# the strong one is only used when the fast answer is unusable
+_FAST_MODEL = "ministral-3b-latest"
+_STRONG_MODEL = "mistral-small-latest"
+_concept_map_chains: Dict[str, Any] = {}
+_chain_lock = threading.Lock()
+_http_clients: Optional[Tuple[httpx.Client, httpx.AsyncClient]] = None
+
+# Keep-alive pool shared by every Streamlit session, so cache misses skip DNS + TLS setup
+_MISTRAL_ENDPOINT = "https://api.mistral.ai/v1"
+_HTTP_LIMITS = httpx.Limits(max_keepalive_connections=20, max_connections=40, keepalive_expiry=60)
+_HTTP_TIMEOUT = 120
+# A full relationships object for a lecture's topics fits comfortably in this
+_MAX_RESPONSE_TOKENS = 512
+# Upper bound on the content context sent with each request (keeps within token limits)
+_MAX_CONTEXT_CHARS = 5000
+_MAX_CONTEXT_TOKENS = 1500
+
+# Bump when the prompt or the relationship parsing changes: the cache files below are
+# versioned, so graphs cached for the old prompt are no longer loaded
+_CACHE_VERSION = 2
+
+# Exact-match cache: hash(models + sorted topic names + content context) -> relationships,
+# an LRU of _RESPONSE_CACHE_MAX_ENTRIES requests.
+# Persisted to disk at exit so identical decks skip the LLM call across restarts.
+_CACHE_PATH = os.path.join(".cache", f"concept_map.v{_CACHE_VERSION}.json")
+_RESPONSE_CACHE_MAX_ENTRIES = 256
+_response_cache: "OrderedDict[str, List[Tuple[str, str]]]" = OrderedDict()
+_response_cache_lock = threading.Lock()
+
+
+def _load_response_cache():
+    """Load the persisted relationship cache (missing or corrupt file -> empty cache)."""
+    try:
+        with open(_CACHE_PATH, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return
+    # Saved least recently used first, so only the tail is kept
+    with _response_cache_lock:
+        for key, rels in list(data.items())[-_RESPONSE_CACHE_MAX_ENTRIES:]:
+            _response_cache[key] = [tuple(rel) for rel in rels]
+
+
+def _save_response_cache():
+    """Write the relationship cache to disk (registered with atexit)."""
+    with _response_cache_lock:
+        if not _response_cache:
+            return
+        data = dict(_response_cache)
+    try:
+        os.makedirs(os.path.dirname(_CACHE_PATH), exist_ok=True)
+        with open(_CACHE_PATH, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+    except OSError as e:
+        logger.warning("Could not persist concept map cache: %s", e)
+
+
+# Semantic cache: near-duplicate topic sets / lightly edited slides reuse a cached
+# graph. Rows of _semantic_matrix are unit-norm embeddings, parallel to _semantic_relationships.
+_SEMANTIC_CACHE_PATH = os.path.join(".cache", f"concept_map_semantic.v{_CACHE_VERSION}.npy")
+_SEMANTIC_RELS_PATH = os.path.join(".cache", f"concept_map_semantic.v{_CACHE_VERSION}.json")
+_SEMANTIC_THRESHOLD = 0.95
+_SEMANTIC_MAX_ENTRIES = 256
+_semantic_matrix = None
+_semantic_relationships: List[List[Tuple[str, str]]] = []
+
+
+def _load_semantic_cache():
+    """Load the persisted embedding matrix and its relationships (if both are present and agree)."""
+    global _semantic_matrix, _semantic_relationships
+    if not HAS_EMBEDDINGS:
+        return
+    try:
+        matrix = np.load(_SEMANTIC_CACHE_PATH)
+        with open(_SEMANTIC_RELS_PATH, "r", encoding="utf-8") as f:
+            rels = json.load(f)
+    except (OSError, ValueError):
+        return
+    if len(rels) != matrix.shape[0]:
+        return
+    with _response_cache_lock:
+        _semantic_matrix = matrix
+        _semantic_relationships = [[tuple(rel) for rel in entry] for entry in rels]
+
+
+def _save_semantic_cache():
+    """Write the embedding matrix and relationships to disk (registered with atexit)."""
+    with _response_cache_lock:
+        if _semantic_matrix is None:
+            return
+        matrix = _semantic_matrix
+        rels = list(_semantic_relationships)
+    try:
+        os.makedirs(os.path.dirname(_SEMANTIC_CACHE_PATH), exist_ok=True)
+        np.save(_SEMANTIC_CACHE_PATH, matrix)
+        with open(_SEMANTIC_RELS_PATH, "w", encoding="utf-8") as f:
+            json.dump(rels, f)
+    except OSError as e:
+        logger.warning("Could not persist concept map semantic cache: %s", e)
+
+
+def _embed_request(topics_list: str, content_context: str):
+    """Unit-norm embedding of one request (None if embeddings are unavailable)."""
+    model = _get_embedding_model()
+    if model is None:
+        return None
+    try:
+        return model.encode(topics_list + "\n" + content_context[:2000], normalize_embeddings=True)
+    except Exception:
+        logger.warning("Embedding the concept map request failed", exc_info=True)
+        return None
 
 
-def _build_concept_map_chain():
+def _semantic_lookup(query, topic_names: FrozenSet[str]) -> Optional[List[Tuple[str, str]]]:
+    """Relationships of the most similar cached request, if it clears the threshold."""
+    with _response_cache_lock:
+        matrix = _semantic_matrix
+        rels = _semantic_relationships
+    if query is None or matrix is None:
+        return None
+    scores = matrix @ query
+    best = int(scores.argmax())
+    if scores[best] < _SEMANTIC_THRESHOLD:
+        return None
+    # The topic set may differ slightly - only keep edges between topics we still have
+    return [
+        (parent, child) for parent, child in rels[best]
+        if parent in topic_names and child in topic_names
+    ]
+
+
+def _semantic_store(query, relationships: List[Tuple[str, str]]):
+    """Append one embedding/relationships pair, dropping the oldest beyond the cap."""
+    global _semantic_matrix, _semantic_relationships
+    if query is None:
+        return
+    with _response_cache_lock:
+        row = query.reshape(1, -1).astype(np.float32)
+        if _semantic_matrix is None:
+            _semantic_matrix = row
+        else:
+            _semantic_matrix = np.vstack([_semantic_matrix, row])[-_SEMANTIC_MAX_ENTRIES:]
+        _semantic_relationships = (_semantic_relationships + [relationships])[-_SEMANTIC_MAX_ENTRIES:]
+
+
+_load_response_cache()
+atexit.register(_save_response_cache)
+if HAS_EMBEDDINGS:
+    _load_semantic_cache()
+    atexit.register(_save_semantic_cache)
+
+
+def _cache_key(topic_names: Iterable[str], content_context: str) -> str:
+    """Stable key for one (topics, content) request to the current models."""
+    raw = f"{_FAST_MODEL}|{_STRONG_MODEL}|" + json.dumps(sorted(topic_names)) + "|" + content_context
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=16).hexdigest()
+
+
+# Identical bytes on every call so the provider can reuse the cached prompt prefix.
+# Do NOT interpolate anything run-specific here - topics and content go in the human turn.
+_CONCEPT_MAP_SYSTEM_PROMPT = (
+    "You are an expert at analyzing educational materials and understanding how topics relate to each other. "
+    "Your task is to determine parent-child relationships between topics based on the actual content.\n\n"
+    "**Key principles:**\n"
+    "- A topic is a parent of another topic if the second topic is a subtopic, component, or specific aspect of the first.\n"
+    "- For example: 'Machine Learning' is a parent of 'Neural Networks' because neural networks are a type of machine learning.\n"
+    "- 'Information Retrieval' might be a parent of 'Vector Search' if vector search is a method used in information retrieval.\n"
+    "- Analyze the ACTUAL CONTENT to determine relationships, not just co-occurrence.\n"
+    "- If topics are not clearly related as parent-child, don't force a relationship.\n"
+    "- Return a JSON object holding an array of relationships: "
+    "{\"relationships\": [{\"parent\": \"Topic A\", \"child\": \"Topic B\", \"reason\": \"brief reason\"}]}\n"
+    "- Only include relationships that make sense based on the content.\n"
+)
+
+# No runtime inputs, so parsed once at import; only the LLM waits for the API key
+_PROMPT = ChatPromptTemplate.from_messages(
+    [
+        # Passed as a message, not a template: the system turn is never formatted
+        SystemMessage(content=_CONCEPT_MAP_SYSTEM_PROMPT),
+        (
+            "human",
+            (
+                "Topics:\n{topics_list}\n\n"
+                "Content context:\n{content_context}\n\n"
+                "Analyze these topics and determine parent-child relationships based on the actual content. "
+                "Return ONLY the JSON object. If topics are not clearly related, don't include them.\n"
+                "Format: {{\"relationships\": [{{\"parent\": \"Topic Name\", \"child\": \"Topic Name\", \"reason\": \"why this is a parent-child relationship\"}}]}}"
+            ),
+        ),
+    ]
+)
+_PARSER = StrOutputParser()
+
+
+def _build_http_clients(api_key: str) -> Tuple[httpx.Client, httpx.AsyncClient]:
+    """Pooled sync/async clients for ChatMistralAI (closed at exit)."""
+    headers = {
+        "Content-Type": "application/json",
+        "Accept": "application/json",
+        "Authorization": f"Bearer {api_key}",
+    }
+    client = httpx.Client(
+        base_url=_MISTRAL_ENDPOINT, headers=headers, limits=_HTTP_LIMITS, timeout=_HTTP_TIMEOUT
+    )
+    async_client = httpx.AsyncClient(
+        base_url=_MISTRAL_ENDPOINT, headers=headers, limits=_HTTP_LIMITS, timeout=_HTTP_TIMEOUT
+    )
+    atexit.register(client.close)
+    return client, async_client
+
+
+def _build_concept_map_chain(model_name: str = _FAST_MODEL):
     """Build chain for intelligent topic relationship analysis."""
-    api_key = os.environ.get("MISTRAL_API_KEY")
-    if not api_key:
+    global _http_clients
+    if not _API_KEY:
         return None  # Return None if API key not available
 
+    # Both models share one connection pool (built under _chain_lock)
+    if _http_clients is None:
+        _http_clients = _build_http_clients(_API_KEY)
+    client, async_client = _http_clients
     llm = ChatMistralAI(
-        model="mistral-small-latest",
-        temperature=0.2,  # Low temperature for consistent analysis
+        model=model_name,
+        temperature=0.0,  # Deterministic: identical inputs give identical (cacheable) graphs
+        random_seed=42,
         max_retries=2,
-        api_key=api_key,
+        max_tokens=_MAX_RESPONSE_TOKENS,  # The JSON answer is short; don't pay for rambling
+        model_kwargs={"response_format": {"type": "json_object"}},
+        api_key=_API_KEY,
+        client=client,
+        async_client=async_client,
     )
+    return _PROMPT | llm | _PARSER
 
-    prompt = ChatPromptTemplate.from_messages(
-        [
-            (
-                "system",
-                (
-                    "You are an expert at analyzing educational materials and understanding how topics relate to each other. "
-                    "Your task is to determine parent-child relationships between topics based on the actual content.\n\n"
-                    "**Key principles:**\n"
-                    "- A topic is a parent of another topic if the second topic is a subtopic, component, or specific aspect of the first.\n"
-                    "- For example: 'Machine Learning' is a parent of 'Neural Networks' because neural networks are a type of machine learning.\n"
-                    "- 'Information Retrieval' might be a parent of 'Vector Search' if vector search is a method used in information retrieval.\n"
-                    "- Analyze the ACTUAL CONTENT to determine relationships, not just co-occurrence.\n"
-                    "- If topics are not clearly related as parent-child, don't force a relationship.\n"
-                    "- Return a JSON array of relationships: [{\"parent\": \"Topic A\", \"child\": \"Topic B\", \"reason\": \"brief reason\"}]\n"
-                    "- Only include relationships that make sense based on the content.\n"
-                ),
-            ),
-            (
-                "human",
-                (
-                    "Topics:\n{topics_list}\n\n"
-                    "Content context:\n{content_context}\n\n"
-                    "Analyze these topics and determine parent-child relationships based on the actual content. "
-                    "Return ONLY a JSON array of relationships. If topics are not clearly related, don't include them.\n"
-                    "Format: [{{\"parent\": \"Topic Name\", \"child\": \"Topic Name\", \"reason\": \"why this is a parent-child relationship\"}}]"
-                ),
-            ),
-        ]
-    )
 
-    parser = StrOutputParser()
-    return prompt | llm | parser
+def _get_concept_map_chain(model_name: str = _FAST_MODEL):
+    # Double-checked: concurrent first calls from Streamlit threads build one chain
+    # (and one httpx pool) instead of racing and leaking the losers' connections
+    if _concept_map_chains.get(model_name) is None:
+        with _chain_lock:
+            if _concept_map_chains.get(model_name) is None:
+                _concept_map_chains[model_name] = _build_concept_map_chain(model_name)
+    return _concept_map_chains[model_name]
 
 
-def _get_concept_map_chain():
-    global _concept_map_chain
-    if _concept_map_chain is None:
-        _concept_map_chain = _build_concept_map_chain()
-    return _concept_map_chain
+def _needs_strong_model(relationships: Optional[List[Tuple[str, str]]], topic_names: FrozenSet[str]) -> bool:
+    """Fast-model answer is unusable: no JSON array, or nothing valid despite 3+ topics."""
+    return relationships is None or (not relationships and len(topic_names) >= 3)
 
 
-def analyze_topic_relationships(
+class _ArrayObjectScanner:
+    """
+    Incremental parser for a streamed JSON array of objects: feed() text chunks as they
+    arrive and get back each array element as soon as its closing brace is seen.
+    Text before the first '[' (prose, code fences, the {"relationships": wrapper) is ignored.
+    """
+
+    def __init__(self):
+        self.saw_array = False
+        self._buf: List[str] = []
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+
+    def feed(self, chunk: str) -> List[Any]:
+        objects = []
+        for ch in chunk:
+            if not self.saw_array:
+                self.saw_array = ch == "["
+                continue
+            if self._depth == 0:
+                if ch == "{":
+                    self._depth = 1
+                    self._buf = [ch]
+                continue
+            self._buf.append(ch)
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch == "{":
+                self._depth += 1
+            elif ch == "}":
+                self._depth -= 1
+                if self._depth == 0:
+                    try:
+                        objects.append(json.loads("".join(self._buf)))
+                    except json.JSONDecodeError:
+                        pass  # Skip a malformed object, keep the rest
+                    self._buf = []
+        return objects
+
+
+def _get_tokenizer():
+    """Get or create the Mistral tokenizer (None if mistral-common is unavailable)."""
+    global _tokenizer
+    if HAS_TOKENIZER and _tokenizer is None:
+        try:
+            _tokenizer = MistralTokenizer.v3().instruct_tokenizer.tokenizer
+        except Exception:
+            return None
+    return _tokenizer
+
+
+def _fit_token_budget(text: str, max_tokens: int = _MAX_CONTEXT_TOKENS) -> str:
+    """Cut text to max_tokens tokens; the char cap alone is kept when no tokenizer is available."""
+    tokenizer = _get_tokenizer()
+    if tokenizer is None:
+        return text
+    tokens = tokenizer.encode(text, bos=False, eos=False)
+    if len(tokens) <= max_tokens:
+        return text
+    return tokenizer.decode(tokens[:max_tokens])
+
+
+def _build_request(
     topics: List[Dict[str, Any]],
     text_dict: Dict[str, str],
     structured_slides: Optional[Dict[str, List[Dict[str, Any]]]] = None
-) -> List[Tuple[str, str]]:
-    """
-    Use Mistral to intelligently determine parent-child relationships between topics.
-    Returns list of (parent, child) tuples.
-    """
-    chain = _get_concept_map_chain()
-    if chain is None:
-        return []  # Fallback if Mistral not available
-    
-    # Prepare topics list
-    topics_list = "\n".join([f"- {t.get('name', 'Unknown')}" for t in topics])
+) -> Tuple[str, str]:
+    """Prompt inputs (topics_list, content_context) for one analysis; empty context means skip."""
+    # Prepare topics list: deduped and sorted, so duplicates don't bloat the prompt and
+    # a reordered topic list yields the same request (and the same cache entry)
+    names = sorted({t.get("name", "Unknown") for t in topics})
+    topics_list = "\n".join(f"- {name}" for name in names)
     
     # Prepare content context (sample from slides/text)
     content_context = ""
     if structured_slides:
-        # Get sample slides for context
+        # Get sample slides for context, writing at most _MAX_CONTEXT_CHARS in total
         sample_slides = []
+        remaining = _MAX_CONTEXT_CHARS
         for file_path, slides in structured_slides.items():
             for slide in slides[:5]:  # Sample first 5 slides
                 title = slide.get("title", "")
                 body = slide.get("body", "")[:500]  # Limit length
-                sample_slides.append(f"Title: {title}\nBody: {body[:500]}...")
-        content_context = "\n\n".join(sample_slides[:10])  # Max 10 slides
+                piece = f"Title: {title}\nBody: {body}..."[:remaining]
+                sample_slides.append(piece)
+                remaining -= len(piece) + 2  # + the "\n\n" separator
+                if remaining <= 0 or len(sample_slides) == 10:  # Max 10 slides
+                    break
+            if remaining <= 0 or len(sample_slides) == 10:
+                break
+        content_context = "\n\n".join(sample_slides)
     elif text_dict:
-        # Use sample text
-        all_text = "\n\n".join(text_dict.values())
-        content_context = all_text[:3000]  # First 3000 chars
+        # Use sample text: first 3000 chars of the joined files, without joining them all
+        sample_text = []
+        length = -2  # Length of the join so far (no separator before the first file)
+        for text in text_dict.values():
+            piece = text[:3000]
+            sample_text.append(piece)
+            length += len(piece) + 2
+            if length >= 3000:
+                break
+        content_context = "\n\n".join(sample_text)[:3000]  # First 3000 chars
+    
+    # Chars are only a proxy: dense or non-Latin text can still overflow in tokens
+    return topics_list, _fit_token_budget(content_context)
+
+
+def _is_valid_relationship(rel: Any, topic_names: FrozenSet[str]) -> bool:
+    """A parsed {"parent", "child"} object whose topics both exist."""
+    return (
+        isinstance(rel, dict) and "parent" in rel and "child" in rel
+        and rel["parent"] in topic_names and rel["child"] in topic_names
+    )
+
+
+def _lexical_relationships(topic_names: FrozenSet[str]) -> List[Tuple[str, str]]:
+    """
+    Obvious parent/child pairs from the names alone: A is a parent of B when A's words
+    appear as a run inside B's ("Search" -> "Vector Search"). Each child keeps only its
+    most specific such parent, so chains don't also get their transitive shortcuts.
+    """
+    words = {name: tuple(name.lower().split()) for name in topic_names if name.strip()}
+    relationships = []
+    for child, child_words in words.items():
+        best_parent, best_len = None, 0
+        for parent, parent_words in words.items():
+            n = len(parent_words)
+            if n >= len(child_words) or n <= best_len:
+                continue
+            if any(child_words[i:i + n] == parent_words for i in range(len(child_words) - n + 1)):
+                best_parent, best_len = parent, n
+        if best_parent is not None:
+            relationships.append((best_parent, child))
+    return sorted(relationships)
+
+
+def _covers_all_topics(relationships: List[Tuple[str, str]], topic_names: FrozenSet[str]) -> bool:
+    """Every topic already sits in at least one relationship."""
+    connected = {name for pair in relationships for name in pair}
+    return connected >= topic_names
+
+
+def _merge_lexical(lexical: List[Tuple[str, str]], relationships: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
+    """Lexical pairs first, then model pairs that neither repeat nor reverse one of them."""
+    seen = set(lexical) | {(child, parent) for parent, child in lexical}
+    merged = list(lexical)
+    for pair in relationships:
+        if pair not in seen:
+            seen.add(pair)
+            merged.append(pair)
+    return merged
+
+
+def _lookup_cached(topics_list: str, content_context: str, topic_names: FrozenSet[str]):
+    """
+    Check the exact then the semantic cache.
+    Returns (relationships or None, cache_key, query embedding) - the last two feed _store_cached.
+    """
+    # Identical topics + content (e.g. Streamlit reruns, re-uploads) -> no LLM call
+    cache_key = _cache_key(topic_names, content_context)
+    with _response_cache_lock:
+        cached = _response_cache.get(cache_key)
+        if cached is not None:
+            _response_cache.move_to_end(cache_key)
+    if cached is not None:
+        return list(cached), cache_key, None
+    
+    # Near-duplicate request (one topic added/removed, small slide edits) -> reuse its graph
+    query = _embed_request(topics_list, content_context) if HAS_EMBEDDINGS else None
+    return _semantic_lookup(query, topic_names), cache_key, query
+
+
+def _store_cached(cache_key: str, query, relationships: List[Tuple[str, str]]):
+    """Remember a fresh result in both caches."""
+    with _response_cache_lock:
+        _response_cache[cache_key] = relationships
+        _response_cache.move_to_end(cache_key)
+        while len(_response_cache) > _RESPONSE_CACHE_MAX_ENTRIES:
+            _response_cache.popitem(last=False)
+    _semantic_store(query, relationships)
+
+
+def stream_topic_relationships(
+    topics: List[Dict[str, Any]],
+    text_dict: Dict[str, str],
+    structured_slides: Optional[Dict[str, List[Dict[str, Any]]]] = None
+) -> Iterator[Tuple[str, str]]:
+    """
+    Like analyze_topic_relationships, but yields each validated (parent, child) pair
+    as soon as Mistral finishes generating it, so a concept map can render progressively.
+    Pairs obvious from the topic names alone come first and may make the LLM call unnecessary.
+    """
+    chain = _get_concept_map_chain()
+    if chain is None:
+        return  # Fallback if Mistral not available
+    
+    # Built once; membership checks below are O(1)
+    topic_names = frozenset(t.get("name", "") for t in topics)
+    # A relationship needs two distinct topics - don't even assemble the content
+    if len(topic_names) < 2:
+        return
     
+    # Name-obvious pairs go out immediately; if they connect every topic, skip the LLM
+    lexical = _lexical_relationships(topic_names)
+    yield from lexical
+    if _covers_all_topics(lexical, topic_names):
+        return
+    seen = set(lexical) | {(child, parent) for parent, child in lexical}
+    
+    topics_list, content_context = _build_request(topics, text_dict, structured_slides)
     if not content_context:
-        return []
+        return
     
-    try:
-        response = chain.invoke({
-            "topics_list": topics_list,
-            "content_context": content_context[:5000],  # Limit to avoid token limits
-        })
+    cached, cache_key, query = _lookup_cached(topics_list, content_context, topic_names)
+    if cached is not None:
+        yield from _merge_lexical(lexical, cached)[len(lexical):]
+        return
+    
+    payload = {"topics_list": topics_list, "content_context": content_context}
+    for model_name in (_FAST_MODEL, _STRONG_MODEL):
+        chain = _get_concept_map_chain(model_name)
+        scanner = _ArrayObjectScanner()
+        relationships = []
+        try:
+            for chunk in chain.stream(payload):
+                for rel in scanner.feed(chunk):
+                    if _is_valid_relationship(rel, topic_names):
+                        pair = (rel["parent"], rel["child"])
+                        relationships.append(pair)  # Caches hold the model's answer only
+                        if pair not in seen:
+                            seen.add(pair)
+                            yield pair
+        except Exception:
+            logger.warning("Mistral concept map analysis failed (%s)", model_name, exc_info=True)
+            if relationships:
+                return  # Already yielded a partial graph; a retry would duplicate it
+            continue
         
-        # Extract JSON from response
-        json_match = re.search(r'\[.*\]', response, re.DOTALL)
-        if json_match:
-            relationships_json = json.loads(json_match.group())
-            
-            # Convert to list of tuples
-            relationships = []
-            for rel in relationships_json:
-                if isinstance(rel, dict) and "parent" in rel and "child" in rel:
-                    parent = rel["parent"]
-                    child = rel["child"]
-                    # Verify both topics exist
-                    topic_names = [t.get("name", "") for t in topics]
-                    if parent in topic_names and child in topic_names:
-                        relationships.append((parent, child))
-            
-            return relationships
-        else:
-            return []
-    except Exception as e:
-        print(f"Error in Mistral concept map analysis: {e}")
-        return []
+        result = relationships if scanner.saw_array else None
+        if not _needs_strong_model(result, topic_names) or model_name == _STRONG_MODEL:
+            # Only cache complete responses that actually contained a JSON array
+            if result is not None:
+                _store_cached(cache_key, query, result)
+            return
 
 
+def analyze_topic_relationships(
+    topics: List[Dict[str, Any]],
+    text_dict: Dict[str, str],
+    structured_slides: Optional[Dict[str, List[Dict[str, Any]]]] = None
+) -> List[Tuple[str, str]]:
+    """
+    Use Mistral to intelligently determine parent-child relationships between topics.
+    Returns list of (parent, child) tuples.
+    """
+    return list(stream_topic_relationships(topics, text_dict, structured_slides))
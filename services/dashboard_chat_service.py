@@ -1,21 +1,179 @@
 # services/dashboard_chat_service.py
 import os
-from typing import Dict, List, Tuple, Optional
+import re
+import json
+import hashlib
+import atexit
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterator, List, NamedTuple, Set, Tuple, Optional, Union
 
+import httpx
 from dotenv import load_dotenv
 from langchain_mistralai import ChatMistralAI
+from langchain_core.messages import SystemMessage
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 
 from services.evaluation_service import evaluate_and_revise_ranking_response
 from services.rag_service import retrieve_relevant_snippets, retrieve_co_occurrence_snippets
-from services.practice_questions_service import generate_practice_questions
-from services.edge_tutor_service import explain_topic_connection
+from services.practice_questions_service import generate_practice_questions, generate_practice_questions_batch
+from services.edge_tutor_service import explain_topic_connection, explain_topic_connection_stream
+from services.semantic_cache import SemanticCache
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 _dashboard_chain = None
 _teaching_chain = None
+_chain_lock = threading.Lock()
+_http_client: Optional[httpx.Client] = None
+
+# Keep-alive pool shared by both chains and every Streamlit session (skips DNS + TLS per call)
+_MISTRAL_ENDPOINT = "https://api.mistral.ai/v1"
+_HTTP_LIMITS = httpx.Limits(max_keepalive_connections=20, max_connections=40, keepalive_expiry=60)
+_HTTP_TIMEOUT = 120
+
+# Explaining the ranking mostly restates topic metadata, so a smaller, faster model does;
+# teaching and connection answers keep the stronger one
+_RANKING_MODEL = "ministral-8b-latest"
+_TEACHING_MODEL = "mistral-small-latest"
+
+# Re-asked (or reworded) questions about the same topic and materials skip the LLM
+_response_cache = SemanticCache(threshold=0.92)
+# Practice questions should come out fresh each time they're requested. Connection
+# answers are cached by the edge tutor, per conversation turn
+_UNCACHED_INTENTS = frozenset({"practice", "connection"})
+# How much of each recent message is scanned for topic mentions
+_RECENT_SCAN_CHARS = 400
+# Bare thanks/acknowledgements get a canned reply instead of an LLM round trip. Words that
+# move teaching on ("ok", "yes", "continue", "next", ...) are deliberately not in here.
+_ACKNOWLEDGEMENTS = frozenset({
+    "thanks", "thank you", "thanks a lot", "thank you so much", "thx", "ty",
+    "got it", "cool", "great", "nice", "awesome", "perfect",
+})
+# Teaching topic name used when no topic could be resolved from the question
+_GENERIC_TOPIC = "the topic you're asking about"
+# Formatted excerpts block per (upload, topic): follow-ups on a topic skip the RAG scoring
+_CONTEXT_CACHE_SIZE = 256
+_context_cache: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+_context_cache_lock = threading.Lock()
+
+
+# Persona shared by both chains, so every dashboard call starts with the same bytes.
+# Static text only - never interpolate into these; per-call data goes in the human turn.
+_PERSONA_PREFIX = (
+    "You are that one really smart friend in class - the one who can explain the whole lecture in a day while the professor took two months. "
+    "You're talking to your friend who needs help studying, and you're explaining things in a natural, friendly way.\n\n"
+    "**YOUR PERSONALITY:**\n"
+    "- You're super smart and know the material deeply, but you talk like a friend, not a textbook.\n"
+    "- You're friendly, warm, and encouraging - like you genuinely want to help your friend understand.\n"
+    "- You use natural, conversational language. No robotic or formal tone.\n"
+    "- You can answer any question they throw at you - teaching, connections, practice questions, whatever.\n"
+    "- You maintain context throughout the conversation - you remember what you talked about.\n\n"
+)
+
+_DASHBOARD_SYSTEM_PROMPT = _PERSONA_PREFIX + (
+    "**HOW YOU EXPLAIN RANKINGS:**\n"
+    "- When they ask why something is ranked a certain way, look at the ACTUAL CONTENT and explain it naturally.\n"
+    "- Be specific: 'This is exam-critical because [specific reason based on what the topic actually is].'\n"
+    "- Make them understand: 'Oh, I get why this is important' or 'Oh, I see why this is extra.'\n"
+    "- Base it on the concepts, how they're used, their role - show you really understand the material.\n\n"
+    "**RESPONSE STYLE:**\n"
+    "- Write like you're texting a friend - natural, friendly, helpful.\n"
+    "- Keep answers concise but complete. One good paragraph is usually enough.\n"
+    "- Be conversational - it's a back-and-forth, not a lecture.\n\n"
+    "**USING THE SLIDES:**\n"
+    "- Use the context from their slides to ground your answers in what they actually uploaded.\n"
+    "- You know the slides well, so reference specific things when relevant.\n"
+    "- Always be accurate - don't make things up.\n"
+)
+
+# Ranking answers check themselves against the evaluator's ranking rubric in the same
+# call. EVALUATE_RANKING_ANSWERS=1 restores the separate evaluate/revise pass instead.
+_EVALUATE_RANKING_ANSWERS = os.environ.get("EVALUATE_RANKING_ANSWERS", "").lower() in ("1", "true", "yes")
+
+_RANKING_SELF_CHECK = (
+    "\n**BEFORE YOU ANSWER:**\n"
+    "- Draft your answer, then silently check it: (a) it respects the ranking - exam-critical first, levels clearly told apart; "
+    "(b) the reasons are specific and grounded in the topic list; (c) the plan is reasonable and doesn't pile on pressure.\n"
+    "- Fix anything that fails the check. Reply with a JSON object holding only the final answer: "
+    "{\"final_answer\": \"...\"}\n"
+)
+
+_TEACHING_SYSTEM_PROMPT = _PERSONA_PREFIX + (
+    "**HOW YOU TEACH:**\n"
+    "- When they ask you to teach something, give them a clear, concise explanation that actually helps them understand.\n"
+    "- Don't give huge monologues - keep it concise but complete. Answer what they asked.\n"
+    "- If they ask a follow-up question, answer it naturally. You know what they're referring to.\n"
+    "- Use examples and analogies when helpful - that's how friends explain things.\n"
+    "- If they ask about connections between topics, explain how they relate naturally.\n"
+    "- If they ask for practice questions, give them good ones that test understanding.\n\n"
+    "**RESPONSE STYLE:**\n"
+    "- Write like you're texting a friend - natural, friendly, helpful.\n"
+    "- Keep answers concise but complete. One good paragraph is usually enough, unless they ask for more detail.\n"
+    "- Don't force them to say 'continue' - just answer their questions naturally.\n"
+    "- If they ask something new, switch topics naturally. You're having a conversation.\n\n"
+    "**USING THE SLIDES:**\n"
+    "- Use the context from their slides to ground your answers in what they actually uploaded.\n"
+    "- You know the slides well, so reference specific things when relevant.\n"
+    "- If something isn't in the slides but you know it's important, you can mention it (you're a smart friend, after all).\n"
+    "- Always be accurate - don't make things up.\n"
+)
+
+# Built once at import; SystemMessage keeps the persona out of template formatting
+_DASHBOARD_PROMPT = ChatPromptTemplate.from_messages(
+    [
+        SystemMessage(
+            content=_DASHBOARD_SYSTEM_PROMPT if _EVALUATE_RANKING_ANSWERS
+            else _DASHBOARD_SYSTEM_PROMPT + _RANKING_SELF_CHECK
+        ),
+        (
+            "human",
+            (
+                "Here are the topics ranked by importance:\n{topics_list}\n\n"
+                "Your friend asks: {question}\n\n"
+                "Answer them naturally, like a smart friend would. Be helpful, clear, and friendly."
+            ),
+        ),
+    ]
+)
+
+_TEACHING_PROMPT = ChatPromptTemplate.from_messages(
+    [
+        SystemMessage(content=_TEACHING_SYSTEM_PROMPT),
+        (
+            "human",
+            (
+                "Topic: {topic_name}\n"
+                "Importance: {importance_label}\n\n"
+                "{context}\n\n"
+                "Your friend asks: {question}\n\n"
+                "Answer them naturally, like a smart friend would. Be helpful, clear, and friendly."
+            ),
+        ),
+    ]
+)
+
+
+def _get_http_client(api_key: str) -> httpx.Client:
+    """Pooled client handed to every ChatMistralAI here (call with _chain_lock held)."""
+    global _http_client
+    if _http_client is None:
+        _http_client = httpx.Client(
+            base_url=_MISTRAL_ENDPOINT,
+            headers={
+                "Content-Type": "application/json",
+                "Accept": "application/json",
+                "Authorization": f"Bearer {api_key}",
+            },
+            limits=_HTTP_LIMITS,
+            timeout=_HTTP_TIMEOUT,
+        )
+        atexit.register(_http_client.close)
+    return _http_client
 
 
 def _build_dashboard_chain():
@@ -25,55 +183,43 @@ def _build_dashboard_chain():
         raise RuntimeError(
             "MISTRAL_API_KEY is not set. Please create a .env file with your API key."
         )
+    client = _get_http_client(api_key)
+
+    if _EVALUATE_RANKING_ANSWERS:
+        llm = ChatMistralAI(
+            model=_RANKING_MODEL,
+            temperature=0.7,  # Higher temperature for more natural, friend-like responses
+            cache=False,  # Varied answers: never served from the LLM cache
+            max_retries=2,
+            api_key=api_key,
+            client=client,
+        )
+        parser = StrOutputParser()
+        return _DASHBOARD_PROMPT | llm | parser
 
+    # Self-checked answer comes back as {"final_answer": ...}
     llm = ChatMistralAI(
-        model="mistral-small-latest",
+        model=_RANKING_MODEL,
         temperature=0.7,  # Higher temperature for more natural, friend-like responses
+        cache=False,  # Varied answers: never served from the LLM cache
         max_retries=2,
         api_key=api_key,
+        client=client,
+        model_kwargs={"response_format": {"type": "json_object"}},
     )
+    parser = StrOutputParser()
+    return _DASHBOARD_PROMPT | llm | parser | _extract_final_answer
 
-    prompt = ChatPromptTemplate.from_messages(
-        [
-                (
-                    "system",
-                    (
-                        "You are that one really smart friend in class - the one who can explain the whole lecture in a day while the professor took two months. "
-                        "You're talking to your friend who needs help studying, and you're explaining things in a natural, friendly way.\n\n"
-                        "**YOUR PERSONALITY:**\n"
-                        "- You're super smart and know the material deeply, but you talk like a friend, not a textbook.\n"
-                        "- You're friendly, warm, and encouraging - like you genuinely want to help your friend understand.\n"
-                        "- You use natural, conversational language. No robotic or formal tone.\n"
-                        "- You can answer any question they throw at you - teaching, connections, practice questions, whatever.\n"
-                        "- You maintain context throughout the conversation - you remember what you talked about.\n\n"
-                        "**HOW YOU EXPLAIN RANKINGS:**\n"
-                        "- When they ask why something is ranked a certain way, look at the ACTUAL CONTENT and explain it naturally.\n"
-                        "- Be specific: 'This is exam-critical because [specific reason based on what the topic actually is].'\n"
-                        "- Make them understand: 'Oh, I get why this is important' or 'Oh, I see why this is extra.'\n"
-                        "- Base it on the concepts, how they're used, their role - show you really understand the material.\n\n"
-                        "**RESPONSE STYLE:**\n"
-                        "- Write like you're texting a friend - natural, friendly, helpful.\n"
-                        "- Keep answers concise but complete. One good paragraph is usually enough.\n"
-                        "- Be conversational - it's a back-and-forth, not a lecture.\n\n"
-                        "**USING THE SLIDES:**\n"
-                        "- Use the context from their slides to ground your answers in what they actually uploaded.\n"
-                        "- You know the slides well, so reference specific things when relevant.\n"
-                        "- Always be accurate - don't make things up.\n"
-                    ),
-                ),
-            (
-                "human",
-                (
-                    "Here are the topics ranked by importance:\n{topics_list}\n\n"
-                    "Your friend asks: {question}\n\n"
-                    "Answer them naturally, like a smart friend would. Be helpful, clear, and friendly."
-                ),
-            ),
-        ]
-    )
 
-    parser = StrOutputParser()
-    return prompt | llm | parser
+def _extract_final_answer(response: str) -> str:
+    """The final_answer field of a self-checked reply (the raw text if it isn't that JSON)."""
+    try:
+        data = json.loads(response)
+    except json.JSONDecodeError:
+        return response
+    if isinstance(data, dict) and isinstance(data.get("final_answer"), str):
+        return data["final_answer"]
+    return response
 
 
 def _build_teaching_chain():
@@ -83,81 +229,100 @@ def _build_teaching_chain():
         raise RuntimeError("MISTRAL_API_KEY is not set.")
 
     llm = ChatMistralAI(
-        model="mistral-small-latest",
+        model=_TEACHING_MODEL,
         temperature=0.7,  # Higher temperature for more natural, friend-like responses
+        cache=False,  # Varied answers: never served from the LLM cache
         max_retries=2,
         api_key=api_key,
-    )
-
-    prompt = ChatPromptTemplate.from_messages(
-        [
-                (
-                    "system",
-                    (
-                        "You are that one really smart friend in class - the one who can explain the whole lecture in a day while the professor took two months. "
-                        "You're talking to your friend who needs help studying, and you're explaining things in a natural, friendly way.\n\n"
-                        "**YOUR PERSONALITY:**\n"
-                        "- You're super smart and know the material deeply, but you talk like a friend, not a textbook.\n"
-                        "- You're friendly, warm, and encouraging - like you genuinely want to help your friend understand.\n"
-                        "- You use natural, conversational language. No robotic or formal tone.\n"
-                        "- You can answer any question they throw at you - teaching, connections, practice questions, whatever.\n"
-                        "- You maintain context throughout the conversation - you remember what you talked about.\n\n"
-                        "**HOW YOU TEACH:**\n"
-                        "- When they ask you to teach something, give them a clear, concise explanation that actually helps them understand.\n"
-                        "- Don't give huge monologues - keep it concise but complete. Answer what they asked.\n"
-                        "- If they ask a follow-up question, answer it naturally. You know what they're referring to.\n"
-                        "- Use examples and analogies when helpful - that's how friends explain things.\n"
-                        "- If they ask about connections between topics, explain how they relate naturally.\n"
-                        "- If they ask for practice questions, give them good ones that test understanding.\n\n"
-                        "**RESPONSE STYLE:**\n"
-                        "- Write like you're texting a friend - natural, friendly, helpful.\n"
-                        "- Keep answers concise but complete. One good paragraph is usually enough, unless they ask for more detail.\n"
-                        "- Don't force them to say 'continue' - just answer their questions naturally.\n"
-                        "- If they ask something new, switch topics naturally. You're having a conversation.\n\n"
-                        "**USING THE SLIDES:**\n"
-                        "- Use the context from their slides to ground your answers in what they actually uploaded.\n"
-                        "- You know the slides well, so reference specific things when relevant.\n"
-                        "- If something isn't in the slides but you know it's important, you can mention it (you're a smart friend, after all).\n"
-                        "- Always be accurate - don't make things up.\n"
-                    ),
-                ),
-            (
-                "human",
-                (
-                    "Topic: {topic_name}\n"
-                    "Importance: {importance_label}\n\n"
-                    "{context}\n\n"
-                    "Your friend asks: {question}\n\n"
-                    "Answer them naturally, like a smart friend would. Be helpful, clear, and friendly."
-                ),
-            ),
-        ]
+        client=_get_http_client(api_key),
     )
 
     parser = StrOutputParser()
-    return prompt | llm | parser
+    return _TEACHING_PROMPT | llm | parser
 
 
 def _get_dashboard_chain():
+    # Double-checked: concurrent sessions build one chain instead of racing
     global _dashboard_chain
     if _dashboard_chain is None:
-        _dashboard_chain = _build_dashboard_chain()
+        with _chain_lock:
+            if _dashboard_chain is None:
+                _dashboard_chain = _build_dashboard_chain()
     return _dashboard_chain
 
 
 def _get_teaching_chain():
     global _teaching_chain
     if _teaching_chain is None:
-        _teaching_chain = _build_teaching_chain()
+        with _chain_lock:
+            if _teaching_chain is None:
+                _teaching_chain = _build_teaching_chain()
     return _teaching_chain
 
 
+def _warm_up_chains() -> None:
+    """Build both chains and open the pooled connection before the first question arrives."""
+    try:
+        _get_dashboard_chain()
+        _get_teaching_chain()
+        # Cheap authenticated request: completes DNS + TLS without generating any tokens
+        _http_client.get("/models")
+    except Exception:
+        logger.warning("Dashboard chat warm-up failed (chains will be built on first use)", exc_info=True)
+
+
+# Off the import path, so the app starts as fast as before. DISABLE_LLM_WARMUP=1 skips it.
+if os.environ.get("MISTRAL_API_KEY") and os.environ.get("DISABLE_LLM_WARMUP", "").lower() not in ("1", "true", "yes"):
+    threading.Thread(target=_warm_up_chains, name="dashboard-chat-warmup", daemon=True).start()
+
+
+# Intent keywords by category (a keyword may serve several categories)
+_INTENT_KEYWORDS = {
+    "followup": ("it", "this", "that", "they", "is it", "does it", "can it", "are they"),
+    "followup_topic": ("think-aloud", "think aloud", "protocol", "usability"),
+    "followup_connection": ("related", "connect", "link", "relationship"),
+    "followup_practice": ("practice", "question", "exercise"),
+    "continue": ("continue", "next", "more", "go on", "yes", "understood", "ok", "okay", "sure", "please"),
+    "practice": ("practice", "question", "exercise", "quiz", "test"),
+    "connection": ("connect", "relationship", "related", "link", "how are", "between", "is it related", "does it relate"),
+    "teaching": ("teach", "explain", "learn about", "what is", "tell me about", "help me understand", "what are"),
+    "ranking": ("why", "important", "ranked", "priority", "focus"),
+}
+_KEYWORD_CATEGORIES: Dict[str, Set[str]] = {}
+for _category, _keywords in _INTENT_KEYWORDS.items():
+    for _keyword in _keywords:
+        _KEYWORD_CATEGORIES.setdefault(_keyword, set()).add(_category)
+# Pronouns and short replies only count as whole words ("it" is not in "critical",
+# "ok" is not in "book"); the other keywords also match their inflections ("questions")
+_WHOLE_WORD_KEYWORDS = frozenset(_INTENT_KEYWORDS["followup"] + _INTENT_KEYWORDS["continue"])
+# One scan reports every keyword occurrence: the lookahead matches at each word start
+# (so overlaps like "is it" inside "this is it" are seen), longest keyword first
+_INTENT_RX = re.compile(
+    r"(?=\b("
+    + "|".join(
+        re.escape(k) + (r"\b" if k in _WHOLE_WORD_KEYWORDS else "")
+        for k in sorted(_KEYWORD_CATEGORIES, key=len, reverse=True)
+    )
+    + "))"
+)
+
+
+def _intent_hits(text_lower: str) -> Set[str]:
+    """Categories whose keywords occur in the (lowercased) text."""
+    return {
+        category
+        for match in _INTENT_RX.finditer(text_lower)
+        for category in _KEYWORD_CATEGORIES[match.group(1)]
+    }
+
+
 def _detect_intent(question: str, topics: List[Dict], is_teaching_context: bool = False, previous_messages: Optional[List[Dict]] = None) -> str:
     """Detect what the user is asking for: ranking, teaching, connection, or practice."""
     question_lower = question.lower().strip()
+    hits = _intent_hits(question_lower)
     
     # Check if this is a follow-up question (uses "it", "this", "that", "they", etc.)
-    is_followup = any(word in question_lower for word in ["it", "this", "that", "they", "is it", "does it", "can it", "are they"])
+    is_followup = "followup" in hits
     
     # If it's a follow-up and we have context, try to infer intent from context
     if is_followup and previous_messages:
@@ -166,11 +331,11 @@ def _detect_intent(question: str, topics: List[Dict], is_teaching_context: bool
             if msg.get("role") == "assistant":
                 last_content = msg.get("content", "").lower()
                 # If last message was about a topic, this is likely a follow-up about that topic
-                if any(word in last_content for word in ["think-aloud", "think aloud", "protocol", "usability"]):
+                if "followup_topic" in _intent_hits(last_content):
                     # Check what kind of follow-up
-                    if any(word in question_lower for word in ["related", "connect", "link", "relationship"]):
+                    if "followup_connection" in hits:
                         return "connection"
-                    elif any(word in question_lower for word in ["practice", "question", "exercise"]):
+                    elif "followup_practice" in hits:
                         return "practice"
                     else:
                         # General follow-up - treat as teaching/explanation continuation
@@ -178,23 +343,23 @@ def _detect_intent(question: str, topics: List[Dict], is_teaching_context: bool
                 break
     
     # If we're in teaching context and user says continue/next/more, stay in teaching
-    if is_teaching_context and any(word in question_lower for word in ["continue", "next", "more", "go on", "yes", "understood", "ok", "okay", "sure", "please"]):
+    if is_teaching_context and "continue" in hits:
         return "teaching"
     
     # Check for practice questions
-    if any(word in question_lower for word in ["practice", "question", "exercise", "quiz", "test"]):
+    if "practice" in hits:
         return "practice"
     
     # Check for connections (but handle follow-ups naturally)
-    if any(word in question_lower for word in ["connect", "relationship", "related", "link", "how are", "between", "is it related", "does it relate"]):
+    if "connection" in hits:
         return "connection"
     
     # Check for teaching (teach, explain, learn about, what is, tell me about)
-    if any(word in question_lower for word in ["teach", "explain", "learn about", "what is", "tell me about", "help me understand", "what are"]):
+    if "teaching" in hits:
         return "teaching"
     
-    # Check for ranking (why, important, ranked, priority)
-    if any(word in question_lower for word in ["why", "important", "ranked", "priority", "focus"]):
+    # Check for ranking (why, important, ranked, priority, focus)
+    if "ranking" in hits:
         return "ranking"
     
     # If in teaching context and unclear, assume teaching continuation
@@ -209,17 +374,47 @@ def _detect_intent(question: str, topics: List[Dict], is_teaching_context: bool
     return "ranking"
 
 
-def _extract_topic_names(question: str, topics: List[Dict]) -> Optional[Tuple[str, Optional[str]]]:
-    """Extract topic name(s) from question. Returns (topic_name, second_topic_name) for connections."""
-    question_lower = question.lower()
-    topic_names = [t.get("name", "").lower() for t in topics]
-    
-    # Find mentioned topics
-    found_topics = []
+class IndexedTopic(NamedTuple):
+    """A ranked topic's fields, read out of its dict once per request."""
+    name: str
+    name_lower: str
+    long_words: Tuple[str, ...]  # Lowercased words longer than 4 chars (partial matches)
+    importance: Optional[str]
+    score: float
+
+
+TopicIndex = List[IndexedTopic]
+
+
+def _build_topic_index(topics: List[Dict]) -> TopicIndex:
+    """Lowercase/split every topic name once per request instead of on every lookup."""
+    index = []
     for topic in topics:
-        topic_name = topic.get("name", "")
-        if topic_name.lower() in question_lower:
-            found_topics.append(topic_name)
+        name = topic.get("name", "")
+        name_lower = name.lower()
+        index.append(IndexedTopic(
+            name,
+            name_lower,
+            tuple(w for w in name_lower.split() if len(w) > 4),
+            topic.get("importance"),
+            topic.get("score", 0),
+        ))
+    return index
+
+
+def _importance_label(topic_name: str, topics_by_name: Dict[str, IndexedTopic]) -> str:
+    """E.g. "exam_critical topic" for a topic name (case-insensitive; "core" if unknown)."""
+    topic = topics_by_name.get(topic_name.lower())
+    return f"{(topic.importance if topic else None) or 'core'} topic"
+
+
+def _extract_topic_names(question_lower: str, topic_index: TopicIndex) -> Optional[Tuple[str, Optional[str]]]:
+    """
+    Extract topic name(s) from an already-lowercased question.
+    Returns (topic_name, second_topic_name) for connections.
+    """
+    # Find mentioned topics
+    found_topics = [t.name for t in topic_index if t.name_lower in question_lower]
     
     if len(found_topics) >= 2:
         return (found_topics[0], found_topics[1])
@@ -227,15 +422,176 @@ def _extract_topic_names(question: str, topics: List[Dict]) -> Optional[Tuple[st
         return (found_topics[0], None)
     
     # Try to find by partial match
-    for topic in topics:
-        topic_name = topic.get("name", "")
-        topic_words = topic_name.lower().split()
-        if any(word in question_lower for word in topic_words if len(word) > 4):
-            return (topic_name, None)
+    for t in topic_index:
+        if any(word in question_lower for word in t.long_words):
+            return (t.name, None)
     
     return None
 
 
+def _resolve_topic(question_lower: str, recent_text_lower: str, topic_index: TopicIndex) -> Optional[Tuple[str, Optional[str]]]:
+    """
+    Up to two topics for a question, in one pass over the topics. Ranked: topics the
+    question names (in the order it names them), else a partial word match in it, then
+    topics named in the recent conversation (latest mention first), else a partial match there.
+    """
+    in_question: List[Tuple[int, str]] = []
+    in_recent: List[Tuple[int, str]] = []
+    partial_question = partial_recent = None
+    for t in topic_index:
+        if not t.name_lower:
+            continue
+        pos = question_lower.find(t.name_lower)
+        if pos >= 0:
+            in_question.append((pos, t.name))
+            continue
+        pos = recent_text_lower.rfind(t.name_lower)
+        if pos >= 0:
+            in_recent.append((-pos, t.name))
+        if partial_question is None and any(word in question_lower for word in t.long_words):
+            partial_question = t.name
+        elif partial_recent is None and any(word in recent_text_lower for word in t.long_words):
+            partial_recent = t.name
+    
+    ranked = [name for _, name in sorted(in_question, key=lambda hit: hit[0])]
+    if not ranked and partial_question:
+        ranked.append(partial_question)
+    ranked.extend(name for _, name in sorted(in_recent, key=lambda hit: hit[0]) if name not in ranked)
+    if not ranked and partial_recent:
+        ranked.append(partial_recent)
+    if not ranked:
+        return None
+    return (ranked[0], ranked[1] if len(ranked) > 1 else None)
+
+
+def _format_conversation_context(recent_messages: List[Dict], note: str) -> str:
+    """The "Recent conversation" block given to the teaching chain ("" without history)."""
+    if not recent_messages:
+        return ""
+    lines = ["\n\n**Recent conversation:**\n"]
+    for msg in recent_messages:
+        role = msg.get("role", "")
+        content = msg.get("content", "")[:150]  # Truncate for context
+        if role == "user":
+            lines.append(f"Friend: {content}...\n")
+        elif role == "assistant":
+            lines.append(f"You: {content}...\n")
+    lines.append(f"\n({note})\n")
+    return "".join(lines)
+
+
+def _upload_key(text_dict: Dict[str, str], structured_slides: Optional[Dict]) -> str:
+    """Cheap identity of an upload: its file names and text lengths, and whether slides came with it."""
+    h = hashlib.blake2b(digest_size=16)
+    for path in sorted(text_dict):
+        h.update(f"{path}|{len(text_dict[path])}\n".encode("utf-8"))
+    h.update(b"slides" if structured_slides else b"")
+    return h.hexdigest()
+
+
+def _topic_context_text(topic_name: str, text_dict: Dict[str, str], structured_slides: Optional[Dict]) -> str:
+    """The "Relevant excerpts" block for a topic ("" if none), built once per upload and topic."""
+    key = (_upload_key(text_dict, structured_slides), topic_name.lower())
+    with _context_cache_lock:
+        context_text = _context_cache.get(key)
+        if context_text is not None:
+            _context_cache.move_to_end(key)
+            return context_text
+    
+    context_snippets = retrieve_relevant_snippets(
+        topic_name, text_dict, structured_slides=structured_slides or None, max_snippets=5
+    )
+    context_text = ""
+    if context_snippets:
+        context_text = "\n\nRelevant excerpts from your materials:\n" + "".join(
+            f"\n[{i}] {snippet[:300]}...\n" for i, snippet in enumerate(context_snippets[:3], 1)
+        )
+    with _context_cache_lock:
+        _context_cache[key] = context_text
+        while len(_context_cache) > _CONTEXT_CACHE_SIZE:
+            _context_cache.popitem(last=False)
+    return context_text
+
+
+def _run_teaching_chain(topic_name: str, importance_label: str, question: str, text_dict: Optional[Dict[str, str]], structured_slides: Optional[Dict], recent_messages: List[Dict], note: str, stream: bool) -> Union[str, Iterator[str]]:
+    """Answer through the teaching chain, with the topic's excerpts and the recent conversation as context."""
+    # Excerpts only for a real topic name (RAG on the generic placeholder finds nothing useful)
+    context_text = ""
+    if text_dict and topic_name and topic_name != _GENERIC_TOPIC:
+        context_text = _topic_context_text(topic_name, text_dict, structured_slides)
+    
+    # Conversation history, so the friend remembers what was discussed
+    conversation_context = _format_conversation_context(recent_messages, note)
+    
+    chain = _get_teaching_chain()
+    payload = {
+        "topic_name": topic_name,
+        "importance_label": importance_label,
+        "context": context_text + conversation_context,
+        "question": question,
+    }
+    return chain.stream(payload) if stream else chain.invoke(payload)
+
+
+def _practice_for_topics(selected_topics: List[IndexedTopic]) -> str:
+    """Practice questions for each topic (generated in parallel, reviewed in one call), one section per topic."""
+    requests = [(t.name, f"{t.importance or 'core'} topic") for t in selected_topics]
+    sections = generate_practice_questions_batch(requests)
+    return "\n\n".join(
+        f"### {topic_name}\n\n{questions}" for (topic_name, _), questions in zip(requests, sections)
+    )
+
+
+def _materials_key(topic_index: TopicIndex, text_dict: Optional[Dict[str, str]]) -> str:
+    """Identity of the current upload (ranked topics + files), so new uploads bust the cache."""
+    h = hashlib.blake2b(digest_size=16)
+    for topic in topic_index:
+        h.update(f"{topic.name}|{topic.importance or ''}\n".encode("utf-8"))
+    h.update(b"\0")
+    for path in sorted(text_dict or ()):
+        h.update(f"{path}\n".encode("utf-8"))
+    return h.hexdigest()
+
+
+def is_acknowledgement(question: str) -> bool:
+    """The message is only a thanks/acknowledgement (nothing to answer)."""
+    return question.lower().strip(" .!?") in _ACKNOWLEDGEMENTS
+
+
+def _acknowledgement_reply(teaching_topic: Optional[str]) -> str:
+    """Friendly nudge returned for bare acknowledgements, without calling the LLM."""
+    if teaching_topic:
+        return f"Glad that helped! Want me to dig deeper into {teaching_topic}, or move on to another topic?"
+    return "Happy to help! Ask me about any topic on the list, how topics connect, or for practice questions."
+
+
+def _plan_question(topics: List[Dict], question: str, part_tracking: Optional[int], teaching_topic: Optional[str], previous_messages: Optional[List[Dict]], text_dict: Optional[Dict[str, str]]) -> Tuple[str, TopicIndex, Optional[Tuple]]:
+    """Intent, topic index and response-cache namespace (None if the answer isn't cacheable)."""
+    # Detect intent - check if we're in teaching context
+    is_teaching_context = teaching_topic is not None and part_tracking is not None
+    intent = _detect_intent(question, topics, is_teaching_context, previous_messages)
+    topic_index = _build_topic_index(topics)
+    
+    # Only answers that stand on their own are cached, keyed by the topic(s) they are built
+    # from. Rankings only see the question. Teaching answers also get the recent chat as
+    # context, so they're only cached when there is none; continuations never are.
+    cacheable = not is_teaching_context and intent not in _UNCACHED_INTENTS
+    topic_info = None
+    if cacheable and intent == "teaching":
+        if previous_messages:
+            cacheable = False
+        elif teaching_topic:
+            topic_info = (teaching_topic, None)
+        else:
+            # Resolved the way _route_question does it, with no conversation to fall back on
+            topic_info = _resolve_topic(question.lower(), "", topic_index)
+            cacheable = topic_info is not None
+    elif cacheable:
+        topic_info = _resolve_topic(question.lower(), "", topic_index)
+    namespace = (intent, topic_info, _materials_key(topic_index, text_dict)) if cacheable else None
+    return intent, topic_index, namespace
+
+
 def ask_about_rankings(topics: List[Dict], question: str, text_dict: Optional[Dict[str, str]] = None, structured_slides: Optional[Dict] = None, part_tracking: Optional[int] = None, teaching_topic: Optional[str] = None, previous_messages: Optional[List[Dict]] = None) -> str:
     """
     Handle all dashboard chat capabilities:
@@ -247,78 +603,106 @@ def ask_about_rankings(topics: List[Dict], question: str, text_dict: Optional[Di
     Returns:
         Perfected response string
     """
-    # Detect intent - check if we're in teaching context
-    is_teaching_context = teaching_topic is not None and part_tracking is not None
-    intent = _detect_intent(question, topics, is_teaching_context, previous_messages)
+    if is_acknowledgement(question):
+        return _acknowledgement_reply(teaching_topic)
+    
+    intent, topic_index, namespace = _plan_question(topics, question, part_tracking, teaching_topic, previous_messages, text_dict)
+    if namespace is None:
+        return _route_question(topic_index, question, intent, text_dict, structured_slides, teaching_topic, previous_messages)
+    
+    cached = _response_cache.lookup(namespace, question)
+    if cached is not None:
+        return cached
+    answer = _route_question(topic_index, question, intent, text_dict, structured_slides, teaching_topic, previous_messages)
+    _response_cache.add(namespace, question, answer)
+    return answer
+
+
+def ask_about_rankings_stream(topics: List[Dict], question: str, text_dict: Optional[Dict[str, str]] = None, structured_slides: Optional[Dict] = None, part_tracking: Optional[int] = None, teaching_topic: Optional[str] = None, previous_messages: Optional[List[Dict]] = None) -> Iterator[str]:
+    """
+    Same as ask_about_rankings, but yields the answer as it is generated.
+    Teaching answers and connection revisions stream token by token; other branches
+    (practice, self-checked rankings) only have final text and yield it in one piece.
+    A connection revision that fails partway raises RevisionInterrupted (nothing is cached).
+    """
+    if is_acknowledgement(question):
+        yield _acknowledgement_reply(teaching_topic)
+        return
+    
+    intent, topic_index, namespace = _plan_question(topics, question, part_tracking, teaching_topic, previous_messages, text_dict)
+    if namespace is not None:
+        cached = _response_cache.lookup(namespace, question)
+        if cached is not None:
+            yield cached
+            return
+    
+    result = _route_question(topic_index, question, intent, text_dict, structured_slides, teaching_topic, previous_messages, stream=True)
+    if isinstance(result, str):
+        answer = result
+        yield answer
+    else:
+        chunks: List[str] = []
+        for chunk in result:
+            chunks.append(chunk)
+            yield chunk
+        answer = "".join(chunks)
     
-    # Format topics list
-    topics_text = []
-    topics_detailed = []
-    for i, topic in enumerate(topics, 1):
-        name = topic.get("name", "Unknown")
-        importance = topic.get("importance", "extra")
-        score = topic.get("score", 0)
-        topics_text.append(f"{i}. {name} ({importance})")
-        topics_detailed.append(f"{i}. {name} - {importance} (score: {score:.1f})")
+    # Only complete answers are cached (a consumer that stops early never gets here)
+    if namespace is not None:
+        _response_cache.add(namespace, question, answer)
+
+
+def _route_question(topic_index: TopicIndex, question: str, intent: str, text_dict: Optional[Dict[str, str]], structured_slides: Optional[Dict], teaching_topic: Optional[str], previous_messages: Optional[List[Dict]], stream: bool = False) -> Union[str, Iterator[str]]:
+    """
+    Answer a question through the handler for its detected intent.
+    With stream=True, teaching-chain and connection answers come back as an iterator of chunks.
+    """
+    question_lower = question.lower()
     
-    topics_list = "\n".join(topics_text)
-    topics_detailed_str = "\n".join(topics_detailed)
+    # Recent conversation, lowercased once for topic lookups (each message capped -
+    # only topic mentions are needed from it)
+    recent_messages = previous_messages[-4:] if previous_messages else []  # Last 4 messages (2 exchanges)
+    recent_lower = [msg.get("content", "")[:_RECENT_SCAN_CHARS].lower() for msg in recent_messages]
+    recent_text_lower = " ".join(recent_lower)
+    # Topic lookups by lowercased name (first topic wins, as a linear scan would)
+    topics_by_name = {t.name_lower: t for t in reversed(topic_index)}
     
     # Route to appropriate handler
     if intent == "practice":
-        # Generate practice questions
-        topic_info = _extract_topic_names(question, topics)
-        
-        # If no topic found in current question, check conversation context
-        if (not topic_info or not topic_info[0]) and previous_messages:
-            # Look for topics mentioned in recent conversation
-            recent_text = " ".join([msg.get("content", "") for msg in previous_messages[-4:]])
-            topic_info = _extract_topic_names(recent_text + " " + question, topics)
+        # Generate practice questions (topic from the question, else the recent conversation)
+        topic_info = _resolve_topic(question_lower, recent_text_lower, topic_index)
         
         if topic_info and topic_info[0]:
             topic_name = topic_info[0]
-            # Find topic importance
-            topic_obj = next((t for t in topics if t.get("name", "").lower() == topic_name.lower()), None)
-            importance = topic_obj.get("importance", "core") if topic_obj else "core"
-            importance_label = f"{importance} topic"
+            importance_label = _importance_label(topic_name, topics_by_name)
             
             questions = generate_practice_questions(topic_name, importance_label)
             return questions
         else:
-            # No specific topic mentioned - generate practice questions for the whole lecture
-            # Use the teaching chain to generate questions naturally
-            if previous_messages:
-                # Get recent topics discussed
-                recent_text = " ".join([msg.get("content", "") for msg in previous_messages[-4:]])
-                topic_info = _extract_topic_names(recent_text, topics)
-                if topic_info and topic_info[0]:
-                    topic_name = topic_info[0]
-                    topic_obj = next((t for t in topics if t.get("name", "").lower() == topic_name.lower()), None)
-                    importance = topic_obj.get("importance", "core") if topic_obj else "core"
-                    importance_label = f"{importance} topic"
-                    questions = generate_practice_questions(topic_name, importance_label)
-                    return questions
-            
+            # No topic in the question or the recent conversation - generate practice
+            # questions for the whole lecture
             # Generate practice questions for exam-critical topics or all topics
             # Pick the most important topics
-            exam_critical_topics = [t for t in topics if t.get("importance") == "exam_critical"]
-            core_topics = [t for t in topics if t.get("importance") == "core"]
+            exam_critical_topics = [t for t in topic_index if t.importance == "exam_critical"]
+            core_topics = [t for t in topic_index if t.importance == "core"]
             
             # Use exam-critical topics if available, otherwise core topics
             selected_topics = exam_critical_topics[:3] if exam_critical_topics else core_topics[:3]
             
-            if selected_topics:
+            if len(exam_critical_topics) >= 2:
+                # Several exam-critical topics: generate their questions concurrently
+                # (network-bound calls, so wall-clock is about the slowest one)
+                return _practice_for_topics(selected_topics)
+            elif selected_topics:
                 # Generate questions for the first important topic
-                topic_name = selected_topics[0].get("name", "")
-                importance = selected_topics[0].get("importance", "core")
-                importance_label = f"{importance} topic"
+                topic_name = selected_topics[0].name
+                importance_label = f"{selected_topics[0].importance or 'core'} topic"
                 questions = generate_practice_questions(topic_name, importance_label)
                 return questions
-            elif topics:
+            elif topic_index:
                 # Fallback to first topic
-                topic_name = topics[0].get("name", "")
-                importance = topics[0].get("importance", "core")
-                importance_label = f"{importance} topic"
+                topic_name = topic_index[0].name
+                importance_label = f"{topic_index[0].importance or 'core'} topic"
                 questions = generate_practice_questions(topic_name, importance_label)
                 return questions
             else:
@@ -326,14 +710,7 @@ def ask_about_rankings(topics: List[Dict], question: str, text_dict: Optional[Di
     
     elif intent == "connection":
         # Explain connections - handle both explicit and implicit (follow-up) questions
-        topic_info = _extract_topic_names(question, topics)
-        
-        # If topics not explicitly mentioned, try to infer from conversation context
-        if (not topic_info or not topic_info[0] or not topic_info[1]) and previous_messages:
-            # Look for topics mentioned in recent conversation
-            recent_text = " ".join([msg.get("content", "") for msg in previous_messages[-4:]])
-            # Try to extract topics from recent conversation
-            topic_info = _extract_topic_names(recent_text + " " + question, topics)
+        topic_info = _resolve_topic(question_lower, recent_text_lower, topic_index)
         
         if topic_info and topic_info[0] and topic_info[1]:
             topic_a = topic_info[0]
@@ -341,68 +718,39 @@ def ask_about_rankings(topics: List[Dict], question: str, text_dict: Optional[Di
             
             # Get context snippets
             context_snippets = []
-            if text_dict and structured_slides:
+            # (only the text is searched, so slides aren't needed)
+            if text_dict:
                 context_snippets = retrieve_co_occurrence_snippets(
-                    topic_a, topic_b, text_dict, structured_slides, max_snippets=5
+                    topic_a, topic_b, text_dict, max_snippets=5
                 )
             
             # Pass the original question and conversation context for natural response
-            answer = explain_topic_connection(topic_a, topic_b, question, context_snippets)
+            # (the turn keeps follow-ups from reusing an earlier answer)
+            turn = len(previous_messages or [])
+            if stream:
+                return explain_topic_connection_stream(topic_a, topic_b, question, context_snippets, turn=turn)
+            answer = explain_topic_connection(topic_a, topic_b, question, context_snippets, turn=turn)
             return answer
         else:
             # If we still can't find topics, answer naturally as a friend would
             # Use the teaching chain to answer the question naturally
             if previous_messages:
                 # Get the last topic mentioned
-                recent_text = " ".join([msg.get("content", "") for msg in previous_messages[-2:]])
-                topic_info = _extract_topic_names(recent_text, topics)
+                topic_info = _extract_topic_names(" ".join(recent_lower[-2:]), topic_index)
                 if topic_info and topic_info[0]:
                     # Answer about the connection naturally
                     topic_name = topic_info[0]
                     # Use teaching chain to answer naturally
-                    topic_obj = next((t for t in topics if t.get("name", "").lower() == topic_name.lower()), None)
-                    importance = topic_obj.get("importance", "core") if topic_obj else "core"
-                    importance_label = f"{importance} topic"
-                    
-                    context_snippets = []
-                    context_text = ""
-                    if text_dict:
-                        if structured_slides:
-                            context_snippets = retrieve_relevant_snippets(
-                                topic_name, text_dict, structured_slides=structured_slides, max_snippets=5
-                            )
-                        else:
-                            context_snippets = retrieve_relevant_snippets(
-                                topic_name, text_dict, max_snippets=5
-                            )
-                        
-                        if context_snippets:
-                            context_text = "\n\nRelevant excerpts from your materials:\n"
-                            for i, snippet in enumerate(context_snippets[:3], 1):
-                                context_text += f"\n[{i}] {snippet[:300]}...\n"
-                    
-                    # Add conversation context
-                    conversation_context = ""
-                    if previous_messages:
-                        recent_messages = previous_messages[-4:]
-                        conversation_context = "\n\n**Recent conversation:**\n"
-                        for msg in recent_messages:
-                            role = msg.get("role", "")
-                            content = msg.get("content", "")[:150]
-                            if role == "user":
-                                conversation_context += f"Friend: {content}...\n"
-                            elif role == "assistant":
-                                conversation_context += f"You: {content}...\n"
-                        conversation_context += "\n(Use this context to answer naturally.)\n"
-                    
-                    chain = _get_teaching_chain()
-                    answer = chain.invoke({
-                        "topic_name": topic_name,
-                        "importance_label": importance_label,
-                        "context": context_text + conversation_context,
-                        "question": question,
-                    })
-                    return answer
+                    return _run_teaching_chain(
+                        topic_name,
+                        _importance_label(topic_name, topics_by_name),
+                        question,
+                        text_dict,
+                        structured_slides,
+                        recent_messages,
+                        "Use this context to answer naturally.",
+                        stream,
+                    )
             
             # Last resort: answer naturally without specific topics
             return "I'd love to help you understand how topics connect! Could you tell me which two topics you're curious about? Or if you're asking about something we just discussed, I can explain that too!"
@@ -413,91 +761,54 @@ def ask_about_rankings(topics: List[Dict], question: str, text_dict: Optional[Di
         if teaching_topic:
             topic_name = teaching_topic
         else:
-            # Extract topic name from question
-            topic_info = _extract_topic_names(question, topics)
-            
-            # If no topic found in current question, check conversation context
-            if (not topic_info or not topic_info[0]) and previous_messages:
-                # Look for topics mentioned in recent conversation
-                recent_text = " ".join([msg.get("content", "") for msg in previous_messages[-4:]])
-                topic_info = _extract_topic_names(recent_text + " " + question, topics)
+            # Extract topic name from question (or, failing that, the recent conversation)
+            topic_info = _resolve_topic(question_lower, recent_text_lower, topic_index)
             
             if topic_info and topic_info[0]:
                 topic_name = topic_info[0]
             else:
                 # If still no topic, answer naturally about what they're asking
                 # Use a generic topic name and let the LLM handle it naturally
-                topic_name = "the topic you're asking about"
+                topic_name = _GENERIC_TOPIC
         
         # Find topic importance (if we have a real topic name)
-        if topic_name and topic_name != "the topic you're asking about":
-            topic_obj = next((t for t in topics if t.get("name", "").lower() == topic_name.lower()), None)
-            importance = topic_obj.get("importance", "core") if topic_obj else "core"
-            importance_label = f"{importance} topic"
+        if topic_name and topic_name != _GENERIC_TOPIC:
+            importance_label = _importance_label(topic_name, topics_by_name)
         else:
             importance_label = "general topic"
         
-        # Check if user wants to continue or needs re-explanation
-        question_lower = question.lower()
-        move_to_next = any(word in question_lower for word in ["continue", "next", "more", "go on", "keep going", "yes", "understood"])
-        re_explain = any(word in question_lower for word in ["understand better", "explain again", "don't get it", "confused", "no"])
-        
-        # Build teaching question - natural conversation style
         # Always use the original question to maintain natural conversation flow
-        teaching_question = question
-        
-        # Get context snippets using RAG (only if we have a real topic name)
-        context_snippets = []
-        context_text = ""
-        if text_dict and topic_name and topic_name != "the topic you're asking about":
-            if structured_slides:
-                context_snippets = retrieve_relevant_snippets(
-                    topic_name, text_dict, structured_slides=structured_slides, max_snippets=5
-                )
-            else:
-                context_snippets = retrieve_relevant_snippets(
-                    topic_name, text_dict, max_snippets=5
-                )
-            
-            if context_snippets:
-                context_text = "\n\nRelevant excerpts from your materials:\n"
-                for i, snippet in enumerate(context_snippets[:3], 1):
-                    context_text += f"\n[{i}] {snippet[:300]}...\n"
-        
-        # Add conversation history for context (so the friend remembers what was discussed)
-        conversation_context = ""
-        if previous_messages:
-            # Include recent conversation for context
-            recent_messages = previous_messages[-4:]  # Last 4 messages (2 exchanges)
-            conversation_context = "\n\n**Recent conversation:**\n"
-            for msg in recent_messages:
-                role = msg.get("role", "")
-                content = msg.get("content", "")[:150]  # Truncate for context
-                if role == "user":
-                    conversation_context += f"Friend: {content}...\n"
-                elif role == "assistant":
-                    conversation_context += f"You: {content}...\n"
-            conversation_context += "\n(Use this context to maintain a natural conversation flow.)\n"
-        
-        chain = _get_teaching_chain()
-        answer = chain.invoke({
-            "topic_name": topic_name,
-            "importance_label": importance_label,
-            "context": context_text + conversation_context,
-            "question": teaching_question,
-        })
-        
-        return answer
+        return _run_teaching_chain(
+            topic_name,
+            importance_label,
+            question,
+            text_dict,
+            structured_slides,
+            recent_messages,
+            "Use this context to maintain a natural conversation flow.",
+            stream,
+        )
     
     else:
-        # Default: Explain rankings
+        # Default: Explain rankings (not streamed: the text is final only after the check)
+        # Topics list is only formatted here - the other branches never send it
+        topics_list = "\n".join(
+            f"{i}. {t.name or 'Unknown'} ({t.importance or 'extra'})" for i, t in enumerate(topic_index, 1)
+        )
         chain = _get_dashboard_chain()
         answer = chain.invoke({
             "topics_list": topics_list,
             "question": question,
         })
         
+        if not _EVALUATE_RANKING_ANSWERS:
+            return answer  # Already self-checked in the same call
+        
         # Quality assurance
+        topics_detailed_str = "\n".join(
+            f"{i}. {t.name or 'Unknown'} - {t.importance or 'extra'} (score: {t.score:.1f})"
+            for i, t in enumerate(topic_index, 1)
+        )
         try:
             perfected_answer = evaluate_and_revise_ranking_response(
                 topic_list=topics_detailed_str,
@@ -505,6 +816,6 @@ def ask_about_rankings(topics: List[Dict], question: str, text_dict: Optional[Di
                 generated_response=answer,
             )
             return perfected_answer
-        except Exception as e:
-            print(f"Evaluation/revision error (returning original): {e}")
+        except Exception:
+            logger.warning("Evaluation/revision failed, returning original answer", exc_info=True)
             return answer
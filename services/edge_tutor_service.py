@@ -4,19 +4,66 @@ Service for explaining connections between two topics.
 """
 
 import os
-from typing import List, Tuple, Dict, Optional
+import functools
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List, Tuple, Dict, Optional
 
 from dotenv import load_dotenv
 from langchain_mistralai import ChatMistralAI
+from langchain_core.messages import SystemMessage
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 from services.rag_service import retrieve_co_occurrence_snippets
-from services.evaluation_service import evaluate_and_revise_edge_response
+from services.evaluation_service import (
+    RevisionInterrupted,
+    _get_http_clients,
+    evaluate_and_revise_edge_response,
+    evaluate_and_revise_edge_response_stream,
+    passes_quick_edge_gate,
+)
+from services.semantic_cache import SemanticCache
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 _edge_chain = None
 
+# Perfected answers for reworded repeats of a question about the same pair and excerpts
+# (skips generation, evaluation and revision). Keyed by conversation turn too: generic
+# follow-ups ("explain more", "go deeper") read alike but each wants a new answer
+_answer_cache = SemanticCache(threshold=0.95)
+
+# Answers that pass the quick gate are shown right away and reviewed here in the
+# background; revisions are kept (by hash of the answer shown) for the UI to offer
+_background_qa_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="background-qa")
+_SUGGESTED_CORRECTIONS_SIZE = 256
+_suggested_corrections: "OrderedDict[str, str]" = OrderedDict()
+_suggested_corrections_lock = threading.Lock()
+
+
+_EDGE_SYSTEM_PROMPT = (
+    "You are that one really smart friend in class - the one who can explain the whole lecture in a day while the professor took two months. "
+    "You're talking to your friend who needs help understanding how topics connect.\n\n"
+    "**YOUR PERSONALITY:**\n"
+    "- You're super smart and know the material deeply, but you talk like a friend, not a textbook.\n"
+    "- You're friendly, warm, and encouraging - like you genuinely want to help your friend understand.\n"
+    "- You use natural, conversational language. No robotic or formal tone.\n\n"
+    "**HOW YOU EXPLAIN CONNECTIONS:**\n"
+    "- Explain how the topics relate in a clear, natural way - like you're explaining to a friend.\n"
+    "- Use the context from their slides to ground your explanation.\n"
+    "- Help them see why understanding this connection matters.\n"
+    "- If they're not really connected, say so honestly - don't force a connection.\n"
+    "- Keep it concise but complete - one good paragraph explaining the connection.\n"
+    "**USING THE SLIDES:**\n"
+    "- Always ground your explanations in the provided context - never make up relationships.\n"
+    "- Be accurate and honest.\n"
+)
+
 
 def _build_edge_chain():
     """Build chain for explaining topic connections."""
@@ -24,43 +71,32 @@ def _build_edge_chain():
     if not api_key:
         raise RuntimeError("MISTRAL_API_KEY is not set.")
 
+    # Same connection pool as the evaluator that reviews every answer
+    client, async_client = _get_http_clients(api_key)
     llm = ChatMistralAI(
         model="mistral-small-latest",
         temperature=0.7,  # Higher temperature for more natural, friend-like responses
+        cache=False,  # Varied answers: never served from the LLM cache
         max_retries=2,
         api_key=api_key,
+        client=client,
+        async_client=async_client,
     )
 
+    # Byte-identical system prompt first and stable instructions before the per-call
+    # fields, so every edge request shares the longest possible prefix
     prompt = ChatPromptTemplate.from_messages(
         [
-            (
-                "system",
-                (
-                    "You are that one really smart friend in class - the one who can explain the whole lecture in a day while the professor took two months. "
-                    "You're talking to your friend who needs help understanding how topics connect.\n\n"
-                    "**YOUR PERSONALITY:**\n"
-                    "- You're super smart and know the material deeply, but you talk like a friend, not a textbook.\n"
-                    "- You're friendly, warm, and encouraging - like you genuinely want to help your friend understand.\n"
-                    "- You use natural, conversational language. No robotic or formal tone.\n\n"
-                    "**HOW YOU EXPLAIN CONNECTIONS:**\n"
-                    "- Explain how the topics relate in a clear, natural way - like you're explaining to a friend.\n"
-                    "- Use the context from their slides to ground your explanation.\n"
-                    "- Help them see why understanding this connection matters.\n"
-                    "- If they're not really connected, say so honestly - don't force a connection.\n"
-                    "- Keep it concise but complete - one good paragraph explaining the connection.\n"
-                    "**USING THE SLIDES:**\n"
-                    "- Always ground your explanations in the provided context - never make up relationships.\n"
-                    "- Be accurate and honest.\n"
-                ),
-            ),
+            SystemMessage(content=_EDGE_SYSTEM_PROMPT),
             (
                 "human",
                 (
+                    "Answer your friend naturally, like a smart friend would. Explain how these topics "
+                    "connect, using the context when relevant.\n\n"
                     "Topic A: {topic_a}\n"
                     "Topic B: {topic_b}\n\n"
                     "{context}\n\n"
-                    "Your friend asks: {question}\n\n"
-                    "Answer them naturally, like a smart friend would. Explain how these topics connect, using the context when relevant."
+                    "Your friend asks: {question}"
                 ),
             ),
         ]
@@ -77,34 +113,116 @@ def _get_edge_chain():
     return _edge_chain
 
 
+@functools.lru_cache(maxsize=256)
+def _join_edge_context(snippets: Tuple[str, ...]) -> str:
+    return "\n\nRelevant excerpts where both topics appear:\n" + "".join(
+        [f"\n[{i}] {snippet[:300]}...\n" for i, snippet in enumerate(snippets, 1)]
+    )
+
+
+def _edge_context_text(context_snippets: List[str]) -> str:
+    """Co-occurrence excerpts block for the edge prompt (memoized on the snippets used)."""
+    if not context_snippets:
+        return "\n\n(No specific context found where both topics appear together.)\n"
+    return _join_edge_context(tuple(context_snippets[:3]))
+
+
+def _cache_namespace(
+    topic_a: str, topic_b: str, context_text: str, edge_signals: str, turn: int
+) -> Tuple[str, str, str, str, int]:
+    """Answers are only shared between questions about the same pair, excerpts and edge, at the same turn."""
+    context_hash = hashlib.blake2b(context_text.encode("utf-8"), digest_size=16).hexdigest()
+    return (topic_a.lower().strip(), topic_b.lower().strip(), edge_signals, context_hash, turn)
+
+
+def _answer_key(answer: str) -> str:
+    return hashlib.blake2b(answer.strip().encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _background_qa(
+    topic_a: str,
+    topic_b: str,
+    question: str,
+    edge_signals: str,
+    answer: str,
+    context_snippets: List[str],
+    namespace: Tuple[str, str, str, str, int],
+) -> None:
+    """Review an answer that was already shown; keep any revision as a suggested correction."""
+    try:
+        perfected_answer = evaluate_and_revise_edge_response(
+            topic_a=topic_a,
+            topic_b=topic_b,
+            edge_signals=edge_signals,
+            generated_response=answer,
+            context_snippets=context_snippets,
+        )
+    except Exception:
+        logger.warning("Background evaluation/revision failed", exc_info=True)
+        return
+    _answer_cache.add(namespace, question, perfected_answer)
+    if perfected_answer.strip() != answer.strip():
+        with _suggested_corrections_lock:
+            _suggested_corrections[_answer_key(answer)] = perfected_answer
+            while len(_suggested_corrections) > _SUGGESTED_CORRECTIONS_SIZE:
+                _suggested_corrections.popitem(last=False)
+
+
+def _shown_before_review(
+    topic_a: str,
+    topic_b: str,
+    question: str,
+    edge_signals: str,
+    answer: str,
+    context_snippets: List[str],
+    namespace: Tuple[str, str, str, str, int],
+) -> bool:
+    """If the answer passes the quick gate, start its review in the background and return True."""
+    if not passes_quick_edge_gate(answer, topic_a, topic_b, context_snippets):
+        return False
+    _background_qa_pool.submit(
+        _background_qa, topic_a, topic_b, question, edge_signals, answer, list(context_snippets), namespace
+    )
+    return True
+
+
+def pop_suggested_correction(answer: str) -> Optional[str]:
+    """Revised version of an answer that was shown before review, once its review found issues."""
+    with _suggested_corrections_lock:
+        return _suggested_corrections.pop(_answer_key(answer), None)
+
+
 def explain_topic_connection(
     topic_a: str,
     topic_b: str,
     question: str,
     context_snippets: List[str],
     edge_signals: Optional[str] = None,
+    turn: int = 0,
 ) -> str:
     """
     Explain how two topics connect.
     
     The response is automatically evaluated and revised by the quality assurance evaluator
-    before being returned. Students only see perfected responses.
+    before being returned. Answers that pass a quick gate are returned at once and
+    reviewed in the background instead (see pop_suggested_correction).
+    turn is the number of earlier questions in the conversation; cached answers are
+    only reused for questions asked at the same turn.
     
     Returns:
-        Perfected response string
+        Perfected (or gate-approved) response string
     """
-    context_text = ""
-    if context_snippets:
-        context_text = "\n\nRelevant excerpts where both topics appear:\n"
-        for i, snippet in enumerate(context_snippets[:3], 1):
-            context_text += f"\n[{i}] {snippet[:300]}...\n"
-    else:
-        context_text = "\n\n(No specific context found where both topics appear together.)\n"
+    context_text = _edge_context_text(context_snippets)
     
     # Determine edge signals if not provided
     if edge_signals is None:
         edge_signals = "Topics appear together in slides (co-occurrence detected)"
     
+    namespace = _cache_namespace(topic_a, topic_b, context_text, edge_signals, turn)
+    cached = _answer_cache.lookup(namespace, question)
+    if cached is not None:
+        return cached
+    
     chain = _get_edge_chain()
     answer = chain.invoke({
         "topic_a": topic_a,
@@ -113,6 +231,10 @@ def explain_topic_connection(
         "question": question,
     })
     
+    # Clearly fine answers go out now and are reviewed out of band
+    if _shown_before_review(topic_a, topic_b, question, edge_signals, answer, context_snippets, namespace):
+        return answer
+    
     # Quality assurance: Evaluate and revise response before student sees it
     try:
         perfected_answer = evaluate_and_revise_edge_response(
@@ -122,10 +244,64 @@ def explain_topic_connection(
             generated_response=answer,
             context_snippets=context_snippets,
         )
+        _answer_cache.add(namespace, question, perfected_answer)
         return perfected_answer
-    except Exception as e:
-        print(f"Evaluation/revision error (returning original): {e}")
+    except Exception:
+        logger.warning("Evaluation/revision failed, returning original answer", exc_info=True)
         return answer
 
 
-
+def explain_topic_connection_stream(
+    topic_a: str,
+    topic_b: str,
+    question: str,
+    context_snippets: List[str],
+    edge_signals: Optional[str] = None,
+    turn: int = 0,
+) -> Iterator[str]:
+    """
+    Streaming explain_topic_connection: the draft is still generated and evaluated
+    first (unless it passes the quick gate), but the perfected answer is yielded as
+    soon as its tokens arrive. Raises RevisionInterrupted if the revision fails partway.
+    """
+    if edge_signals is None:
+        edge_signals = "Topics appear together in slides (co-occurrence detected)"
+    
+    context_text = _edge_context_text(context_snippets)
+    namespace = _cache_namespace(topic_a, topic_b, context_text, edge_signals, turn)
+    cached = _answer_cache.lookup(namespace, question)
+    if cached is not None:
+        yield cached
+        return
+    
+    chain = _get_edge_chain()
+    answer = chain.invoke({
+        "topic_a": topic_a,
+        "topic_b": topic_b,
+        "context": context_text,
+        "question": question,
+    })
+    
+    if _shown_before_review(topic_a, topic_b, question, edge_signals, answer, context_snippets, namespace):
+        yield answer
+        return
+    
+    chunks: List[str] = []
+    try:
+        for chunk in evaluate_and_revise_edge_response_stream(
+            topic_a=topic_a,
+            topic_b=topic_b,
+            edge_signals=edge_signals,
+            generated_response=answer,
+            context_snippets=context_snippets,
+        ):
+            chunks.append(chunk)
+            yield chunk
+    except Exception as e:
+        logger.warning("Evaluation/revision failed, returning original answer", exc_info=True)
+        if chunks:
+            # Half a revision is already out: the caller redraws the draft instead
+            raise RevisionInterrupted(answer) from e
+        yield answer
+        return
+    _answer_cache.add(namespace, question, "".join(chunks).strip())
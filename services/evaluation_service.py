@@ -10,82 +10,279 @@ Role: Like a math teacher reviewing a tutor's explanation before the tutor
 presents it to students - fixes errors, improves clarity, ensures completeness.
 """
 
+import atexit
+import functools
+import hashlib
 import json
+import logging
 import os
 import re
-from typing import Dict, List, Optional, Literal, Tuple
+import threading
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, FrozenSet, Iterator, List, Optional, Literal, Tuple
 
+import httpx
 from dotenv import load_dotenv
 from langchain_mistralai import ChatMistralAI
+from langchain_core.messages import SystemMessage
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 
+# Faster parsing of the evaluator's JSON when orjson is installed
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 _evaluator_chains = {}
 _revision_chains = {}
+_combined_chains = {}
+_chain_lock = threading.Lock()
+
+# One keep-alive pool for every evaluator, revision and edge tutor chain (edge_tutor_service
+# uses it too), sized for speculative revisions and batches running alongside each other
+_MISTRAL_ENDPOINT = "https://api.mistral.ai/v1"
+_HTTP_LIMITS = httpx.Limits(max_keepalive_connections=32, max_connections=64, keepalive_expiry=60)
+_HTTP_TIMEOUT = 120
+_http_clients: Optional[Tuple[httpx.Client, httpx.AsyncClient]] = None
+_http_lock = threading.Lock()
+
+# Two-step fallback: revisions are started alongside the evaluator instead of after it
+# (see _evaluate_and_revise_two_step)
+_speculation_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="speculative-revision")
+
+# Final (possibly revised) answer per exact evaluation input: the same response for the
+# same question and context is never evaluated twice. Evaluations are near-deterministic
+# (temperature 0.1), so a hit covers the evaluator and any revision
+_RESULT_CACHE_SIZE = 4096
+_result_cache: "OrderedDict[str, str]" = OrderedDict()
+_result_cache_lock = threading.Lock()
+
+# Cheap classifier (_cheap_classify): clear-cut topic answers skip the evaluator call.
+# It only judges answers grounded in excerpts, i.e. the progressive RAG tutor's format:
+# ONE compact paragraph (3-4 sentences), a 2-sentence summary and a question to continue.
+# Acceptable length (in words) per importance level of that format
+_GATE_WORD_RANGES = {
+    "exam_critical": (70, 350),
+    "core": (60, 300),
+    "extra": (40, 250),
+    # No importance known (e.g. "general topic"): the union of the ranges above
+    "general": (40, 350),
+}
+# How each level is named in revision notes
+_GATE_IMPORTANCE_NAMES = {
+    "exam_critical": "an exam-critical",
+    "core": "a core",
+    "extra": "an extra",
+    "general": "a",
+}
+_GATE_WORD_RX = re.compile(r"[a-z][a-z'-]{4,}")
+# Ends by offering a next step (checked over the last few hundred characters)
+_GATE_NEXT_STEP_RX = re.compile(
+    r"\?|\b(?:next|try|practice|want me to|would you like|let me know|ready to)\b"
+)
+_GATE_TAIL_CHARS = 300
+_GATE_TERMS_PER_SNIPPET = 5
+# Cheap classifier verdicts at or above this confidence skip the evaluator call
+_CLASSIFY_CONFIDENCE = 0.8
+# Connection answers are "one good paragraph"
+_EDGE_GATE_WORD_RANGE = (40, 400)
+
+
+# Topic rubric, shared by the single, batch and combined evaluators
+_TOPIC_RUBRIC = (
+    "You are a strict, expert teaching assistant reviewing a tutor's explanation "
+    "BEFORE it reaches students. Your job is to identify ALL issues and ensure "
+    "the response is perfect.\n\n"
+    "**Evaluation Rubric (be strict):**\n\n"
+    "a) **Grounding in Materials** (1-5):\n"
+    "   - Uses information from retrieved snippets?\n"
+    "   - Avoids hallucinations (concepts not in slides)?\n"
+    "   - Uses course terminology (same wording as slides)?\n\n"
+    "b) **Depth vs Importance** (1-5):\n"
+    "   - exam_critical: Enough detail (definitions, steps, formulas)?\n"
+    "   - core: Conceptual with key details, not overwhelming?\n"
+    "   - extra: Short and light, no overkill?\n\n"
+    "c) **Clarity & Structure** (1-5):\n"
+    "   - Clear steps/sections?\n"
+    "   - Examples/analogies for abstract topics?\n"
+    "   - Short, understandable sentences?\n\n"
+    "d) **Coverage** (1-5):\n"
+    "   - Covers main slide points?\n"
+    "   - Doesn't miss key points from titles/objectives/summaries?\n\n"
+    "e) **Tone & Cognitive Load** (1-5):\n"
+    "   - Friendly, reassuring, low-anxiety?\n"
+    "   - Appropriate length?\n\n"
+    "f) **Actionability** (1-5):\n"
+    "   - Ends with clear next options?\n\n"
+    "**Global Checks:**\n"
+    "- Grounded in uploaded materials\n"
+    "- No hallucinated formalism\n"
+    "- Consistent with system logic\n"
+    "- Honest about uncertainty\n\n"
+)
+_TOPIC_EVALUATOR_PROMPT = (
+    _TOPIC_RUBRIC
+    + "**Output:** JSON with scores (1-5) and brief explanations:\n"
+    "{\n"
+    '  "grounding_materials": {"score": 1-5, "explanation": "..."},\n'
+    '  "depth_vs_importance": {"score": 1-5, "explanation": "..."},\n'
+    '  "clarity_structure": {"score": 1-5, "explanation": "..."},\n'
+    '  "coverage_needed": {"score": 1-5, "explanation": "..."},\n'
+    '  "tone_cognitive_load": {"score": 1-5, "explanation": "..."},\n'
+    '  "actionability": {"score": 1-5, "explanation": "..."},\n'
+    '  "needs_revision": true/false,\n'
+    '  "revision_notes": "What needs to be fixed/improved"\n'
+    "}"
+)
 
+# Several topic responses reviewed in one call (see evaluate_and_revise_topic_responses_batch)
+_BATCH_SIZE = 6
+_TOPIC_BATCH_EVALUATOR_PROMPT = (
+    _TOPIC_EVALUATOR_PROMPT
+    + "\n\n**Batch mode:** You will receive several numbered tutor responses. Evaluate each one "
+    "independently with the rubric above and return a single JSON object:\n"
+    '{"evaluations": [one evaluation object per response, in the same order, in the format above]}'
+)
 
-def _build_evaluator_chain(evaluation_type: Literal["topic", "edge", "ranking"] = "topic"):
+
+# Topic evaluator answers with a one-line verdict instead of six scored fields.
+# EVALUATOR_DETAILED_RUBRIC=1 restores the full JSON rubric (for offline analysis).
+_DETAILED_TOPIC_RUBRIC = os.environ.get("EVALUATOR_DETAILED_RUBRIC", "").lower() in ("1", "true", "yes")
+_TOPIC_VERDICT_PROMPT = (
+    _TOPIC_RUBRIC
+    + "**Output:** Rate the tutor response 1-5 overall against the rubric. If it is below 4, "
+    "output `REVISE: <short notes on what to fix>` on a single line. Otherwise output the "
+    "single token `PASS`. Nothing else."
+)
+
+_EDGE_RUBRIC = (
+    "You are a strict, expert teaching assistant reviewing a tutor's explanation "
+    "of how two topics connect BEFORE it reaches students.\n\n"
+    "**Evaluation Rubric:**\n\n"
+    "a) **Link Makes Sense** (1-5): Real relationship or vague?\n"
+    "b) **Respects Edge Logic** (1-5): Matches connection type (hierarchical/same slide/consecutive)?\n"
+    "c) **Grounding & Correctness** (1-5): Consistent with slides?\n\n"
+)
+
+_RANKING_RUBRIC = (
+    "You are a strict, expert teaching assistant reviewing study priority advice "
+    "BEFORE it reaches students.\n\n"
+    "**Evaluation Rubric:**\n\n"
+    "a) **Respects Ranking** (1-5): Prioritizes exam_critical? Distinguishes levels?\n"
+    "b) **Justification** (1-5): Clear, understandable reasons?\n"
+    "c) **Anxiety-Aware Planning** (1-5): Reasonable plan, not overwhelming?\n\n"
+)
+
+# Combined evaluate+revise (one call): the model answers OK, or the revision between
+# tags on their own lines (answers about code can contain <<< / >>>, never these tags)
+_REVISION_START = "<revised_response>"
+_REVISION_END = "</revised_response>"
+_COMBINED_OUTPUT = (
+    "**Output:** Do not output scores. If ANY score < 4, fix ALL issues (keep the friendly, "
+    "student-friendly tone; no meta-commentary) and output ONLY the revised response, with "
+    f"a `{_REVISION_START}` line before it and a `{_REVISION_END}` line after it. "
+    "Otherwise output the single token `OK`."
+)
+_COMBINED_RUBRICS = {
+    "topic": _TOPIC_RUBRIC,
+    "edge": _EDGE_RUBRIC,
+    "ranking": _RANKING_RUBRIC,
+}
+_COMBINED_INPUTS = {
+    "topic": (
+        "Topic: {topic_name}\n"
+        "Importance: {importance_label}\n"
+        "Question: {user_question}\n"
+        "Context:\n{context_snippets}\n\n"
+    ),
+    "edge": (
+        "Topic A: {topic_a}\n"
+        "Topic B: {topic_b}\n"
+        "Edge Signals: {edge_signals}\n"
+        "Context:\n{context_snippets}\n\n"
+    ),
+    "ranking": (
+        "Topics:\n{topic_list}\n"
+        "Question: {user_question}\n\n"
+    ),
+}
+
+
+class RevisionInterrupted(Exception):
+    """
+    A streamed revision failed after part of it was yielded. Whoever rendered those
+    chunks should replace them with .draft, the original answer.
+    """
+    def __init__(self, draft: str):
+        super().__init__("revision stream failed partway")
+        self.draft = draft
+
+
+def _get_http_clients(api_key: str) -> Tuple[httpx.Client, httpx.AsyncClient]:
+    """Pooled sync/async clients shared by the ChatMistralAI instances (closed at exit)."""
+    global _http_clients
+    if _http_clients is None:
+        with _http_lock:
+            if _http_clients is None:
+                headers = {
+                    "Content-Type": "application/json",
+                    "Accept": "application/json",
+                    "Authorization": f"Bearer {api_key}",
+                }
+                client = httpx.Client(
+                    base_url=_MISTRAL_ENDPOINT, headers=headers, limits=_HTTP_LIMITS, timeout=_HTTP_TIMEOUT
+                )
+                async_client = httpx.AsyncClient(
+                    base_url=_MISTRAL_ENDPOINT, headers=headers, limits=_HTTP_LIMITS, timeout=_HTTP_TIMEOUT
+                )
+                atexit.register(client.close)
+                _http_clients = (client, async_client)
+    return _http_clients
+
+
+def _build_evaluator_chain(evaluation_type: Literal["topic", "topic_batch", "edge", "ranking"] = "topic"):
     """Build chain for evaluating tutor responses based on type."""
     api_key = os.environ.get("MISTRAL_API_KEY")
     if not api_key:
         raise RuntimeError("MISTRAL_API_KEY is not set.")
 
+    client, async_client = _get_http_clients(api_key)
     llm = ChatMistralAI(
         model="mistral-small-latest",
         temperature=0.1,  # Low temperature for consistent, strict evaluation
         max_retries=2,
         api_key=api_key,
+        client=client,
+        async_client=async_client,
     )
 
-    if evaluation_type == "topic":
+    if evaluation_type == "topic" and _DETAILED_TOPIC_RUBRIC:
+        # SystemMessage: the JSON example's braces must not be read as template variables
         prompt = ChatPromptTemplate.from_messages([
+            SystemMessage(content=_TOPIC_EVALUATOR_PROMPT),
             (
-                "system",
+                "human",
                 (
-                    "You are a strict, expert teaching assistant reviewing a tutor's explanation "
-                    "BEFORE it reaches students. Your job is to identify ALL issues and ensure "
-                    "the response is perfect.\n\n"
-                    "**Evaluation Rubric (be strict):**\n\n"
-                    "a) **Grounding in Materials** (1-5):\n"
-                    "   - Uses information from retrieved snippets?\n"
-                    "   - Avoids hallucinations (concepts not in slides)?\n"
-                    "   - Uses course terminology (same wording as slides)?\n\n"
-                    "b) **Depth vs Importance** (1-5):\n"
-                    "   - exam_critical: Enough detail (definitions, steps, formulas)?\n"
-                    "   - core: Conceptual with key details, not overwhelming?\n"
-                    "   - extra: Short and light, no overkill?\n\n"
-                    "c) **Clarity & Structure** (1-5):\n"
-                    "   - Clear steps/sections?\n"
-                    "   - Examples/analogies for abstract topics?\n"
-                    "   - Short, understandable sentences?\n\n"
-                    "d) **Coverage** (1-5):\n"
-                    "   - Covers main slide points?\n"
-                    "   - Doesn't miss key points from titles/objectives/summaries?\n\n"
-                    "e) **Tone & Cognitive Load** (1-5):\n"
-                    "   - Friendly, reassuring, low-anxiety?\n"
-                    "   - Appropriate length?\n\n"
-                    "f) **Actionability** (1-5):\n"
-                    "   - Ends with clear next options?\n\n"
-                    "**Global Checks:**\n"
-                    "- Grounded in uploaded materials\n"
-                    "- No hallucinated formalism\n"
-                    "- Consistent with system logic\n"
-                    "- Honest about uncertainty\n\n"
-                    "**Output:** JSON with scores (1-5) and brief explanations:\n"
-                    "{\n"
-                    '  "grounding_materials": {"score": 1-5, "explanation": "..."},\n'
-                    '  "depth_vs_importance": {"score": 1-5, "explanation": "..."},\n'
-                    '  "clarity_structure": {"score": 1-5, "explanation": "..."},\n'
-                    '  "coverage_needed": {"score": 1-5, "explanation": "..."},\n'
-                    '  "tone_cognitive_load": {"score": 1-5, "explanation": "..."},\n'
-                    '  "actionability": {"score": 1-5, "explanation": "..."},\n'
-                    '  "needs_revision": true/false,\n'
-                    '  "revision_notes": "What needs to be fixed/improved"\n'
-                    "}"
+                    "Topic: {topic_name}\n"
+                    "Importance: {importance_label}\n"
+                    "Question: {user_question}\n"
+                    "Context:\n{context_snippets}\n\n"
+                    "Tutor's Response:\n{generated_response}\n\n"
+                    "Evaluate strictly. If ANY score < 4, set needs_revision=true and explain what to fix."
                 ),
             ),
+        ])
+    
+    elif evaluation_type == "topic":
+        prompt = ChatPromptTemplate.from_messages([
+            SystemMessage(content=_TOPIC_VERDICT_PROMPT),
             (
                 "human",
                 (
@@ -94,23 +291,30 @@ def _build_evaluator_chain(evaluation_type: Literal["topic", "edge", "ranking"]
                     "Question: {user_question}\n"
                     "Context:\n{context_snippets}\n\n"
                     "Tutor's Response:\n{generated_response}\n\n"
-                    "Evaluate strictly. If ANY score < 4, set needs_revision=true and explain what to fix."
+                    "Evaluate strictly, then output `PASS` or `REVISE: <notes>`."
                 ),
             ),
         ])
     
-    elif evaluation_type == "edge":
+    elif evaluation_type == "topic_batch":
         prompt = ChatPromptTemplate.from_messages([
+            SystemMessage(content=_TOPIC_BATCH_EVALUATOR_PROMPT),
             (
-                "system",
+                "human",
                 (
-                    "You are a strict, expert teaching assistant reviewing a tutor's explanation "
-                    "of how two topics connect BEFORE it reaches students.\n\n"
-                    "**Evaluation Rubric:**\n\n"
-                    "a) **Link Makes Sense** (1-5): Real relationship or vague?\n"
-                    "b) **Respects Edge Logic** (1-5): Matches connection type (hierarchical/same slide/consecutive)?\n"
-                    "c) **Grounding & Correctness** (1-5): Consistent with slides?\n\n"
-                    "**Output:** JSON with scores and revision needs:\n"
+                    "{responses}\n\n"
+                    "Evaluate each response strictly. If ANY of its scores < 4, set its "
+                    "needs_revision=true and explain what to fix."
+                ),
+            ),
+        ])
+    
+    elif evaluation_type == "edge":
+        prompt = ChatPromptTemplate.from_messages([
+            SystemMessage(
+                content=(
+                    _EDGE_RUBRIC
+                    + "**Output:** JSON with scores and revision needs:\n"
                     "{\n"
                     '  "link_makes_sense": {"score": 1-5, "explanation": "..."},\n'
                     '  "respecting_edge_logic": {"score": 1-5, "explanation": "..."},\n'
@@ -118,7 +322,7 @@ def _build_evaluator_chain(evaluation_type: Literal["topic", "edge", "ranking"]
                     '  "needs_revision": true/false,\n'
                     '  "revision_notes": "What needs fixing"\n'
                     "}"
-                ),
+                )
             ),
             (
                 "human",
@@ -135,16 +339,10 @@ def _build_evaluator_chain(evaluation_type: Literal["topic", "edge", "ranking"]
     
     else:  # ranking
         prompt = ChatPromptTemplate.from_messages([
-            (
-                "system",
-                (
-                    "You are a strict, expert teaching assistant reviewing study priority advice "
-                    "BEFORE it reaches students.\n\n"
-                    "**Evaluation Rubric:**\n\n"
-                    "a) **Respects Ranking** (1-5): Prioritizes exam_critical? Distinguishes levels?\n"
-                    "b) **Justification** (1-5): Clear, understandable reasons?\n"
-                    "c) **Anxiety-Aware Planning** (1-5): Reasonable plan, not overwhelming?\n\n"
-                    "**Output:** JSON with scores and revision needs:\n"
+            SystemMessage(
+                content=(
+                    _RANKING_RUBRIC
+                    + "**Output:** JSON with scores and revision needs:\n"
                     "{\n"
                     '  "respects_ranking": {"score": 1-5, "explanation": "..."},\n'
                     '  "justification": {"score": 1-5, "explanation": "..."},\n'
@@ -152,7 +350,7 @@ def _build_evaluator_chain(evaluation_type: Literal["topic", "edge", "ranking"]
                     '  "needs_revision": true/false,\n'
                     '  "revision_notes": "What needs fixing"\n'
                     "}"
-                ),
+                )
             ),
             (
                 "human",
@@ -166,7 +364,10 @@ def _build_evaluator_chain(evaluation_type: Literal["topic", "edge", "ranking"]
         ])
 
     parser = StrOutputParser()
-    return prompt | llm | parser
+    if evaluation_type == "topic" and not _DETAILED_TOPIC_RUBRIC:
+        return prompt | llm | parser  # PASS / REVISE verdict text
+    # JSON rubrics are parsed inside the chain, so callers get the evaluation dict
+    return prompt | llm | parser | _parse_json_response
 
 
 def _build_revision_chain(evaluation_type: Literal["topic", "edge", "ranking"] = "topic"):
@@ -175,18 +376,20 @@ def _build_revision_chain(evaluation_type: Literal["topic", "edge", "ranking"] =
     if not api_key:
         raise RuntimeError("MISTRAL_API_KEY is not set.")
 
+    client, async_client = _get_http_clients(api_key)
     llm = ChatMistralAI(
         model="mistral-small-latest",
         temperature=0.3,  # Slightly higher for creative improvements
         max_retries=2,
         api_key=api_key,
+        client=client,
+        async_client=async_client,
     )
 
     if evaluation_type == "topic":
         prompt = ChatPromptTemplate.from_messages([
-            (
-                "system",
-                (
+            SystemMessage(
+                content=(
                     "You are an expert teaching assistant revising a tutor's explanation to make it perfect. "
                     "Fix ALL issues identified by the evaluator. Maintain the friendly, student-friendly tone "
                     "but ensure correctness, appropriate depth, clarity, and completeness.\n\n"
@@ -200,7 +403,7 @@ def _build_revision_chain(evaluation_type: Literal["topic", "edge", "ranking"] =
                     "- Use course terminology from slides\n"
                     "- Be honest about uncertainty if slides are limited\n\n"
                     "Return ONLY the revised, perfected response. No meta-commentary."
-                ),
+                )
             ),
             (
                 "human",
@@ -218,12 +421,11 @@ def _build_revision_chain(evaluation_type: Literal["topic", "edge", "ranking"] =
     
     elif evaluation_type == "edge":
         prompt = ChatPromptTemplate.from_messages([
-            (
-                "system",
-                (
+            SystemMessage(
+                content=(
                     "You are an expert teaching assistant revising an explanation of how two topics connect. "
                     "Fix ALL issues. Ensure the connection is clear, accurate, and matches the edge type."
-                ),
+                )
             ),
             (
                 "human",
@@ -241,13 +443,12 @@ def _build_revision_chain(evaluation_type: Literal["topic", "edge", "ranking"] =
     
     else:  # ranking
         prompt = ChatPromptTemplate.from_messages([
-            (
-                "system",
-                (
+            SystemMessage(
+                content=(
                     "You are an expert teaching assistant revising study priority advice. "
                     "Fix ALL issues. Ensure it respects rankings, provides clear justifications, "
                     "and gives anxiety-aware, balanced study plans."
-                ),
+                )
             ),
             (
                 "human",
@@ -265,43 +466,506 @@ def _build_revision_chain(evaluation_type: Literal["topic", "edge", "ranking"] =
     return prompt | llm | parser
 
 
-def _get_evaluator_chain(evaluation_type: Literal["topic", "edge", "ranking"] = "topic"):
-    """Get or create the evaluator chain."""
-    key = f"eval_{evaluation_type}"
-    if key not in _evaluator_chains:
-        _evaluator_chains[key] = _build_evaluator_chain(evaluation_type)
-    return _evaluator_chains[key]
+def _build_combined_chain(evaluation_type: Literal["topic", "edge", "ranking"] = "topic"):
+    """Build chain that evaluates a response and, if needed, revises it in the same call."""
+    api_key = os.environ.get("MISTRAL_API_KEY")
+    if not api_key:
+        raise RuntimeError("MISTRAL_API_KEY is not set.")
+
+    client, async_client = _get_http_clients(api_key)
+    llm = ChatMistralAI(
+        model="mistral-small-latest",
+        temperature=0.1,  # Strict evaluation; a revision here is a correction, not new writing
+        max_retries=2,
+        api_key=api_key,
+        client=client,
+        async_client=async_client,
+    )
+
+    prompt = ChatPromptTemplate.from_messages([
+        SystemMessage(content=_COMBINED_RUBRICS[evaluation_type] + _COMBINED_OUTPUT),
+        (
+            "human",
+            (
+                _COMBINED_INPUTS[evaluation_type]
+                + "Tutor's Response:\n{generated_response}\n\n"
+                "Evaluate strictly, then output `OK` or the revised response between the markers."
+            ),
+        ),
+    ])
+
+    parser = StrOutputParser()
+    return prompt | llm | parser
+
+
+def _get_evaluator_chain(evaluation_type: Literal["topic", "topic_batch", "edge", "ranking"] = "topic"):
+    """Get the evaluator chain (prebuilt at import when the API key is set, else built once here)."""
+    chain = _evaluator_chains.get(evaluation_type)
+    if chain is None:
+        with _chain_lock:
+            chain = _evaluator_chains.get(evaluation_type)
+            if chain is None:
+                chain = _evaluator_chains[evaluation_type] = _build_evaluator_chain(evaluation_type)
+    return chain
 
 
 def _get_revision_chain(evaluation_type: Literal["topic", "edge", "ranking"] = "topic"):
-    """Get or create the revision chain."""
-    key = f"rev_{evaluation_type}"
-    if key not in _revision_chains:
-        _revision_chains[key] = _build_revision_chain(evaluation_type)
-    return _revision_chains[key]
+    """Get the revision chain (prebuilt at import when the API key is set, else built once here)."""
+    chain = _revision_chains.get(evaluation_type)
+    if chain is None:
+        with _chain_lock:
+            chain = _revision_chains.get(evaluation_type)
+            if chain is None:
+                chain = _revision_chains[evaluation_type] = _build_revision_chain(evaluation_type)
+    return chain
+
+
+def _get_combined_chain(evaluation_type: Literal["topic", "edge", "ranking"] = "topic"):
+    """Get the combined evaluate+revise chain (prebuilt at import when the API key is set)."""
+    chain = _combined_chains.get(evaluation_type)
+    if chain is None:
+        with _chain_lock:
+            chain = _combined_chains.get(evaluation_type)
+            if chain is None:
+                chain = _combined_chains[evaluation_type] = _build_combined_chain(evaluation_type)
+    return chain
+
+
+_JSON_DECODER = json.JSONDecoder()
+# Evaluation fields that aren't rubric scores
+_META_KEYS = frozenset({"needs_revision", "revision_notes"})
 
 
 def _parse_json_response(text: str) -> Dict:
-    """Parse JSON from LLM response."""
-    text = text.strip()
-    if text.startswith("```json"):
-        text = text[7:]
-    elif text.startswith("```"):
-        text = text[3:]
-    if text.endswith("```"):
-        text = text[:-3]
-    text = text.strip()
+    """Parse the JSON object in an LLM response ({} if there is none)."""
+    text = text.strip().removeprefix("```json").removeprefix("```").removesuffix("```").strip()
     
     try:
-        return json.loads(text)
-    except json.JSONDecodeError:
-        json_match = re.search(r'\{[^{}]*(?:\{[^{}]*\}[^{}]*)*\}', text, re.DOTALL)
-        if json_match:
-            try:
-                return json.loads(json_match.group())
-            except json.JSONDecodeError:
-                pass
-        return {}
+        obj = orjson.loads(text) if HAS_ORJSON else json.loads(text)
+    except ValueError:  # json.JSONDecodeError and orjson.JSONDecodeError both subclass it
+        pass
+    else:
+        if isinstance(obj, dict):
+            return obj
+    
+    # JSON wrapped in prose: decode the first object that parses, starting at each "{".
+    # raw_decode scans in C and handles any nesting and braces inside strings.
+    start = text.find("{")
+    while start != -1:
+        try:
+            obj, _ = _JSON_DECODER.raw_decode(text, start)
+        except json.JSONDecodeError:
+            start = text.find("{", start + 1)
+            continue
+        if isinstance(obj, dict):
+            return obj
+        start = text.find("{", start + 1)
+    return {}
+
+
+def _parse_verdict(text: str) -> Optional[Tuple[bool, str]]:
+    """(needs_revision, notes) from a PASS / REVISE: verdict, or None if it is neither."""
+    text = text.strip().strip("`").strip()
+    if text.startswith("PASS"):
+        return False, ""
+    if text.startswith("REVISE"):
+        return True, text.removeprefix("REVISE").lstrip(" :").strip()
+    return None
+
+
+def _needs_revision(evaluation: Dict) -> bool:
+    """Evaluator asked for a revision, or gave any rubric score below 4."""
+    if evaluation.get("needs_revision", False):
+        return True
+    # any() stops at the first failing score
+    return any(
+        isinstance(value, dict) and value.get("score") is not None and value["score"] < 4
+        for key, value in evaluation.items()
+        if key not in _META_KEYS
+    )
+
+
+def _prebuild_chains() -> None:
+    """Build every chain up front, so concurrent first requests don't each build their own."""
+    for evaluation_type in ("topic", "topic_batch", "edge", "ranking"):
+        _evaluator_chains[evaluation_type] = _build_evaluator_chain(evaluation_type)
+    for evaluation_type in ("topic", "edge", "ranking"):
+        _revision_chains[evaluation_type] = _build_revision_chain(evaluation_type)
+        _combined_chains[evaluation_type] = _build_combined_chain(evaluation_type)
+
+
+# Without an API key (or if building fails) the getters fall back to building on first use
+if os.environ.get("MISTRAL_API_KEY"):
+    try:
+        _prebuild_chains()
+    except Exception:
+        logger.warning("Could not prebuild evaluator chains (building on first use)", exc_info=True)
+
+
+def _warm_up_connection() -> None:
+    """Open the shared pool's connection before the first answer needs reviewing."""
+    try:
+        client, _ = _get_http_clients(os.environ["MISTRAL_API_KEY"])
+        # Cheap authenticated request: completes DNS + TLS without generating any tokens
+        client.get("/models")
+    except Exception:
+        logger.warning("Evaluator connection warm-up failed (connecting on first use)", exc_info=True)
+
+
+# Off the import path, so the app starts as fast as before. DISABLE_LLM_WARMUP=1 skips it.
+if os.environ.get("MISTRAL_API_KEY") and os.environ.get("DISABLE_LLM_WARMUP", "").lower() not in ("1", "true", "yes"):
+    threading.Thread(target=_warm_up_connection, name="evaluator-warmup", daemon=True).start()
+
+
+@functools.lru_cache(maxsize=256)
+def _join_context(snippets: Tuple[str, ...]) -> str:
+    return "\n".join([f"- {snippet[:200]}..." for snippet in snippets])
+
+
+def _format_context(context_snippets: Optional[List[str]]) -> str:
+    """
+    Snippets as the evaluator/reviser see them. Memoized on the (at most 5) snippets
+    themselves, so the same retrieval reviewed again isn't re-sliced and re-joined.
+    """
+    if not context_snippets:
+        return "None provided"
+    return _join_context(tuple(context_snippets[:5]))
+
+
+def _result_key(evaluation_type: str, inputs: Dict[str, Any], generated_response: str) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    h.update(evaluation_type.encode("utf-8"))
+    for key in sorted(inputs):
+        h.update(f"\0{key}\0{inputs[key]}".encode("utf-8"))
+    h.update(b"\0\0" + generated_response.encode("utf-8"))
+    return h.hexdigest()
+
+
+def _cached_result(key: str) -> Optional[str]:
+    with _result_cache_lock:
+        result = _result_cache.get(key)
+        if result is not None:
+            _result_cache.move_to_end(key)
+        return result
+
+
+def _store_result(key: str, result: str) -> None:
+    with _result_cache_lock:
+        _result_cache[key] = result
+        while len(_result_cache) > _RESULT_CACHE_SIZE:
+            _result_cache.popitem(last=False)
+
+
+def _parse_combined_response(text: str, generated_response: str) -> Optional[str]:
+    """Final answer from a combined evaluate+revise reply, or None if it can't be read."""
+    start = text.find(_REVISION_START)
+    if start != -1:
+        end = text.rfind(_REVISION_END)
+        if end > start:
+            revised = text[start + len(_REVISION_START):end].strip()
+            return revised or None
+        return None
+    if text.lstrip().startswith("OK"):
+        return generated_response
+    return None
+
+
+def _evaluate_and_revise_two_step(
+    evaluation_type: Literal["topic", "edge", "ranking"],
+    inputs: Dict[str, Any],
+    generated_response: str,
+    revision_notes: str,
+) -> str:
+    """
+    Separate evaluator and revision calls. The revision is started speculatively (with
+    general revision notes) while the evaluator runs; a passing response drops it.
+    A verdict-only topic evaluator is quick, so its notes are waited for and used instead.
+    """
+    eval_chain = _get_evaluator_chain(evaluation_type)
+    rev_chain = _get_revision_chain(evaluation_type)
+    if evaluation_type == "topic" and not _DETAILED_TOPIC_RUBRIC:
+        verdict = _parse_verdict(eval_chain.invoke({**inputs, "generated_response": generated_response}))
+        if verdict is None or not verdict[0]:  # Unreadable verdicts pass, like unreadable JSON
+            return generated_response
+        notes = verdict[1] or revision_notes
+        return rev_chain.invoke(
+            {**inputs, "original_response": generated_response, "revision_notes": notes}
+        ).strip()
+    
+    revision = _speculation_pool.submit(
+        rev_chain.invoke,
+        {**inputs, "original_response": generated_response, "revision_notes": revision_notes},
+    )
+    try:
+        evaluation = eval_chain.invoke({**inputs, "generated_response": generated_response})
+    except Exception:
+        revision.cancel()
+        raise
+    
+    if not _needs_revision(evaluation):
+        revision.cancel()  # Still running ones finish in the background and are dropped
+        return generated_response
+    return revision.result().strip()
+
+
+def _evaluate_and_revise(
+    evaluation_type: Literal["topic", "edge", "ranking"],
+    inputs: Dict[str, Any],
+    generated_response: str,
+    revision_notes: str,
+) -> str:
+    """
+    Evaluate a response and return it, or its revision if the evaluator finds issues.
+    One combined call answers OK or the revised text; if that reply can't be read,
+    the separate evaluator and revision chains are used instead.
+    """
+    key = _result_key(evaluation_type, inputs, generated_response)
+    cached = _cached_result(key)
+    if cached is not None:
+        return cached
+    
+    combined_text = _get_combined_chain(evaluation_type).invoke(
+        {**inputs, "generated_response": generated_response}
+    )
+    result = _parse_combined_response(combined_text, generated_response)
+    if result is None:
+        result = _evaluate_and_revise_two_step(evaluation_type, inputs, generated_response, revision_notes)
+    _store_result(key, result)
+    return result
+
+
+def _evaluate_and_revise_stream(
+    evaluation_type: Literal["topic", "edge", "ranking"],
+    inputs: Dict[str, Any],
+    generated_response: str,
+    revision_notes: str,
+) -> Iterator[str]:
+    """
+    Streaming _evaluate_and_revise: nothing is yielded until the combined reply shows
+    whether a revision is needed, then the revised text is yielded as it is generated
+    (a passing response is yielded in one piece).
+    """
+    key = _result_key(evaluation_type, inputs, generated_response)
+    cached = _cached_result(key)
+    if cached is not None:
+        yield cached
+        return
+    
+    head = ""  # Reply text before the start marker
+    tail = ""  # Revised text held back while it could be the start of the end marker
+    revised: List[str] = []
+    started = False
+    for chunk in _get_combined_chain(evaluation_type).stream(
+        {**inputs, "generated_response": generated_response}
+    ):
+        if not started:
+            head += chunk
+            start = head.find(_REVISION_START)
+            if start == -1:
+                continue
+            started = True
+            chunk = head[start + len(_REVISION_START):]
+        tail += chunk
+        end = tail.find(_REVISION_END)
+        emit = tail[:end] if end != -1 else tail[:max(len(tail) - len(_REVISION_END) + 1, 0)]
+        tail = tail[len(emit):]
+        if not revised:
+            emit = emit.lstrip()
+        if emit:
+            revised.append(emit)
+            yield emit
+        if end != -1:
+            break
+    
+    if started:
+        # A missing end marker still leaves a usable revision (it was already shown)
+        if tail and not tail.startswith(_REVISION_END):
+            revised.append(tail)
+            yield tail
+        result = "".join(revised).strip()
+    else:
+        result = _parse_combined_response(head, generated_response)
+    if not result:
+        result = _evaluate_and_revise_two_step(evaluation_type, inputs, generated_response, revision_notes)
+        yield result
+    elif not started:
+        yield result
+    _store_result(key, result)
+
+
+def _revise_directly(
+    evaluation_type: Literal["topic", "edge", "ranking"],
+    inputs: Dict[str, Any],
+    generated_response: str,
+    revision_notes: str,
+) -> str:
+    """Revision without an evaluator call (the cheap classifier already found the issue)."""
+    key = _result_key(evaluation_type, inputs, generated_response)
+    cached = _cached_result(key)
+    if cached is None:
+        cached = _get_revision_chain(evaluation_type).invoke(
+            {**inputs, "original_response": generated_response, "revision_notes": revision_notes}
+        ).strip()
+        _store_result(key, cached)
+    return cached
+
+
+def _revise_directly_stream(
+    evaluation_type: Literal["topic", "edge", "ranking"],
+    inputs: Dict[str, Any],
+    generated_response: str,
+    revision_notes: str,
+) -> Iterator[str]:
+    """Streaming _revise_directly."""
+    key = _result_key(evaluation_type, inputs, generated_response)
+    cached = _cached_result(key)
+    if cached is not None:
+        yield cached
+        return
+    chunks: List[str] = []
+    for chunk in _get_revision_chain(evaluation_type).stream(
+        {**inputs, "original_response": generated_response, "revision_notes": revision_notes}
+    ):
+        chunks.append(chunk)
+        yield chunk
+    _store_result(key, "".join(chunks).strip())
+
+
+def _topic_inputs(topic_name: str, importance_label: str, user_question: str, context_snippets: Optional[List[str]]) -> Dict[str, Any]:
+    return {
+        "topic_name": topic_name,
+        "importance_label": importance_label,
+        "user_question": user_question,
+        "context_snippets": _format_context(context_snippets),
+    }
+
+
+def _edge_inputs(topic_a: str, topic_b: str, edge_signals: str, context_snippets: Optional[List[str]]) -> Dict[str, Any]:
+    return {
+        "topic_a": topic_a,
+        "topic_b": topic_b,
+        "edge_signals": edge_signals,
+        "context_snippets": _format_context(context_snippets),
+    }
+
+
+def _gate_importance(importance_label: str) -> str:
+    """
+    _GATE_WORD_RANGES key for an importance label, whichever wording the caller uses:
+    "exam_critical topic" (dashboard), "exam-critical topic that will..." / "core concept
+    that..." / "extra / nice-to-have topic..." (topic chat). Anything else is "general".
+    """
+    label = importance_label.lower().strip().replace("-", "_").replace(" ", "_")
+    for importance in ("exam_critical", "core", "extra"):
+        if label.startswith(importance):
+            return importance
+    return "general"
+
+
+def _cheap_classify(
+    response: str,
+    context_snippets: Optional[List[str]],
+    importance_label: str,
+) -> Tuple[bool, float, str]:
+    """
+    Small hand-tuned decision tree over cheap text features, so clear-cut topic answers
+    skip the evaluator call: returns (needs_revision, confidence, revision_notes).
+    Clearly fine: a length that fits the importance, each snippet's frequent terms used
+    and a closing next step. Clearly failing: far outside the length range, or none of
+    the snippets' terms used. Without snippets grounding can't be judged (confidence 0).
+    """
+    if not context_snippets:
+        return False, 0.0, ""
+    importance = _gate_importance(importance_label)
+    low, high = _GATE_WORD_RANGES[importance]
+    word_count = len(response.split())
+    if word_count < low // 2:
+        return True, 0.9, (
+            f"Far too short for {_GATE_IMPORTANCE_NAMES[importance]} topic: write one full "
+            "paragraph (3-4 sentences) from the slides, then the 2-sentence 'In summary:' "
+            "and the question to continue."
+        )
+    if word_count > high * 2:
+        return True, 0.9, (
+            f"Far too long for {_GATE_IMPORTANCE_NAMES[importance]} topic: cut to ONE compact "
+            "paragraph (3-4 sentences) on the essentials from the slides, then the 2-sentence "
+            "'In summary:' and the question to continue."
+        )
+    
+    response_lower = response.lower()
+    coverage = _snippet_term_coverage(response_lower, context_snippets)
+    if coverage == 0.0 and len(context_snippets) >= 2:
+        return True, 0.85, (
+            "Not grounded in the materials: use the slides' terminology and cover the main "
+            "points of the excerpts."
+        )
+    if (
+        low <= word_count <= high
+        and coverage == 1.0
+        and _GATE_NEXT_STEP_RX.search(response_lower[-_GATE_TAIL_CHARS:])
+    ):
+        return False, 0.9, ""
+    return False, 0.5, ""
+
+
+@functools.lru_cache(maxsize=1024)
+def _snippet_top_terms(snippet: str) -> FrozenSet[str]:
+    """A snippet's most frequent terms (snippets recur across a deck's answers, so memoized)."""
+    counts = Counter(_GATE_WORD_RX.findall(snippet.lower()))
+    return frozenset(term for term, _ in counts.most_common(_GATE_TERMS_PER_SNIPPET))
+
+
+def _snippet_term_coverage(response_lower: str, context_snippets: List[str]) -> float:
+    """Share of snippets (of the first 5) whose most frequent terms the response uses."""
+    response_terms = set(_GATE_WORD_RX.findall(response_lower))
+    checked = covered = 0
+    for snippet in context_snippets[:5]:
+        top_terms = _snippet_top_terms(snippet)
+        if top_terms:
+            checked += 1
+            covered += not response_terms.isdisjoint(top_terms)
+    return covered / checked if checked else 1.0
+
+
+def _covers_snippet_terms(response_lower: str, context_snippets: List[str]) -> bool:
+    """The response uses at least one of each snippet's most frequent terms."""
+    return _snippet_term_coverage(response_lower, context_snippets) == 1.0
+
+
+def passes_quick_edge_gate(
+    response: str,
+    topic_a: str,
+    topic_b: str,
+    context_snippets: Optional[List[str]],
+) -> bool:
+    """
+    Cheap checks that a connection answer can be shown before it is reviewed: one
+    paragraph's length, both topics named, and the excerpts' key terms used.
+    """
+    if not context_snippets:
+        return False
+    low, high = _EDGE_GATE_WORD_RANGE
+    if not low <= len(response.split()) <= high:
+        return False
+    response_lower = response.lower()
+    if topic_a.lower() not in response_lower or topic_b.lower() not in response_lower:
+        return False
+    return _covers_snippet_terms(response_lower, context_snippets)
+
+
+def passes_quick_topic_gate(
+    response: str,
+    context_snippets: Optional[List[str]],
+    importance_label: str,
+) -> bool:
+    """
+    Whether a topic answer can be shown before it is reviewed: grounded in excerpts and
+    not clearly failing the cheap classifier.
+    """
+    if not context_snippets:
+        return False
+    needs_revision, confidence, _ = _cheap_classify(response, context_snippets, importance_label)
+    return not (needs_revision and confidence >= _CLASSIFY_CONFIDENCE)
 
 
 def evaluate_and_revise_topic_response(
@@ -315,52 +979,115 @@ def evaluate_and_revise_topic_response(
     Evaluate a topic response and revise it if needed.
     Returns the perfected response (student never sees evaluation).
     """
-    eval_chain = _get_evaluator_chain("topic")
-    
-    context_text = "None provided"
-    if context_snippets:
-        context_text = "\n".join([f"- {snippet[:200]}..." for snippet in context_snippets[:5]])
-    
-    # Step 1: Evaluate
-    eval_text = eval_chain.invoke({
-        "topic_name": topic_name,
-        "importance_label": importance_label,
-        "user_question": user_question,
-        "context_snippets": context_text,
-        "generated_response": generated_response,
+    needs_revision, confidence, notes = _cheap_classify(generated_response, context_snippets, importance_label)
+    inputs = _topic_inputs(topic_name, importance_label, user_question, context_snippets)
+    if confidence >= _CLASSIFY_CONFIDENCE:
+        if not needs_revision:
+            return generated_response
+        return _revise_directly("topic", inputs, generated_response, notes)
+    return _evaluate_and_revise(
+        "topic", inputs, generated_response, "Improve clarity, correctness, and completeness."
+    )
+
+
+def evaluate_and_revise_topic_response_stream(
+    topic_name: str,
+    importance_label: str,
+    user_question: str,
+    generated_response: str,
+    context_snippets: Optional[List[str]] = None,
+) -> Iterator[str]:
+    """Streaming evaluate_and_revise_topic_response: yields the perfected response as it is generated."""
+    needs_revision, confidence, notes = _cheap_classify(generated_response, context_snippets, importance_label)
+    inputs = _topic_inputs(topic_name, importance_label, user_question, context_snippets)
+    if confidence >= _CLASSIFY_CONFIDENCE:
+        if not needs_revision:
+            yield generated_response
+        else:
+            yield from _revise_directly_stream("topic", inputs, generated_response, notes)
+        return
+    yield from _evaluate_and_revise_stream(
+        "topic", inputs, generated_response, "Improve clarity, correctness, and completeness."
+    )
+
+
+def _format_batch_item(number: int, inputs: Dict[str, Any], generated_response: str) -> str:
+    return (
+        f"### Response {number}\n"
+        f"Topic: {inputs['topic_name']}\n"
+        f"Importance: {inputs['importance_label']}\n"
+        f"Question: {inputs['user_question']}\n"
+        f"Context:\n{inputs['context_snippets']}\n\n"
+        f"Tutor's Response:\n{generated_response}"
+    )
+
+
+def _evaluate_topic_group(group: List[Tuple[Dict[str, Any], str]]) -> List[str]:
+    """One evaluator call for up to _BATCH_SIZE responses, then their revisions in parallel."""
+    batch_evaluation = _get_evaluator_chain("topic_batch").invoke({
+        "responses": "\n\n".join(
+            _format_batch_item(i, inputs, response) for i, (inputs, response) in enumerate(group, 1)
+        ),
     })
+    evaluations = batch_evaluation.get("evaluations")
+    if not isinstance(evaluations, list) or len(evaluations) != len(group):
+        # Unusable batch answer: review these one by one instead
+        return [
+            _evaluate_and_revise("topic", inputs, response, "Improve clarity, correctness, and completeness.")
+            for inputs, response in group
+        ]
     
-    evaluation = _parse_json_response(eval_text)
-    
-    # Step 2: Check if revision needed
-    needs_revision = evaluation.get("needs_revision", False)
-    
-    # Also check if any score < 4
-    if not needs_revision:
-        for key, value in evaluation.items():
-            if key not in ["needs_revision", "revision_notes"] and isinstance(value, dict):
-                score = value.get("score")
-                if score is not None and score < 4:
-                    needs_revision = True
-                    break
+    rev_chain = _get_revision_chain("topic")
+    revisions = {}
+    for i, ((inputs, response), evaluation) in enumerate(zip(group, evaluations)):
+        if not isinstance(evaluation, dict) or _needs_revision(evaluation):
+            notes = evaluation.get("revision_notes") if isinstance(evaluation, dict) else None
+            revisions[i] = _speculation_pool.submit(rev_chain.invoke, {
+                **inputs,
+                "original_response": response,
+                "revision_notes": notes or "Improve clarity, correctness, and completeness.",
+            })
     
-    # Step 3: Revise if needed
-    if needs_revision:
-        revision_notes = evaluation.get("revision_notes", "Improve clarity, correctness, and completeness.")
-        rev_chain = _get_revision_chain("topic")
-        
-        perfected_response = rev_chain.invoke({
-            "topic_name": topic_name,
-            "importance_label": importance_label,
-            "user_question": user_question,
-            "context_snippets": context_text,
-            "original_response": generated_response,
-            "revision_notes": revision_notes,
-        })
-        return perfected_response.strip()
+    results = []
+    for i, (inputs, response) in enumerate(group):
+        result = revisions[i].result().strip() if i in revisions else response
+        _store_result(_result_key("topic", inputs, response), result)
+        results.append(result)
+    return results
+
+
+def evaluate_and_revise_topic_responses_batch(items: List[Dict[str, Any]]) -> List[str]:
+    """
+    evaluate_and_revise_topic_response for several responses at once (e.g. one per topic).
+    Items take the same keyword arguments. Responses the cheap classifier passes or that are
+    cached are returned as-is; the rest are reviewed _BATCH_SIZE per evaluator call.
+    """
+    results: List[Optional[str]] = [None] * len(items)
+    pending: List[Tuple[int, Dict[str, Any], str]] = []
+    for i, item in enumerate(items):
+        response = item["generated_response"]
+        context_snippets = item.get("context_snippets")
+        needs_revision, confidence, _ = _cheap_classify(response, context_snippets, item["importance_label"])
+        if confidence >= _CLASSIFY_CONFIDENCE and not needs_revision:
+            results[i] = response
+            continue
+        inputs = _topic_inputs(item["topic_name"], item["importance_label"], item["user_question"], context_snippets)
+        cached = _cached_result(_result_key("topic", inputs, response))
+        if cached is not None:
+            results[i] = cached
+        else:
+            pending.append((i, inputs, response))
     
-    # Response is good, return as-is
-    return generated_response
+    for start in range(0, len(pending), _BATCH_SIZE):
+        group = pending[start:start + _BATCH_SIZE]
+        if len(group) == 1:
+            _, inputs, response = group[0]
+            reviewed = [_evaluate_and_revise("topic", inputs, response, "Improve clarity, correctness, and completeness.")]
+        else:
+            reviewed = _evaluate_topic_group([(inputs, response) for _, inputs, response in group])
+        for (i, _, _), result in zip(group, reviewed):
+            results[i] = result
+    return results
 
 
 def evaluate_and_revise_edge_response(
@@ -371,46 +1098,28 @@ def evaluate_and_revise_edge_response(
     context_snippets: Optional[List[str]] = None,
 ) -> str:
     """Evaluate and revise edge explanation. Returns perfected response."""
-    eval_chain = _get_evaluator_chain("edge")
-    
-    context_text = "None provided"
-    if context_snippets:
-        context_text = "\n".join([f"- {snippet[:200]}..." for snippet in context_snippets[:5]])
-    
-    eval_text = eval_chain.invoke({
-        "topic_a": topic_a,
-        "topic_b": topic_b,
-        "edge_signals": edge_signals,
-        "context_snippets": context_text,
-        "generated_response": generated_response,
-    })
-    
-    evaluation = _parse_json_response(eval_text)
-    needs_revision = evaluation.get("needs_revision", False)
-    
-    if not needs_revision:
-        for key, value in evaluation.items():
-            if key not in ["needs_revision", "revision_notes"] and isinstance(value, dict):
-                score = value.get("score")
-                if score is not None and score < 4:
-                    needs_revision = True
-                    break
-    
-    if needs_revision:
-        revision_notes = evaluation.get("revision_notes", "Improve clarity and accuracy.")
-        rev_chain = _get_revision_chain("edge")
-        
-        perfected_response = rev_chain.invoke({
-            "topic_a": topic_a,
-            "topic_b": topic_b,
-            "edge_signals": edge_signals,
-            "context_snippets": context_text,
-            "original_response": generated_response,
-            "revision_notes": revision_notes,
-        })
-        return perfected_response.strip()
-    
-    return generated_response
+    return _evaluate_and_revise(
+        "edge",
+        _edge_inputs(topic_a, topic_b, edge_signals, context_snippets),
+        generated_response,
+        "Improve clarity and accuracy.",
+    )
+
+
+def evaluate_and_revise_edge_response_stream(
+    topic_a: str,
+    topic_b: str,
+    edge_signals: str,
+    generated_response: str,
+    context_snippets: Optional[List[str]] = None,
+) -> Iterator[str]:
+    """Streaming evaluate_and_revise_edge_response."""
+    yield from _evaluate_and_revise_stream(
+        "edge",
+        _edge_inputs(topic_a, topic_b, edge_signals, context_snippets),
+        generated_response,
+        "Improve clarity and accuracy.",
+    )
 
 
 def evaluate_and_revise_ranking_response(
@@ -419,38 +1128,12 @@ def evaluate_and_revise_ranking_response(
     generated_response: str,
 ) -> str:
     """Evaluate and revise ranking advice. Returns perfected response."""
-    eval_chain = _get_evaluator_chain("ranking")
-    
-    eval_text = eval_chain.invoke({
-        "topic_list": topic_list,
-        "user_question": user_question,
-        "generated_response": generated_response,
-    })
-    
-    evaluation = _parse_json_response(eval_text)
-    needs_revision = evaluation.get("needs_revision", False)
-    
-    if not needs_revision:
-        for key, value in evaluation.items():
-            if key not in ["needs_revision", "revision_notes"] and isinstance(value, dict):
-                score = value.get("score")
-                if score is not None and score < 4:
-                    needs_revision = True
-                    break
-    
-    if needs_revision:
-        revision_notes = evaluation.get("revision_notes", "Improve clarity and accuracy.")
-        rev_chain = _get_revision_chain("ranking")
-        
-        perfected_response = rev_chain.invoke({
-            "topic_list": topic_list,
-            "user_question": user_question,
-            "original_response": generated_response,
-            "revision_notes": revision_notes,
-        })
-        return perfected_response.strip()
-    
-    return generated_response
+    return _evaluate_and_revise(
+        "ranking",
+        {"topic_list": topic_list, "user_question": user_question},
+        generated_response,
+        "Improve clarity and accuracy.",
+    )
 
 
 # Backward compatibility (will be removed after updating all callers)
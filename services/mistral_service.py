@@ -1,27 +1,184 @@
 # services/mistral_service.py
 import os
-from typing import Dict, List, Tuple, Optional
+import contextlib
+import hashlib
+import logging
+import sqlite3
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Tuple, Optional
 
 from dotenv import load_dotenv
 from langchain_mistralai import ChatMistralAI
+from langchain_core.caches import InMemoryCache
+from langchain_core.globals import set_llm_cache
+from langchain_core.messages import SystemMessage
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 
-from services.evaluation_service import evaluate_and_revise_topic_response
+# Persistent LLM cache when langchain-community is installed (in-memory otherwise)
+try:
+    from langchain_community.cache import SQLiteCache
+    HAS_SQLITE_CACHE = True
+except ImportError:
+    HAS_SQLITE_CACHE = False
+
+from services.evaluation_service import (
+    RevisionInterrupted,
+    _get_http_clients,
+    evaluate_and_revise_topic_response,
+    evaluate_and_revise_topic_response_stream,
+    passes_quick_topic_gate,
+)
+from services.semantic_cache import SemanticCache
 
 # Load environment variables from .env file
 load_dotenv()
 
-# We keep a single global chain so it's not rebuilt every time
+logger = logging.getLogger(__name__)
+
+# Process-wide LangChain LLM cache: an identical prompt to an identically configured
+# deterministic model (evaluator, revision, topic analysis, concept map) is answered
+# locally instead of over the API. Conversational chains opt out with cache=False on
+# their ChatMistralAI: the tutors send the same follow-up prompts ("continue", "explain
+# it differently") turn after turn and need a new answer each time.
+# Bump the version when a prompt, rubric or parser changes: answers cached for the old
+# ones are then dropped instead of served (other versions' files are deleted at startup)
+_LLM_CACHE_VERSION = 2
+_LLM_CACHE_DIR = ".cache"
+_LLM_CACHE_PATH = os.path.join(_LLM_CACHE_DIR, f"llm_cache.v{_LLM_CACHE_VERSION}.db")
+# Cached responses kept at startup; older rows beyond this are deleted
+_LLM_CACHE_MAX_ROWS = 20000
+
+
+def _prune_llm_cache() -> None:
+    """Delete other versions' cache files and keep only the newest _LLM_CACHE_MAX_ROWS responses."""
+    current = os.path.basename(_LLM_CACHE_PATH)
+    for name in os.listdir(_LLM_CACHE_DIR):
+        if name.startswith("llm_cache") and name.endswith(".db") and name != current:
+            try:
+                os.remove(os.path.join(_LLM_CACHE_DIR, name))
+            except OSError:
+                pass
+    if not os.path.exists(_LLM_CACHE_PATH):
+        return
+    # SQLiteCache's table; rowids grow with insertion, so the smallest are the oldest
+    with contextlib.closing(sqlite3.connect(_LLM_CACHE_PATH)) as conn, conn:
+        conn.execute(
+            "DELETE FROM full_llm_cache WHERE rowid <= "
+            "(SELECT rowid FROM full_llm_cache ORDER BY rowid DESC LIMIT 1 OFFSET ?)",
+            (_LLM_CACHE_MAX_ROWS,),
+        )
+
+
+def _install_llm_cache() -> None:
+    if HAS_SQLITE_CACHE:
+        try:
+            os.makedirs(_LLM_CACHE_DIR, exist_ok=True)
+            _prune_llm_cache()
+        except Exception:
+            logger.warning("Could not prune the LLM cache at %s", _LLM_CACHE_PATH, exc_info=True)
+        try:
+            set_llm_cache(SQLiteCache(database_path=_LLM_CACHE_PATH))
+            return
+        except Exception:
+            logger.warning("Could not open the LLM cache at %s (using memory)", _LLM_CACHE_PATH, exc_info=True)
+    set_llm_cache(InMemoryCache())
+
+
+_install_llm_cache()
+
+# We keep single global chains so they're not rebuilt every time
 _topic_chain = None
+_rag_topic_chain = None
 
+# Perfected answers by (topic, importance, excerpts): a paraphrase of a question
+# already answered ("explain backprop" / "what is backpropagation?") gets the stored
+# answer back, skipping both the tutor and the evaluator call. Only standalone
+# questions belong here - generated follow-ups ("continue", "explain it differently")
+# repeat word for word but need a new answer each turn (use_answer_cache=False)
+_answer_cache = SemanticCache(threshold=0.92, max_per_namespace=200)
 
-def _build_topic_chain():
-    """
-    Build a LangChain Runnable that:
-    - uses a friendly, reassuring tutor persona
-    - explains a specific topic at exam-appropriate depth
-    """
+# Reviews by hash of the draft: a draft seen before (e.g. served from the LLM cache)
+# gets its earlier review back without another evaluator call
+_REVIEWED_DRAFTS_SIZE = 512
+_reviewed_drafts: "OrderedDict[str, str]" = OrderedDict()
+_reviewed_drafts_lock = threading.Lock()
+
+# Drafts shown before review are reviewed here; revisions wait (by hash of the draft)
+# for the UI to swap them in
+_background_review_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="topic-review")
+_SUGGESTED_CORRECTIONS_SIZE = 256
+_suggested_corrections: "OrderedDict[str, str]" = OrderedDict()
+_suggested_corrections_lock = threading.Lock()
+
+
+# Tutor personas, kept as constants so every request starts with a byte-identical
+# system prompt (providers that cache prompt prefixes can reuse it)
+_TUTOR_SYSTEM_PROMPT = (
+    "You are a really smart student friend who understood the whole lecture perfectly. "
+    "You're explaining things to another student - you know a LOT about the topic, but you talk simply because you're a student too. "
+    "You're like that one student who can explain the whole lecture in a day while the teacher took two months.\n\n"
+    "**Key principles (MAINTAIN CONSISTENT QUALITY):**\n"
+    "- You're SMART and know the material deeply, but explain it simply like a friend would.\n"
+    "- Use SIMPLE, EASY-TO-READ language. Avoid complicated words. Write like you're talking to a friend.\n"
+    "- Be VERY friendly and reassuring. Make the student feel calm and confident.\n"
+    "- Give PROPER, DETAILED explanations - not just bullet points. Use full paragraphs and explanations.\n"
+    "- For exam-critical or core topics: go into the right depth - explain concepts, how they work, why they matter.\n"
+    "- For extra topics: keep it simpler and more conceptual.\n"
+    "- Filter out unnecessary or overly complicated details that don't appear in exam questions.\n"
+    "- Match the depth to what is actually needed for the exam based on the topic importance.\n"
+    "- **CRITICAL: Maintain the SAME high quality in EVERY response, regardless of how many questions the student asks.**\n"
+    "- **CRITICAL: Be accurate, consistent, and thorough in ALL your answers - quality should never degrade.**\n"
+    "- **CRITICAL: Always ground your answers in the provided context snippets - never make up information.**\n"
+    "- **CRITICAL: If you're uncertain about something, acknowledge it honestly rather than guessing.**\n\n"
+    "**CRITICAL FORMATTING REQUIREMENTS:**\n"
+    "1. After your main explanation, you MUST include a clearly separated section with this EXACT heading: **📋 What I Didn't Mention from the Slides**\n"
+    "   - In this section, you MUST list ALL topics, teachings, concepts, subtopics, examples, edge cases, and details from the slides that you didn't include.\n"
+    "   - Be COMPREHENSIVE - mention everything from the slides that was filtered out.\n"
+    "   - For each item, briefly explain why it wasn't included (usually because it doesn't appear in exam questions).\n"
+    "   - Format the heading in BOLD (**text**) and ensure the section is clearly separated with blank lines.\n\n"
+    "2. At the very end, you MUST include another clearly separated section with this EXACT heading: **🎯 What You Can Do Next**\n"
+    "   - List these options: a) deeper understanding (include the removed parts), b) more conceptual explanation if it's hard to understand, c) practice questions.\n"
+    "   - Format the heading in BOLD (**text**) and make it visually distinct.\n"
+    "   - Ensure this section is clearly separated from the previous section with blank lines."
+)
+
+# Progressive, one-part-at-a-time persona used when answering from uploaded excerpts
+_RAG_TUTOR_SYSTEM_PROMPT = (
+    "You are a really smart student friend who understood the whole lecture perfectly. "
+    "You're explaining things to another student - you know a LOT about the topic, but you talk simply because you're a student too.\n\n"
+    "**CRITICAL: PROGRESSIVE EXPLANATION APPROACH**\n"
+    "When a student asks you to teach them about a topic:\n"
+    "1. FIRST response: Give just ONE small paragraph (3-4 sentences) with a brief overview of the topic.\n"
+    "2. Add a tiny 2-sentence summary starting with 'In summary:' that tells them exactly what they need to know.\n"
+    "3. End with: 'Would you like to continue learning about this topic, or do you want to understand this part better before moving on?'\n"
+    "4. Wait for the student to say they want to continue before explaining more.\n"
+    "5. When they continue, explain the next aspect in ONE paragraph + summary, then ask if they want to continue.\n"
+    "6. Continue this pattern until you've explained everything about the topic.\n"
+    "7. At the very end, say: 'I've told you everything you need to know about this topic. Let me know if you want to learn about a new topic or if you want some practice questions.'\n\n"
+    "**IMPORTANT:**\n"
+    "- NEVER give one big message with multiple parts (A, B, C, D) all at once.\n"
+    "- Start with just a brief overview, then wait for the student to continue.\n"
+    "- Each response should be ONE paragraph + summary + question to continue.\n"
+    "- Keep responses SHORT and COMPACT - students don't like huge text blocks.\n\n"
+    "**Key principles:**\n"
+    "- You're SMART and know the material deeply, but explain it simply like a friend would.\n"
+    "- Use SIMPLE, EASY-TO-READ language. Avoid complicated words.\n"
+    "- Be VERY friendly and reassuring. Make the student feel calm and confident.\n"
+    "- For exam-critical or core topics: go into the right depth - explain concepts, how they work, why they matter.\n"
+    "- For extra topics: keep it simpler and more conceptual.\n"
+    "- Filter out unnecessary or overly complicated details that don't appear in exam questions.\n"
+    "- Use the provided context from their materials to ground your answer in what they actually uploaded.\n"
+    "- **CRITICAL: Always ground your answers in the provided context snippets - never make up information.**\n"
+    "- **CRITICAL: If you're uncertain about something, acknowledge it honestly rather than guessing.**\n"
+    "- **CRITICAL: Break complex topics into logical parts - don't overwhelm the student with everything at once.**"
+)
+
+
+def _build_tutor_llm() -> ChatMistralAI:
+    """Tutor model shared by both topic chains, on the evaluator's connection pool."""
     # Get API key from environment (supports both .env file and env vars)
     api_key = os.environ.get("MISTRAL_API_KEY")
     if not api_key:
@@ -30,46 +187,29 @@ def _build_topic_chain():
             "Please create a .env file with MISTRAL_API_KEY=your_key or export it as an environment variable."
         )
 
-    llm = ChatMistralAI(
+    client, async_client = _get_http_clients(api_key)
+    return ChatMistralAI(
         model="mistral-small-latest",  # or "mistral-large-latest" if you prefer
         temperature=0.3,
+        cache=False,  # Repeated follow-up prompts need fresh answers: never served from the LLM cache
         max_retries=2,
         api_key=api_key,  # Explicitly pass the API key
+        client=client,
+        async_client=async_client,
     )
 
+
+def _build_topic_chain():
+    """
+    Build a LangChain Runnable that:
+    - uses a friendly, reassuring tutor persona
+    - explains a specific topic at exam-appropriate depth
+    """
+    llm = _build_tutor_llm()
+
     prompt = ChatPromptTemplate.from_messages(
         [
-                (
-                    "system",
-                    (
-                        "You are a really smart student friend who understood the whole lecture perfectly. "
-                        "You're explaining things to another student - you know a LOT about the topic, but you talk simply because you're a student too. "
-                        "You're like that one student who can explain the whole lecture in a day while the teacher took two months.\n\n"
-                        "**Key principles (MAINTAIN CONSISTENT QUALITY):**\n"
-                        "- You're SMART and know the material deeply, but explain it simply like a friend would.\n"
-                        "- Use SIMPLE, EASY-TO-READ language. Avoid complicated words. Write like you're talking to a friend.\n"
-                        "- Be VERY friendly and reassuring. Make the student feel calm and confident.\n"
-                        "- Give PROPER, DETAILED explanations - not just bullet points. Use full paragraphs and explanations.\n"
-                        "- For exam-critical or core topics: go into the right depth - explain concepts, how they work, why they matter.\n"
-                        "- For extra topics: keep it simpler and more conceptual.\n"
-                        "- Filter out unnecessary or overly complicated details that don't appear in exam questions.\n"
-                        "- Match the depth to what is actually needed for the exam based on the topic importance.\n"
-                        "- **CRITICAL: Maintain the SAME high quality in EVERY response, regardless of how many questions the student asks.**\n"
-                        "- **CRITICAL: Be accurate, consistent, and thorough in ALL your answers - quality should never degrade.**\n"
-                        "- **CRITICAL: Always ground your answers in the provided context snippets - never make up information.**\n"
-                        "- **CRITICAL: If you're uncertain about something, acknowledge it honestly rather than guessing.**\n\n"
-                        "**CRITICAL FORMATTING REQUIREMENTS:**\n"
-                        "1. After your main explanation, you MUST include a clearly separated section with this EXACT heading: **📋 What I Didn't Mention from the Slides**\n"
-                        "   - In this section, you MUST list ALL topics, teachings, concepts, subtopics, examples, edge cases, and details from the slides that you didn't include.\n"
-                        "   - Be COMPREHENSIVE - mention everything from the slides that was filtered out.\n"
-                        "   - For each item, briefly explain why it wasn't included (usually because it doesn't appear in exam questions).\n"
-                        "   - Format the heading in BOLD (**text**) and ensure the section is clearly separated with blank lines.\n\n"
-                        "2. At the very end, you MUST include another clearly separated section with this EXACT heading: **🎯 What You Can Do Next**\n"
-                        "   - List these options: a) deeper understanding (include the removed parts), b) more conceptual explanation if it's hard to understand, c) practice questions.\n"
-                        "   - Format the heading in BOLD (**text**) and make it visually distinct.\n"
-                        "   - Ensure this section is clearly separated from the previous section with blank lines."
-                    ),
-                ),
+            SystemMessage(content=_TUTOR_SYSTEM_PROMPT),
             (
                 "human",
                 (
@@ -94,104 +234,140 @@ def _get_topic_chain():
     return _topic_chain
 
 
-def ask_mistral_about_topic(
-    topic_name: str, 
-    importance_label: str, 
-    question: str, 
-    context_snippets: List[str] = None,
-) -> str:
+def _build_rag_topic_chain():
+    """Tutor chain that answers from excerpts of the student's uploaded materials."""
+    llm = _build_tutor_llm()
+
+    prompt = ChatPromptTemplate.from_messages(
+        [
+            SystemMessage(content=_RAG_TUTOR_SYSTEM_PROMPT),
+            (
+                "human",
+                (
+                    "Answer directly to the student, using the context when relevant.\n\n"
+                    "Current topic: {topic_name}\n"
+                    "Topic importance: {importance_label}\n\n"
+                    "Student question:\n{question}\n\n"
+                    "{context}"
+                ),
+            ),
+        ]
+    )
+
+    parser = StrOutputParser()
+    return prompt | llm | parser
+
+
+def _get_rag_topic_chain():
+    global _rag_topic_chain
+    if _rag_topic_chain is None:
+        _rag_topic_chain = _build_rag_topic_chain()
+    return _rag_topic_chain
+
+
+def _prepare_topic_call(
+    topic_name: str,
+    importance_label: str,
+    question: str,
+    context_snippets: Optional[List[str]] = None,
+) -> Tuple[object, Dict[str, str]]:
     """
-    Helper used by the topic tutor chat.
-    Now supports RAG with context snippets.
-    
-    The response is automatically evaluated and revised by the quality assurance evaluator
-    before being returned. Students only see perfected responses.
-    
-    Returns:
-        Perfected response string (evaluated and revised if needed)
+    Pick the tutor chain (with or without RAG context) and build its inputs.
+    Shared by the blocking and streaming entry points.
     """
-    # Build context text if snippets provided
-    context_text = ""
     if context_snippets:
+        # Build context text from the snippets
         context_text = "\n\nRelevant excerpts from your materials:\n"
         for i, snippet in enumerate(context_snippets[:3], 1):
             context_text += f"\n[{i}] {snippet[:300]}...\n"
-    
-    # Update prompt to include context
-    if context_snippets:
-        prompt = ChatPromptTemplate.from_messages(
-            [
-                    (
-                        "system",
-                        (
-                            "You are a really smart student friend who understood the whole lecture perfectly. "
-                            "You're explaining things to another student - you know a LOT about the topic, but you talk simply because you're a student too.\n\n"
-                            "**CRITICAL: PROGRESSIVE EXPLANATION APPROACH**\n"
-                            "When a student asks you to teach them about a topic:\n"
-                            "1. FIRST response: Give just ONE small paragraph (3-4 sentences) with a brief overview of the topic.\n"
-                            "2. Add a tiny 2-sentence summary starting with 'In summary:' that tells them exactly what they need to know.\n"
-                            "3. End with: 'Would you like to continue learning about this topic, or do you want to understand this part better before moving on?'\n"
-                            "4. Wait for the student to say they want to continue before explaining more.\n"
-                            "5. When they continue, explain the next aspect in ONE paragraph + summary, then ask if they want to continue.\n"
-                            "6. Continue this pattern until you've explained everything about the topic.\n"
-                            "7. At the very end, say: 'I've told you everything you need to know about this topic. Let me know if you want to learn about a new topic or if you want some practice questions.'\n\n"
-                            "**IMPORTANT:**\n"
-                            "- NEVER give one big message with multiple parts (A, B, C, D) all at once.\n"
-                            "- Start with just a brief overview, then wait for the student to continue.\n"
-                            "- Each response should be ONE paragraph + summary + question to continue.\n"
-                            "- Keep responses SHORT and COMPACT - students don't like huge text blocks.\n\n"
-                            "**Key principles:**\n"
-                            "- You're SMART and know the material deeply, but explain it simply like a friend would.\n"
-                            "- Use SIMPLE, EASY-TO-READ language. Avoid complicated words.\n"
-                            "- Be VERY friendly and reassuring. Make the student feel calm and confident.\n"
-                            "- For exam-critical or core topics: go into the right depth - explain concepts, how they work, why they matter.\n"
-                            "- For extra topics: keep it simpler and more conceptual.\n"
-                            "- Filter out unnecessary or overly complicated details that don't appear in exam questions.\n"
-                            "- Use the provided context from their materials to ground your answer in what they actually uploaded.\n"
-                            "- **CRITICAL: Always ground your answers in the provided context snippets - never make up information.**\n"
-                            "- **CRITICAL: If you're uncertain about something, acknowledge it honestly rather than guessing.**\n"
-                            "- **CRITICAL: Break complex topics into logical parts - don't overwhelm the student with everything at once.**"
-                        ),
-                    ),
-                (
-                    "human",
-                    (
-                        "Current topic: {topic_name}\n"
-                        "Topic importance: {importance_label}\n\n"
-                        "{context}\n\n"
-                        "Student question:\n{question}\n\n"
-                        "Answer directly to the student, using the context when relevant."
-                    ),
-                ),
-            ]
-        )
         
-        parser = StrOutputParser()
-        llm = ChatMistralAI(
-            model="mistral-small-latest",
-            temperature=0.3,
-            max_retries=2,
-            api_key=os.environ.get("MISTRAL_API_KEY"),
-        )
-        chain = prompt | llm | parser
-        
-        answer = chain.invoke({
+        chain = _get_rag_topic_chain()
+        inputs: Dict[str, str] = {
             "topic_name": topic_name,
             "importance_label": importance_label,
             "context": context_text,
             "question": question,
-        })
+        }
     else:
         # Original behavior without context
         chain = _get_topic_chain()
-        inputs: Dict[str, str] = {
+        inputs = {
             "topic_name": topic_name,
             "importance_label": importance_label,
             "question": question,
         }
-        answer = chain.invoke(inputs)
+    return chain, inputs
+
+
+def _cache_namespace(
+    topic_name: str,
+    importance_label: str,
+    context_snippets: Optional[List[str]],
+) -> Tuple[str, str, str]:
+    """Answers are only shared between questions about the same topic and excerpts."""
+    h = hashlib.blake2b(digest_size=16)
+    # Only the excerpts the tutor actually sees (see _prepare_topic_call)
+    for snippet in (context_snippets or [])[:3]:
+        h.update(snippet[:300].encode("utf-8"))
+        h.update(b"\0")
+    return (topic_name.lower().strip(), importance_label, h.hexdigest())
+
+
+def cached_topic_answer(
+    topic_name: str,
+    importance_label: str,
+    question: str,
+    context_snippets: Optional[List[str]] = None,
+) -> Optional[str]:
+    """Perfected answer to this or a near-identical question, if one was already given."""
+    return _answer_cache.lookup(_cache_namespace(topic_name, importance_label, context_snippets), question)
+
+
+def _draft_key(answer: str) -> str:
+    return hashlib.blake2b(answer.strip().encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _reviewed_draft(answer: str) -> Optional[str]:
+    with _reviewed_drafts_lock:
+        return _reviewed_drafts.get(_draft_key(answer))
+
+
+def _remember_review(
+    topic_name: str,
+    importance_label: str,
+    question: str,
+    answer: str,
+    perfected_answer: str,
+    context_snippets: Optional[List[str]],
+    use_answer_cache: bool = True,
+) -> None:
+    """Keep a finished review for paraphrased questions and for the same draft."""
+    if use_answer_cache:
+        _answer_cache.add(
+            _cache_namespace(topic_name, importance_label, context_snippets), question, perfected_answer
+        )
+    with _reviewed_drafts_lock:
+        _reviewed_drafts[_draft_key(answer)] = perfected_answer
+        while len(_reviewed_drafts) > _REVIEWED_DRAFTS_SIZE:
+            _reviewed_drafts.popitem(last=False)
+
+
+def perfect_topic_answer(
+    topic_name: str,
+    importance_label: str,
+    question: str,
+    answer: str,
+    context_snippets: Optional[List[str]] = None,
+    use_answer_cache: bool = True,
+) -> str:
+    """
+    Run a generated answer through the quality assurance evaluator.
+    Falls back to the original answer if evaluation fails.
+    """
+    reviewed = _reviewed_draft(answer)
+    if reviewed is not None:
+        return reviewed
     
-    # Quality assurance: Evaluate and revise response before student sees it
     # The evaluator acts as a strict teaching assistant that perfects the response
     try:
         perfected_answer = evaluate_and_revise_topic_response(
@@ -201,8 +377,118 @@ def ask_mistral_about_topic(
             generated_response=answer,
             context_snippets=context_snippets,
         )
+        _remember_review(
+            topic_name, importance_label, question, answer, perfected_answer, context_snippets, use_answer_cache
+        )
         return perfected_answer
-    except Exception as e:
-        print(f"Evaluation/revision error (returning original): {e}")
+    except Exception:
+        logger.warning("Evaluation/revision failed, returning original answer", exc_info=True)
         # If evaluator fails, return original (shouldn't happen, but safety fallback)
         return answer
+
+
+def perfect_topic_answer_stream(
+    topic_name: str,
+    importance_label: str,
+    question: str,
+    answer: str,
+    context_snippets: Optional[List[str]] = None,
+    use_answer_cache: bool = True,
+) -> Iterator[str]:
+    """
+    Streaming perfect_topic_answer: yields the perfected answer as it is generated.
+    Falls back to the original answer if evaluation fails before anything was yielded,
+    and raises RevisionInterrupted if it fails after.
+    """
+    reviewed = _reviewed_draft(answer)
+    if reviewed is not None:
+        yield reviewed
+        return
+    
+    chunks: List[str] = []
+    try:
+        for chunk in evaluate_and_revise_topic_response_stream(
+            topic_name=topic_name,
+            importance_label=importance_label,
+            user_question=question,
+            generated_response=answer,
+            context_snippets=context_snippets,
+        ):
+            chunks.append(chunk)
+            yield chunk
+    except Exception as e:
+        logger.warning("Evaluation/revision failed, returning original answer", exc_info=True)
+        if chunks:
+            # Half a revision is already out: the caller redraws the draft instead
+            raise RevisionInterrupted(answer) from e
+        yield answer
+        return
+    _remember_review(
+        topic_name, importance_label, question, answer, "".join(chunks).strip(), context_snippets, use_answer_cache
+    )
+
+
+def _background_review(
+    topic_name: str,
+    importance_label: str,
+    question: str,
+    answer: str,
+    context_snippets: List[str],
+    use_answer_cache: bool,
+) -> None:
+    """Review a draft that was already shown; keep any revision as a suggested correction."""
+    perfected_answer = perfect_topic_answer(
+        topic_name, importance_label, question, answer, context_snippets, use_answer_cache
+    )
+    if perfected_answer.strip() != answer.strip():
+        with _suggested_corrections_lock:
+            _suggested_corrections[_draft_key(answer)] = perfected_answer
+            while len(_suggested_corrections) > _SUGGESTED_CORRECTIONS_SIZE:
+                _suggested_corrections.popitem(last=False)
+
+
+def review_topic_answer_in_background(
+    topic_name: str,
+    importance_label: str,
+    question: str,
+    answer: str,
+    context_snippets: Optional[List[str]] = None,
+    use_answer_cache: bool = True,
+) -> bool:
+    """
+    If the draft can be shown before it is reviewed (see passes_quick_topic_gate), start
+    its review in the background and return True; the caller shows the draft as is.
+    Drafts reviewed before return False, so the caller's perfect_topic_answer* call
+    hands back that review at once.
+    """
+    if _reviewed_draft(answer) is not None:
+        return False
+    if not passes_quick_topic_gate(answer, context_snippets, importance_label):
+        return False
+    _background_review_pool.submit(
+        _background_review,
+        topic_name, importance_label, question, answer, list(context_snippets), use_answer_cache,
+    )
+    return True
+
+
+def pop_suggested_topic_correction(answer: str) -> Optional[str]:
+    """Revised version of a draft that was shown before review, once its review found issues."""
+    with _suggested_corrections_lock:
+        return _suggested_corrections.pop(_draft_key(answer), None)
+
+
+def stream_mistral_about_topic(
+    topic_name: str,
+    importance_label: str,
+    question: str,
+    context_snippets: Optional[List[str]] = None,
+) -> Iterator[str]:
+    """
+    Helper used by the topic tutor chat (supports RAG with context snippets): yields
+    the raw answer as it is generated. Callers check cached_topic_answer() first, join
+    the chunks once and pass the full text through perfect_topic_answer*() (or
+    review_topic_answer_in_background) before storing it.
+    """
+    chain, inputs = _prepare_topic_call(topic_name, importance_label, question, context_snippets)
+    yield from chain.stream(inputs)
@@ -4,6 +4,7 @@ Generate practice questions for a topic.
 """
 
 import os
+import logging
 from typing import List, Tuple, Optional, Dict
 
 from dotenv import load_dotenv
@@ -11,10 +12,15 @@ from langchain_mistralai import ChatMistralAI
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 
-from services.evaluation_service import evaluate_and_revise_topic_response
+from services.evaluation_service import (
+    evaluate_and_revise_topic_response,
+    evaluate_and_revise_topic_responses_batch,
+)
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 _practice_chain = None
 
 
@@ -27,6 +33,7 @@ def _build_practice_chain():
     llm = ChatMistralAI(
         model="mistral-small-latest",
         temperature=0.7,  # Higher temperature for more natural, friend-like responses
+        cache=False,  # Varied answers: never served from the LLM cache
         max_retries=2,
         api_key=api_key,
     )
@@ -103,8 +110,33 @@ def generate_practice_questions(
             context_snippets=None,
         )
         return perfected_questions
-    except Exception as e:
-        print(f"Evaluation/revision error (returning original): {e}")
+    except Exception:
+        logger.warning("Evaluation/revision failed, returning original questions", exc_info=True)
         return questions
 
 
+def generate_practice_questions_batch(requests: List[Tuple[str, str]]) -> List[str]:
+    """
+    generate_practice_questions for several (topic_name, importance_label) pairs.
+    Generation runs in parallel and the evaluator reviews all sets in one call.
+    """
+    chain = _get_practice_chain()
+    all_questions = chain.batch([
+        {"topic_name": topic_name, "importance_label": importance_label}
+        for topic_name, importance_label in requests
+    ])
+    
+    try:
+        return evaluate_and_revise_topic_responses_batch([
+            {
+                "topic_name": topic_name,
+                "importance_label": importance_label,
+                "user_question": f"Generate practice exam questions for {topic_name}",
+                "generated_response": questions,
+                "context_snippets": None,
+            }
+            for (topic_name, importance_label), questions in zip(requests, all_questions)
+        ])
+    except Exception:
+        logger.warning("Evaluation/revision failed, returning original questions", exc_info=True)
+        return all_questions
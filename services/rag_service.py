@@ -4,9 +4,13 @@ Enhanced RAG: retrieve relevant text snippets using multiple signals.
 Uses direct mentions, semantic similarity, and structural importance.
 """
 
-from typing import List, Dict, Tuple, Optional, Any
+from typing import List, Dict, NamedTuple, Tuple, Optional, Any
+import os
 import re
-from collections import defaultdict
+import hashlib
+import logging
+import threading
+from collections import OrderedDict, defaultdict
 
 # Try to use sentence-transformers for semantic similarity, fallback to simple approach
 try:
@@ -18,18 +22,343 @@ except ImportError:
     HAS_EMBEDDINGS = False
     _embedding_model = None
 
+# Multi-pattern synonym matching in one pass per chunk; falls back to a substring loop
+try:
+    import ahocorasick
+    HAS_AHOCORASICK = True
+except ImportError:
+    HAS_AHOCORASICK = False
+
+# Vector index for large uploads; without it every chunk's similarity is computed directly
+try:
+    import faiss
+    HAS_FAISS = True
+except ImportError:
+    HAS_FAISS = False
+
+logger = logging.getLogger(__name__)
+
+
+# int8-quantized ONNX export of the same MiniLM model (needs sentence-transformers>=3.2
+# with onnxruntime); EMBEDDING_QUANTIZED=0 or any load failure uses the PyTorch model
+_EMBEDDING_MODEL_NAME = 'all-MiniLM-L6-v2'
+_QUANTIZED_EMBEDDINGS = os.environ.get("EMBEDDING_QUANTIZED", "").lower() not in ("0", "false", "no")
+_QUANTIZED_MODEL_FILE = "model_qint8_avx512_vnni.onnx"
+
+
+_embedding_model_lock = threading.Lock()
+
 
 def _get_embedding_model():
     """Get or create embedding model for semantic similarity."""
     global _embedding_model
     if HAS_EMBEDDINGS and _embedding_model is None:
-        try:
-            _embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
-        except Exception:
-            return None
+        # The warm-up thread and the first query may both get here; the model loads once
+        with _embedding_model_lock:
+            if _embedding_model is not None:
+                return _embedding_model
+            if _QUANTIZED_EMBEDDINGS:
+                try:
+                    _embedding_model = SentenceTransformer(
+                        _EMBEDDING_MODEL_NAME,
+                        backend="onnx",
+                        model_kwargs={"file_name": _QUANTIZED_MODEL_FILE},
+                    )
+                    return _embedding_model
+                except Exception:
+                    logger.warning("Quantized embedding model unavailable (using the full model)", exc_info=True)
+            try:
+                _embedding_model = SentenceTransformer(_EMBEDDING_MODEL_NAME)
+            except Exception:
+                return None
     return _embedding_model
 
 
+def _warm_up_embedding_model() -> None:
+    """Load the model and run one encode, so the first real query doesn't pay for either."""
+    model = _get_embedding_model()
+    if model is None:
+        return
+    try:
+        model.encode(["warm-up"], normalize_embeddings=True)
+    except Exception:
+        logger.warning("Embedding model warm-up failed", exc_info=True)
+
+
+# Off the import path, so the app starts as fast as before. DISABLE_EMBEDDING_WARMUP=1 skips it.
+if HAS_EMBEDDINGS and os.environ.get("DISABLE_EMBEDDING_WARMUP", "").lower() not in ("1", "true", "yes"):
+    threading.Thread(target=_warm_up_embedding_model, name="embedding-warmup", daemon=True).start()
+
+
+_SENTENCE_RX = re.compile(r'[.!?]\s+')
+_PARAGRAPH_RX = re.compile(r'\n\n+')
+_WORD_RX = re.compile(r'\S+')
+_TOKEN_RX = re.compile(r'\w+')
+# A chunk's source slide is the first one sharing a word trigram with its first words
+# (single common words like "the" matched nearly every slide)
+_NGRAM_WORDS = 3
+_OPENING_WORDS = 8
+# Chunks sharing this many leading characters are treated as duplicates
+_DEDUPE_KEY_CHARS = 80
+
+# Split and indexed uploads (see _get_document_index)
+_DOCUMENT_INDEX_CACHE_SIZE = 16
+_document_index_cache: "OrderedDict[str, Any]" = OrderedDict()
+_structural_index_cache: "OrderedDict[Tuple[str, Tuple], Any]" = OrderedDict()
+_document_index_lock = threading.Lock()
+
+# Chunks below this lexical/structural score skip the embedding model, unless too
+# few chunks reach it (one topic-word overlap scores 2)
+_SEMANTIC_MIN_LEXICAL_SCORE = 2.0
+
+# Uploads with at least this many chunks get a vector index (built once, over every
+# chunk) for their semantic-only matches instead of embedding all chunks per query
+_ANN_MIN_CHUNKS = 500
+_ann_index_cache: "OrderedDict[str, Any]" = OrderedDict()
+
+# Chunk embeddings by content hash: the same upload's chunks are encoded once and
+# reused for every topic and question asked about it
+_CHUNK_EMBEDDING_CACHE_SIZE = 8192
+_chunk_embedding_cache: "OrderedDict[str, Any]" = OrderedDict()
+_chunk_embedding_lock = threading.Lock()
+_ENCODE_BATCH_SIZE = 64
+# Chunks are embedded from their first characters only
+_EMBED_CHARS = 500
+
+
+def _embed_chunks(embedding_model, chunks: List["PreparedChunk"]):
+    """Unit-norm float32 embedding matrix (one row per chunk); only chunks not seen before are encoded, in one batch."""
+    keys = [chunk.embed_key for chunk in chunks]
+    with _chunk_embedding_lock:
+        found = {}
+        for key in keys:
+            vector = _chunk_embedding_cache.get(key)
+            if vector is not None:
+                _chunk_embedding_cache.move_to_end(key)
+                found[key] = vector
+    
+    missing: Dict[str, str] = {}
+    for chunk in chunks:
+        if chunk.embed_key not in found and chunk.embed_key not in missing:
+            missing[chunk.embed_key] = chunk.embed_text
+    if missing:
+        # float32 throughout, so the similarity product never upcasts to float64
+        vectors = np.asarray(
+            embedding_model.encode(
+                list(missing.values()),
+                batch_size=_ENCODE_BATCH_SIZE,
+                normalize_embeddings=True,
+                convert_to_numpy=True,
+            ),
+            dtype=np.float32,
+        )
+        new = dict(zip(missing.keys(), vectors))
+        found.update(new)
+        with _chunk_embedding_lock:
+            _chunk_embedding_cache.update(new)
+            while len(_chunk_embedding_cache) > _CHUNK_EMBEDDING_CACHE_SIZE:
+                _chunk_embedding_cache.popitem(last=False)
+    # vstack returns a fresh C-contiguous matrix for BLAS
+    return np.vstack([found[key] for key in keys])
+
+
+_EXAMPLE_KEYWORDS = ("example", "for instance", "consider", "suppose")
+
+
+def _word_ngrams(text_lower: str, limit: Optional[int] = None) -> List[Tuple[str, ...]]:
+    """
+    Word n-grams of a text (of its first `limit` words if given). Texts shorter than
+    _NGRAM_WORDS give a single n-gram of all their words.
+    """
+    words = _TOKEN_RX.findall(text_lower)
+    if limit is not None:
+        words = words[:limit]
+    if len(words) <= _NGRAM_WORDS:
+        return [tuple(words)] if words else []
+    return [tuple(words[i:i + _NGRAM_WORDS]) for i in range(len(words) - _NGRAM_WORDS + 1)]
+
+
+class SlideFileIndex(NamedTuple):
+    """One file's slides, prepared for the structural-importance signal."""
+    slides: List[Tuple[str, float]]  # (lowercased title, flag boost) per slide
+    first_slide: Dict[Tuple[str, ...], int]  # Word n-gram -> first slide containing it
+
+
+def _build_structural_index(structured_slides: Dict[str, List[Dict[str, Any]]]) -> List[SlideFileIndex]:
+    """
+    Per file, each slide's lowercased title and flag boost, and where each word n-gram
+    of the slides' text first appears. Learning objectives add 10 (highest), key
+    ideas/summary slides add 7.
+    """
+    index = []
+    for slides in structured_slides.values():
+        entries = []
+        first_slide: Dict[Tuple[str, ...], int] = {}
+        for position, slide in enumerate(slides):
+            title_lower = slide.get("title", "").lower()
+            flag_boost = 0.0
+            if slide.get("is_learning_objectives", False):
+                flag_boost += 10.0
+            if slide.get("is_key_ideas", False):
+                flag_boost += 7.0
+            entries.append((title_lower, flag_boost))
+            for ngram in _word_ngrams(title_lower + " " + slide.get("body", "").lower()):
+                first_slide.setdefault(ngram, position)
+        index.append(SlideFileIndex(entries, first_slide))
+    return index
+
+
+class PreparedChunk(NamedTuple):
+    """A candidate chunk's derived text, computed once before scoring."""
+    text: str
+    lower: str
+    words: frozenset  # Lowercased words (overlap with the topic)
+    opening_ngrams: Tuple[Tuple[str, ...], ...]  # Word n-grams of the opening (source-slide lookup)
+    embed_text: str  # The part of the chunk that is embedded
+    embed_key: str  # Hash of embed_text (chunk embedding cache key)
+
+
+def _prepare_chunks(chunks: List[str]) -> List[PreparedChunk]:
+    """Lowercase, split and truncate every chunk once instead of in each scoring step."""
+    prepared = []
+    for chunk in chunks:
+        chunk_lower = chunk.lower()
+        words = chunk_lower.split()
+        embed_text = chunk[:_EMBED_CHARS]
+        prepared.append(PreparedChunk(
+            chunk,
+            chunk_lower,
+            frozenset(words),
+            tuple(_word_ngrams(chunk_lower, _OPENING_WORDS)),
+            embed_text,
+            hashlib.blake2b(embed_text.encode("utf-8"), digest_size=16).hexdigest(),
+        ))
+    return prepared
+
+
+def _split_document(all_text: str) -> Tuple[List[str], List[str]]:
+    """Candidate chunks (paragraphs, then sentences not already in) and all sentences."""
+    # Split into sentences/chunks
+    sentences = _SENTENCE_RX.split(all_text)
+    # Also split by paragraphs for better chunks
+    paragraphs = _PARAGRAPH_RX.split(all_text)
+    
+    # Combine sentences and paragraphs, preferring paragraphs
+    chunks = []
+    seen_keys = set()
+    for para in paragraphs:
+        para = para.strip()
+        if len(para) > 50:  # Only meaningful paragraphs
+            chunks.append(para)
+            seen_keys.add(para[:_DEDUPE_KEY_CHARS])
+    # Add sentences that aren't already in as a paragraph or an earlier sentence
+    for sent in sentences:
+        sent = sent.strip()
+        if len(sent) > 30:
+            key = sent[:_DEDUPE_KEY_CHARS]
+            if key not in seen_keys:
+                seen_keys.add(key)
+                chunks.append(sent)
+    return chunks, sentences
+
+
+class DocumentIndex(NamedTuple):
+    """What retrieval derives from an upload's text alone."""
+    chunks: List[PreparedChunk]
+    sentences: List[Tuple[str, str]]  # (stripped sentence, lowercased) for co-occurrence lookups
+
+
+def _document_key(text_dict: Dict[str, str]) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    for path, text in text_dict.items():
+        h.update(path.encode("utf-8"))
+        h.update(b"\0")
+        h.update(text.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def _get_document_index(text_dict: Dict[str, str]) -> Tuple[str, DocumentIndex]:
+    """The upload's DocumentIndex (and its key), built on first use and then shared by every query."""
+    key = _document_key(text_dict)
+    with _document_index_lock:
+        document = _document_index_cache.get(key)
+        if document is not None:
+            _document_index_cache.move_to_end(key)
+            return key, document
+    
+    chunks, sentences = _split_document("\n\n".join(text_dict.values()))
+    document = DocumentIndex(
+        _prepare_chunks(chunks),
+        [(sentence.strip(), sentence.strip().lower()) for sentence in sentences],
+    )
+    with _document_index_lock:
+        _document_index_cache[key] = document
+        while len(_document_index_cache) > _DOCUMENT_INDEX_CACHE_SIZE:
+            _document_index_cache.popitem(last=False)
+    return key, document
+
+
+def _get_ann_index(document_key: str, chunks: List[PreparedChunk], embedding_model):
+    """Inner-product FAISS index over all of an upload's (unit-norm) chunk embeddings, built once."""
+    with _document_index_lock:
+        index = _ann_index_cache.get(document_key)
+        if index is not None:
+            _ann_index_cache.move_to_end(document_key)
+            return index
+    
+    embeddings = _embed_chunks(embedding_model, chunks)
+    index = faiss.IndexFlatIP(embeddings.shape[1])
+    index.add(embeddings)
+    with _document_index_lock:
+        _ann_index_cache[document_key] = index
+        while len(_ann_index_cache) > _DOCUMENT_INDEX_CACHE_SIZE:
+            _ann_index_cache.popitem(last=False)
+    return index
+
+
+def _get_structural_index(document_key: str, structured_slides: Dict[str, List[Dict[str, Any]]]):
+    """
+    Structural index for an upload, built once.
+    Slides come from the same files as the text, so they are told apart by the
+    document key and each file's slide count rather than by hashing every slide.
+    """
+    key = (document_key, tuple((path, len(slides)) for path, slides in structured_slides.items()))
+    with _document_index_lock:
+        entry = _structural_index_cache.get(key)
+        if entry is not None:
+            _structural_index_cache.move_to_end(key)
+            return entry
+    
+    entry = _build_structural_index(structured_slides)
+    with _document_index_lock:
+        _structural_index_cache[key] = entry
+        while len(_structural_index_cache) > _DOCUMENT_INDEX_CACHE_SIZE:
+            _structural_index_cache.popitem(last=False)
+    return entry
+
+
+def _structural_lookup(chunk: PreparedChunk, index: List[SlideFileIndex]) -> float:
+    """
+    Structural boost for a chunk: in each file, the first slide sharing a word n-gram
+    with the chunk's opening is taken as its source slide.
+    """
+    chunk_lower = chunk.lower
+    is_example = any(keyword in chunk_lower for keyword in _EXAMPLE_KEYWORDS)
+    boost = 0.0
+    for slides, first_slide in index:
+        positions = [first_slide[ngram] for ngram in chunk.opening_ngrams if ngram in first_slide]
+        if not positions:
+            continue
+        title_lower, flag_boost = slides[min(positions)]
+        if chunk_lower[:50] in title_lower:
+            boost += 8.0  # Title = very important
+        boost += flag_boost
+        if is_example:
+            boost += 3.0  # Examples = moderately important
+    return boost
+
+
 def _get_topic_synonyms(topic_name: str) -> List[str]:
     """
     Generate related terms/synonyms for a topic.
@@ -62,25 +391,50 @@ def _get_topic_synonyms(topic_name: str) -> List[str]:
     return list(set(synonyms))  # Remove duplicates
 
 
+def _build_synonym_matcher(topic_synonyms: List[str], topic_lower: str) -> Tuple[Dict[str, float], Any]:
+    """
+    Weight of each lowercased synonym (5 per listed form; the topic itself is scored
+    separately) and, with pyahocorasick, an automaton that finds them all in one pass.
+    """
+    weights: Dict[str, float] = {}
+    for synonym in topic_synonyms:
+        synonym_lower = synonym.lower()
+        if synonym_lower != topic_lower:
+            weights[synonym_lower] = weights.get(synonym_lower, 0.0) + 5.0
+    automaton = None
+    if HAS_AHOCORASICK and weights:
+        automaton = ahocorasick.Automaton()
+        for synonym_lower in weights:
+            automaton.add_word(synonym_lower, synonym_lower)
+        automaton.make_automaton()
+    return weights, automaton
+
+
+def _synonym_score(chunk_lower: str, weights: Dict[str, float], automaton: Any) -> float:
+    """Sum of the weights of the synonyms found in the chunk (each counted once)."""
+    if automaton is not None:
+        return sum(weights[synonym] for synonym in {match for _, match in automaton.iter(chunk_lower)})
+    return sum(weight for synonym, weight in weights.items() if synonym in chunk_lower)
+
+
 def _split_into_chunks(text: str, chunk_size: int = 500) -> List[str]:
-    """Split text into chunks."""
+    """
+    Split text into chunks of whole words, at most chunk_size characters each (a longer
+    single word becomes its own chunk). Each chunk is one slice of the original text,
+    so its spacing and punctuation are kept.
+    """
     chunks = []
-    words = text.split()
-    
-    current_chunk = []
-    current_length = 0
-    
-    for word in words:
-        if current_length + len(word) + 1 > chunk_size and current_chunk:
-            chunks.append(" ".join(current_chunk))
-            current_chunk = [word]
-            current_length = len(word)
-        else:
-            current_chunk.append(word)
-            current_length += len(word) + 1
+    start = end = None
+    for match in _WORD_RX.finditer(text):
+        if start is None:
+            start = match.start()
+        elif match.end() - start > chunk_size:
+            chunks.append(text[start:end])
+            start = match.start()
+        end = match.end()
     
-    if current_chunk:
-        chunks.append(" ".join(current_chunk))
+    if start is not None:
+        chunks.append(text[start:end])
     
     return chunks
 
@@ -103,39 +457,17 @@ def retrieve_relevant_snippets(
     topic_synonyms = _get_topic_synonyms(topic_name)
     topic_lower = topic_name.lower()
     topic_words = set(topic_lower.split())
+    synonym_weights, synonym_automaton = _build_synonym_matcher(topic_synonyms, topic_lower)
     
-    # Combine all text
-    all_text = "\n\n".join(text_dict.values())
+    # Chunks (and slide lookups) are derived once per upload, not per query
+    document_key, document = _get_document_index(text_dict)
+    prepared_chunks = document.chunks
+    structural_index = _get_structural_index(document_key, structured_slides) if structured_slides else None
     
-    # Split into sentences/chunks
-    sentences = re.split(r'[.!?]\s+', all_text)
-    # Also split by paragraphs for better chunks
-    paragraphs = re.split(r'\n\n+', all_text)
-    
-    # Combine sentences and paragraphs, preferring paragraphs
-    chunks = []
-    for para in paragraphs:
-        if len(para.strip()) > 50:  # Only meaningful paragraphs
-            chunks.append(para.strip())
-    # Add sentences that aren't in paragraphs
-    for sent in sentences:
-        if len(sent.strip()) > 30 and sent.strip() not in all_text[:1000]:  # Avoid duplicates
-            chunks.append(sent.strip())
-    
-    # Score chunks using three signals
-    scored_chunks = []
-    
-    # Get embeddings if available
-    embedding_model = _get_embedding_model()
-    topic_embedding = None
-    if embedding_model and HAS_EMBEDDINGS:
-        try:
-            topic_embedding = embedding_model.encode([topic_name])[0]
-        except Exception:
-            topic_embedding = None
-    
-    for chunk in chunks:
-        chunk_lower = chunk.lower()
+    # Cheap lexical and structural signals first, for every chunk
+    scores = []
+    for chunk in prepared_chunks:
+        chunk_lower = chunk.lower
         score = 0.0
         
         # Signal 1: Direct mentions (highest weight)
@@ -144,57 +476,51 @@ def retrieve_relevant_snippets(
             score += 15.0  # Strong signal for direct mention
         
         # Check synonym matches
-        for synonym in topic_synonyms:
-            if synonym.lower() in chunk_lower and synonym.lower() != topic_lower:
-                score += 5.0
+        score += _synonym_score(chunk_lower, synonym_weights, synonym_automaton)
         
         # Word overlap
-        chunk_words = set(chunk_lower.split())
-        overlap = len(topic_words & chunk_words)
+        overlap = len(topic_words & chunk.words)
         score += overlap * 2.0
         
-        # Signal 2: Semantic similarity (if embeddings available)
-        if topic_embedding is not None:
-            try:
-                chunk_embedding = embedding_model.encode([chunk[:500]])[0]  # Limit chunk size
-                # Cosine similarity
-                similarity = np.dot(topic_embedding, chunk_embedding) / (
-                    np.linalg.norm(topic_embedding) * np.linalg.norm(chunk_embedding)
-                )
-                # Add semantic similarity score (0-1 range, scale to 0-10)
-                score += similarity * 10.0
-            except Exception:
-                pass
-        
         # Signal 3: Structural importance
-        structural_boost = 0.0
-        if structured_slides:
-            # Find which slide this chunk comes from
-            for file_path, slides in structured_slides.items():
-                for slide in slides:
-                    slide_text = (slide.get("title", "") + " " + slide.get("body", "")).lower()
-                    if chunk_lower[:100] in slide_text or any(word in slide_text for word in chunk_lower.split()[:5]):
-                        # Check if in title
-                        if chunk_lower[:50] in slide.get("title", "").lower():
-                            structural_boost += 8.0  # Title = very important
-                        
-                        # Check if in learning objectives slide
-                        if slide.get("is_learning_objectives", False):
-                            structural_boost += 10.0  # Learning objectives = highest
-                        
-                        # Check if in key ideas/summary slide
-                        if slide.get("is_key_ideas", False):
-                            structural_boost += 7.0  # Summary = important
-                        
-                        # Check if in examples (look for keywords)
-                        if any(keyword in chunk_lower for keyword in ["example", "for instance", "consider", "suppose"]):
-                            structural_boost += 3.0  # Examples = moderately important
-                        break
-        
-        score += structural_boost
+        if structural_index:
+            score += _structural_lookup(chunk, structural_index)
         
-        if score > 0:
-            scored_chunks.append((score, chunk))
+        scores.append(score)
+    
+    # Signal 2: Semantic similarity (if embeddings available), only for chunks with some
+    # lexical signal. When too few have any, semantic-only matches can still fill the
+    # snippets: large uploads take the nearest chunks from their vector index, smaller
+    # ones have every chunk encoded.
+    embedding_model = _get_embedding_model()
+    if embedding_model and HAS_EMBEDDINGS and prepared_chunks:
+        candidates = [i for i, score in enumerate(scores) if score >= _SEMANTIC_MIN_LEXICAL_SCORE]
+        use_ann = HAS_FAISS and len(prepared_chunks) >= _ANN_MIN_CHUNKS
+        if not use_ann and len(candidates) < max_snippets * 2:
+            candidates = list(range(len(prepared_chunks)))
+        try:
+            # Unit-norm vectors, so cosine similarity for every chunk is one matrix-vector product
+            topic_embedding = np.ascontiguousarray(
+                embedding_model.encode([topic_name], normalize_embeddings=True)[0], dtype=np.float32
+            )
+            similarities: Dict[int, float] = {}
+            if use_ann:
+                ann_index = _get_ann_index(document_key, prepared_chunks, embedding_model)
+                distances, ids = ann_index.search(topic_embedding.reshape(1, -1), max_snippets * 4)
+                similarities.update(
+                    (int(i), float(similarity)) for i, similarity in zip(ids[0], distances[0]) if i >= 0
+                )
+            missing = [i for i in candidates if i not in similarities]
+            if missing:
+                matrix = _embed_chunks(embedding_model, [prepared_chunks[i] for i in missing])
+                similarities.update(zip(missing, (matrix @ topic_embedding).tolist()))
+            for i, similarity in similarities.items():
+                # Add semantic similarity score (0-1 range, scale to 0-10)
+                scores[i] += similarity * 10.0
+        except Exception:
+            pass
+    
+    scored_chunks = [(score, chunk) for score, chunk in zip(scores, prepared_chunks) if score > 0]
     
     # Sort by combined score and take top snippets
     scored_chunks.sort(key=lambda x: x[0], reverse=True)
@@ -203,10 +529,10 @@ def retrieve_relevant_snippets(
     snippets = []
     seen_texts = set()  # Avoid duplicates
     for score, chunk in scored_chunks[:max_snippets * 2]:  # Get more candidates
-        # Normalize chunk for deduplication
-        chunk_normalized = chunk.lower().strip()[:100]
+        # Normalize chunk for deduplication (chunks are already stripped)
+        chunk_normalized = chunk.lower[:100]
         if chunk_normalized not in seen_texts:
-            snippets.append(chunk)
+            snippets.append(chunk.text)
             seen_texts.add(chunk_normalized)
             if len(snippets) >= max_snippets:
                 break
@@ -223,17 +549,15 @@ def retrieve_co_occurrence_snippets(
     """
     Retrieve snippets where both topics appear together.
     """
-    all_text = "\n\n".join(text_dict.values())
-    sentences = re.split(r'[.!?]\s+', all_text)
+    _, document = _get_document_index(text_dict)
     
     topic1_lower = topic1.lower()
     topic2_lower = topic2.lower()
     
     relevant = []
-    for sentence in sentences:
-        sentence_lower = sentence.lower()
+    for sentence, sentence_lower in document.sentences:
         if topic1_lower in sentence_lower and topic2_lower in sentence_lower:
-            relevant.append(sentence.strip())
+            relevant.append(sentence)
     
     return relevant[:max_snippets]
 
@@ -0,0 +1,104 @@
+# services/semantic_cache.py
+"""
+Semantic response cache for tutor answers.
+A question that is close enough (cosine >= threshold) to one already answered in the
+same namespace - e.g. (intent, topic, uploaded materials) - gets the stored answer back.
+Without sentence-transformers it degrades to exact matching on the normalized question.
+"""
+
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional
+
+from services.rag_service import HAS_EMBEDDINGS, _get_embedding_model
+
+if HAS_EMBEDDINGS:
+    import numpy as np
+
+_WHITESPACE_RX = re.compile(r"\s+")
+
+
+def normalize_question(question: str) -> str:
+    """Lowercase, collapse whitespace and drop trailing punctuation."""
+    return _WHITESPACE_RX.sub(" ", question.lower()).strip().rstrip("?!. ")
+
+
+class SemanticCache:
+    """
+    Thread-safe cache of (namespace, question) -> response.
+    Each namespace keeps its own matrix of unit-norm question embeddings, so a lookup
+    is one matrix-vector product over that namespace's questions only.
+    """
+
+    def __init__(self, threshold: float = 0.92, max_namespaces: int = 256, max_per_namespace: int = 64):
+        self.threshold = threshold
+        self.max_namespaces = max_namespaces
+        self.max_per_namespace = max_per_namespace
+        self._lock = threading.Lock()
+        # namespace -> {"questions": [...], "responses": [...], "matrix": ndarray | None}
+        self._entries: "OrderedDict[Hashable, Dict[str, Any]]" = OrderedDict()
+
+    def _embed(self, question: str):
+        """Unit-norm embedding of a normalized question (None without embeddings)."""
+        if not HAS_EMBEDDINGS:
+            return None
+        model = _get_embedding_model()
+        if model is None:
+            return None
+        try:
+            return model.encode(question, normalize_embeddings=True).astype(np.float32)
+        except Exception:
+            return None
+
+    def lookup(self, namespace: Hashable, question: str) -> Optional[str]:
+        """Cached response for a question similar enough to one in this namespace."""
+        normalized = normalize_question(question)
+        with self._lock:
+            entry = self._entries.get(namespace)
+            if entry is None:
+                return None
+            self._entries.move_to_end(namespace)
+            if normalized in entry["questions"]:
+                return entry["responses"][entry["questions"].index(normalized)]
+            matrix = entry["matrix"]
+            responses = list(entry["responses"])
+        if matrix is None:
+            return None
+        query = self._embed(normalized)
+        if query is None:
+            return None
+        scores = matrix @ query
+        best = int(scores.argmax())
+        return responses[best] if scores[best] >= self.threshold else None
+
+    def add(self, namespace: Hashable, question: str, response: str) -> None:
+        """Store a fresh response (oldest entries are dropped beyond the caps)."""
+        normalized = normalize_question(question)
+        embedding = self._embed(normalized)
+        with self._lock:
+            entry = self._entries.setdefault(
+                namespace, {"questions": [], "responses": [], "matrix": None}
+            )
+            self._entries.move_to_end(namespace)
+            if normalized in entry["questions"]:
+                return
+            entry["questions"].append(normalized)
+            entry["responses"].append(response)
+            # Matrix rows stay aligned with questions; a failed embedding gets a zero row (never matches)
+            matrix = entry["matrix"]
+            if embedding is not None and matrix is None:
+                matrix = np.zeros((len(entry["questions"]) - 1, embedding.shape[0]), dtype=np.float32)
+            if matrix is not None:
+                row = embedding if embedding is not None else np.zeros(matrix.shape[1], dtype=np.float32)
+                entry["matrix"] = np.vstack([matrix, row.reshape(1, -1)])
+            if len(entry["questions"]) > self.max_per_namespace:
+                del entry["questions"][0], entry["responses"][0]
+                if entry["matrix"] is not None:
+                    entry["matrix"] = entry["matrix"][1:]
+            while len(self._entries) > self.max_namespaces:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
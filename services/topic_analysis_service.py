@@ -4,19 +4,51 @@ Use Mistral to intelligently extract big topics from documents.
 """
 
 import os
-from typing import List, Dict, Any
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import List, Dict, Any, Literal, Tuple
 
 from dotenv import load_dotenv
 from langchain_mistralai import ChatMistralAI
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.output_parsers import StrOutputParser
-import json
-import re
+from pydantic import BaseModel, Field
+
+# Token counting for the document budget; falls back to a UTF-8 byte estimate
+try:
+    import tiktoken
+    HAS_TIKTOKEN = True
+except ImportError:
+    HAS_TIKTOKEN = False
 
 load_dotenv()
 
 _analysis_chain = None
 
+# Document budget for topic extraction (about the old 8000-character cut for English text)
+_MAX_DOCUMENT_TOKENS = 2000
+_TRUNCATION_NOTE = "\n\n[... text truncated ...]"
+# Roughly four bytes of UTF-8 per token when no tokenizer is available
+_BYTES_PER_TOKEN = 4
+_tokenizer = None
+
+# Extracted topics by document hash, so re-analysing the same upload is free
+_TOPICS_CACHE_SIZE = 64
+_topics_cache: "OrderedDict[str, List[Dict[str, Any]]]" = OrderedDict()
+_topics_cache_lock = threading.Lock()
+
+
+class ExtractedTopic(BaseModel):
+    """One key topic, as returned by the model."""
+    name: str = Field(description="Short topic name")
+    importance: Literal["exam_critical", "core", "extra"]
+    reason: str = Field(default="", description="Brief reason for the importance")
+
+
+class ExtractedTopics(BaseModel):
+    """The document's 5-15 key topics, most important first."""
+    topics: List[ExtractedTopic]
+
 
 def _build_analysis_chain():
     """Build chain for smart topic extraction."""
@@ -42,7 +74,7 @@ def _build_analysis_chain():
                     "- Focus on major concepts that are important for the exam.\n"
                     "- Like ChatGPT would do - highlight key topics, not every tiny detail.\n"
                     "- For each topic, determine if it's: exam_critical, core, or extra.\n"
-                    "- Return a JSON list of topics with name, importance, and brief reason.\n"
+                    "- Give each topic a name, its importance, and a brief reason.\n"
                     "- Extract 5-15 main topics maximum. Focus on big concepts."
                 ),
             ),
@@ -51,8 +83,6 @@ def _build_analysis_chain():
                 (
                     "Extract the KEY topics from this document text:\n\n"
                     "{document_text}\n\n"
-                    "Return ONLY a JSON array like:\n"
-                    '[{{"name": "Topic Name", "importance": "exam_critical|core|extra", "reason": "brief reason"}}]\n'
                     "Extract 5-15 main topics maximum. Focus on big concepts, not every small detail. "
                     "Like ChatGPT would do - highlight the key topics students need to know."
                 ),
@@ -60,8 +90,9 @@ def _build_analysis_chain():
         ]
     )
 
-    parser = StrOutputParser()
-    return prompt | llm | parser
+    # Tool-calling structured output: the reply is validated into ExtractedTopics,
+    # so there is no JSON to fish out of free text
+    return prompt | llm.with_structured_output(ExtractedTopics)
 
 
 def _get_analysis_chain():
@@ -71,51 +102,91 @@ def _get_analysis_chain():
     return _analysis_chain
 
 
+def _get_tokenizer():
+    """cl100k_base encoding (None without tiktoken or if it can't be loaded)."""
+    global _tokenizer
+    if _tokenizer is None and HAS_TIKTOKEN:
+        try:
+            _tokenizer = tiktoken.get_encoding("cl100k_base")
+        except Exception:
+            return None
+    return _tokenizer
+
+
+def _head_within_budget(text: str, budget: int) -> Tuple[str, int]:
+    """Longest prefix of text within budget tokens, and the tokens it uses."""
+    tokenizer = _get_tokenizer()
+    if tokenizer is not None:
+        tokens = tokenizer.encode(text)
+        if len(tokens) <= budget:
+            return text, len(tokens)
+        return tokenizer.decode(tokens[:budget]), budget
+    data = text.encode("utf-8")
+    used = -(-len(data) // _BYTES_PER_TOKEN)
+    if used <= budget:
+        return text, used
+    return data[:budget * _BYTES_PER_TOKEN].decode("utf-8", errors="ignore"), budget
+
+
+def _document_text(text_dict: Dict[str, str], budget: int = _MAX_DOCUMENT_TOKENS) -> str:
+    """
+    Join the documents until the token budget is spent.
+    Stops at the first document that doesn't fit, so a large upload is never joined in full.
+    """
+    pieces = []
+    remaining = budget
+    for text in text_dict.values():
+        # Room for the "\n\n" separator
+        if pieces:
+            remaining = max(remaining - 1, 0)
+        head, used = _head_within_budget(text, remaining)
+        pieces.append(head)
+        remaining -= used
+        if len(head) < len(text):
+            return "\n\n".join(pieces) + _TRUNCATION_NOTE
+    return "\n\n".join(pieces)
+
+
 def extract_topics_with_mistral(text_dict: Dict[str, str]) -> List[Dict[str, Any]]:
     """
     Use Mistral to intelligently extract big topics.
     Returns list of topics with name, importance, reason, and score.
     """
-    # Combine all text (limit to avoid token limits)
-    all_text = "\n\n".join(text_dict.values())
-    
-    # Truncate if too long (keep first 8000 chars for context)
-    if len(all_text) > 8000:
-        all_text = all_text[:8000] + "\n\n[... text truncated ...]"
+    # Combine all text, truncated to the token budget
+    all_text = _document_text(text_dict)
     
     if not all_text.strip():
         return []
     
+    cache_key = hashlib.sha256(all_text.encode("utf-8")).hexdigest()
+    with _topics_cache_lock:
+        cached = _topics_cache.get(cache_key)
+        if cached is not None:
+            _topics_cache.move_to_end(cache_key)
+            return [dict(topic) for topic in cached]
+    
     try:
         chain = _get_analysis_chain()
-        response = chain.invoke({"document_text": all_text})
+        extracted = chain.invoke({"document_text": all_text})
+        
+        # Convert to our format
+        score_map = {"exam_critical": 20.0, "core": 10.0, "extra": 5.0}
+        topics = []
+        for i, topic in enumerate(extracted.topics if extracted else []):
+            topics.append({
+                "name": topic.name or f"Topic {i+1}",
+                "importance": topic.importance,
+                # Calculate score based on importance
+                "score": score_map[topic.importance] - (i * 0.5),  # Slight penalty for later topics
+                "reason": topic.reason,
+            })
         
-        # Try to extract JSON from response
-        # Look for JSON array in the response
-        json_match = re.search(r'\[.*\]', response, re.DOTALL)
-        if json_match:
-            topics_json = json.loads(json_match.group())
-            
-            # Convert to our format
-            topics = []
-            for i, topic in enumerate(topics_json):
-                if isinstance(topic, dict):
-                    importance = topic.get("importance", "extra")
-                    # Calculate score based on importance
-                    score_map = {"exam_critical": 20.0, "core": 10.0, "extra": 5.0}
-                    score = score_map.get(importance, 5.0) - (i * 0.5)  # Slight penalty for later topics
-                    
-                    topics.append({
-                        "name": topic.get("name", f"Topic {i+1}"),
-                        "importance": importance,
-                        "score": score,
-                        "reason": topic.get("reason", ""),
-                    })
-            
-            return topics
-        else:
-            # Fallback: try to parse as plain text
-            return []
+        if topics:
+            with _topics_cache_lock:
+                _topics_cache[cache_key] = [dict(topic) for topic in topics]
+                while len(_topics_cache) > _TOPICS_CACHE_SIZE:
+                    _topics_cache.popitem(last=False)
+        return topics
     except Exception as e:
         print(f"Error in Mistral topic extraction: {e}")
         return []
@@ -0,0 +1,45 @@
+# tests/test_combined_response.py
+"""
+Reading the combined evaluate+revise reply (blocking and streaming).
+"""
+from services import evaluation_service
+from services.evaluation_service import _REVISION_END, _REVISION_START, _parse_combined_response
+
+DRAFT = "Draft answer."
+REVISED = (
+    "In Python the prompt looks like this:\n\n"
+    ">>> sorted([3, 1, 2])\n"
+    "[1, 2, 3]\n\n"
+    "and `x >>> 2` shifts bits in JavaScript, while `a <<< b` is Verilog."
+)
+REPLY = f"{_REVISION_START}\n{REVISED}\n{_REVISION_END}"
+
+
+class _FakeChain:
+    def __init__(self, reply: str, chunk_size: int):
+        self.reply = reply
+        self.chunk_size = chunk_size
+
+    def stream(self, inputs):
+        for i in range(0, len(self.reply), self.chunk_size):
+            yield self.reply[i:i + self.chunk_size]
+
+
+def test_ok_keeps_the_draft():
+    assert _parse_combined_response("OK", DRAFT) == DRAFT
+
+
+def test_revision_containing_angle_brackets_is_kept_whole():
+    assert _parse_combined_response(REPLY, DRAFT) == REVISED
+
+
+def test_unreadable_reply_is_none():
+    assert _parse_combined_response("Scores: 3/5", DRAFT) is None
+
+
+def test_streamed_revision_containing_angle_brackets_is_kept_whole(monkeypatch):
+    for chunk_size in (1, 3, 7, len(REPLY)):
+        evaluation_service._result_cache.clear()
+        monkeypatch.setattr(evaluation_service, "_get_combined_chain", lambda _type: _FakeChain(REPLY, chunk_size))
+        streamed = "".join(evaluation_service._evaluate_and_revise_stream("edge", {"n": chunk_size}, DRAFT, "notes"))
+        assert streamed.strip() == REVISED
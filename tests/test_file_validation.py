@@ -0,0 +1,48 @@
+# tests/test_file_validation.py
+"""
+Upload validation once the total size budget is used up exactly.
+"""
+import os
+import tempfile
+
+from utils.file_validation import MAX_FILE_SIZE_BYTES, MAX_TOTAL_SIZE_BYTES, MAX_TOTAL_SIZE_MB, validate_files
+
+
+def _make_file(directory: str, name: str, size: int) -> str:
+    path = os.path.join(directory, name)
+    with open(path, "wb") as f:
+        f.truncate(size)  # Sparse, so the test doesn't write 200 MB
+    return path
+
+
+def test_files_after_a_full_budget_keep_their_own_errors():
+    with tempfile.TemporaryDirectory() as directory:
+        full = [
+            _make_file(directory, f"full{i}.pdf", MAX_FILE_SIZE_BYTES)
+            for i in range(MAX_TOTAL_SIZE_BYTES // MAX_FILE_SIZE_BYTES)
+        ]
+        missing = os.path.join(directory, "missing.pdf")
+        empty = _make_file(directory, "empty.pdf", 0)
+        extra = _make_file(directory, "extra.pdf", 1)
+
+        is_valid, valid_files, error_msg = validate_files(full + [missing, empty, extra])
+
+    assert is_valid
+    assert valid_files == full
+    assert "missing.pdf: File not found" in error_msg
+    assert "empty.pdf: File is empty" in error_msg
+    assert f"extra.pdf: Total size would exceed {MAX_TOTAL_SIZE_MB} MB limit" in error_msg
+    assert "missing.pdf: Total size" not in error_msg
+    assert "empty.pdf: Total size" not in error_msg
+
+
+def test_files_in_later_stat_batches_are_checked():
+    with tempfile.TemporaryDirectory() as directory:
+        paths = [_make_file(directory, f"small{i}.pdf", 10) for i in range(20)]
+        paths.append(os.path.join(directory, "missing.pdf"))
+
+        is_valid, valid_files, error_msg = validate_files(paths)
+
+    assert is_valid
+    assert valid_files == paths[:-1]
+    assert error_msg == "Some files were skipped: missing.pdf: File not found"
@@ -0,0 +1,69 @@
+# tests/test_quick_topic_gate.py
+"""
+The cheap classifier must recognise the importance labels the app actually sends.
+"""
+import pytest
+
+from services.evaluation_service import _cheap_classify, _gate_importance, passes_quick_topic_gate
+
+# components/topic_chat.py _infer_importance_label
+TOPIC_CHAT_LABELS = {
+    "exam-critical topic that will almost certainly appear in the exam": "exam_critical",
+    "core concept that is important for the exam": "core",
+    "extra / nice-to-have topic that is less likely to be examined": "extra",
+    "general topic": "general",
+}
+# services/dashboard_chat_service.py _importance_label and the practice-question routes
+DASHBOARD_LABELS = {
+    "exam_critical topic": "exam_critical",
+    "core topic": "core",
+    "extra topic": "extra",
+    "general topic": "general",
+}
+
+SNIPPETS = [
+    "Backpropagation computes gradients layer by layer using the chain rule.",
+    "Gradient descent updates weights using the computed gradients and a learning rate.",
+]
+
+
+def _tutor_answer(sentences: int) -> str:
+    """A grounded answer in the progressive tutor format (paragraph + summary + question)."""
+    paragraph = " ".join(
+        "Backpropagation uses the chain rule to compute gradients for every layer, "
+        "and gradient descent then updates the weights with a learning rate."
+        for _ in range(sentences)
+    )
+    return (
+        f"{paragraph}\n\n"
+        "In summary: gradients flow backwards through the layers. The weights then move against them.\n\n"
+        "Would you like to continue learning about this topic, or do you want to understand this part better before moving on?"
+    )
+
+
+@pytest.mark.parametrize("label, expected", [*TOPIC_CHAT_LABELS.items(), *DASHBOARD_LABELS.items()])
+def test_gate_importance_maps_real_labels(label, expected):
+    assert _gate_importance(label) == expected
+
+
+@pytest.mark.parametrize("label", [*TOPIC_CHAT_LABELS, *DASHBOARD_LABELS])
+@pytest.mark.parametrize("sentences", [3, 4])
+def test_compliant_tutor_answer_passes(label, sentences):
+    needs_revision, confidence, _ = _cheap_classify(_tutor_answer(sentences), SNIPPETS, label)
+    assert not needs_revision
+    assert confidence >= 0.8
+    assert passes_quick_topic_gate(_tutor_answer(sentences), SNIPPETS, label)
+
+
+@pytest.mark.parametrize("label", [*TOPIC_CHAT_LABELS, *DASHBOARD_LABELS])
+def test_one_line_answer_is_far_too_short(label):
+    needs_revision, confidence, notes = _cheap_classify("Backpropagation uses gradients.", SNIPPETS, label)
+    assert needs_revision and confidence >= 0.8
+    assert "Far too short" in notes and "a exam" not in notes
+
+
+def test_exam_critical_labels_share_a_range():
+    answer = _tutor_answer(1)
+    assert _cheap_classify(answer, SNIPPETS, "exam-critical topic that will almost certainly appear in the exam") == (
+        _cheap_classify(answer, SNIPPETS, "exam_critical topic")
+    )
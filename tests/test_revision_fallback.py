@@ -0,0 +1,66 @@
+# tests/test_revision_fallback.py
+"""
+A streamed revision that fails falls back to the draft, even after part of it was shown.
+"""
+import pytest
+
+from services import edge_tutor_service, mistral_service
+from services.evaluation_service import RevisionInterrupted
+
+DRAFT = "The full draft answer."
+
+
+def _failing_revision(chunks_before_failure: int):
+    def stream(**kwargs):
+        for i in range(chunks_before_failure):
+            yield f"Revised part {i}. "
+        raise RuntimeError("connection reset")
+    return stream
+
+
+class _FakeEdgeChain:
+    def invoke(self, inputs):
+        return DRAFT
+
+
+def _topic_stream(question: str):
+    return mistral_service.perfect_topic_answer_stream("Topic", "core topic", question, DRAFT)
+
+
+def _edge_stream(question: str):
+    return edge_tutor_service.explain_topic_connection_stream("Topic A", "Topic B", question, [])
+
+
+def _patch_revision(monkeypatch, chunks_before_failure: int):
+    monkeypatch.setattr(
+        mistral_service, "evaluate_and_revise_topic_response_stream", _failing_revision(chunks_before_failure)
+    )
+    monkeypatch.setattr(
+        edge_tutor_service, "evaluate_and_revise_edge_response_stream", _failing_revision(chunks_before_failure)
+    )
+    monkeypatch.setattr(edge_tutor_service, "_get_edge_chain", lambda: _FakeEdgeChain())
+    monkeypatch.setattr(edge_tutor_service, "_shown_before_review", lambda *args: False)
+
+
+@pytest.mark.parametrize("make_stream", [_topic_stream, _edge_stream])
+def test_failure_before_any_chunk_yields_the_draft(monkeypatch, make_stream):
+    _patch_revision(monkeypatch, 0)
+    assert "".join(make_stream(f"{make_stream.__name__} before")) == DRAFT
+
+
+@pytest.mark.parametrize("make_stream", [_topic_stream, _edge_stream])
+def test_failure_partway_hands_back_the_draft(monkeypatch, make_stream):
+    _patch_revision(monkeypatch, 2)
+    shown = []
+    with pytest.raises(RevisionInterrupted) as excinfo:
+        for chunk in make_stream(f"{make_stream.__name__} partway"):
+            shown.append(chunk)
+    assert shown == ["Revised part 0. ", "Revised part 1. "]
+    assert excinfo.value.draft == DRAFT
+
+
+def test_partial_revision_is_not_remembered(monkeypatch):
+    _patch_revision(monkeypatch, 2)
+    with pytest.raises(RevisionInterrupted):
+        list(_topic_stream("remembered"))
+    assert mistral_service._reviewed_draft(DRAFT) is None
@@ -0,0 +1,28 @@
+# utils/chat_keys.py
+"""
+Index of the session-state keys that hold chat state.
+Lets reset / snapshot code touch only chat keys instead of scanning all of session state.
+"""
+import streamlit as st
+from typing import Set
+
+_INDEX_KEY = "_chat_keys"
+
+
+def register_chat_keys(*keys: str) -> None:
+    """Record session-state keys that belong to a chat (history or its tracking flags)."""
+    if _INDEX_KEY not in st.session_state:
+        st.session_state[_INDEX_KEY] = set()
+    st.session_state[_INDEX_KEY].update(keys)
+
+
+def get_chat_keys() -> Set[str]:
+    """All registered chat keys (some may no longer be present in session state)."""
+    return st.session_state.get(_INDEX_KEY, set())
+
+
+def clear_chat_keys() -> None:
+    """Drop every registered chat key from session state and reset the index."""
+    for key in get_chat_keys():
+        st.session_state.pop(key, None)
+    st.session_state[_INDEX_KEY] = set()
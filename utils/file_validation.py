@@ -3,8 +3,12 @@
 File validation utilities.
 """
 
+import functools
 import os
-from typing import Tuple, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Tuple, List, Optional, Union
+
+from utils._statx import fast_size
 
 # Maximum file size: 50 MB
 MAX_FILE_SIZE_MB = 50
@@ -14,17 +18,15 @@ MAX_FILE_SIZE_BYTES = MAX_FILE_SIZE_MB * 1024 * 1024
 MAX_TOTAL_SIZE_MB = 200
 MAX_TOTAL_SIZE_BYTES = MAX_TOTAL_SIZE_MB * 1024 * 1024
 
+# Threads used to stat a batch of uploads concurrently
+_STAT_WORKERS = 8
 
-def validate_file_size(file_path: str) -> Tuple[bool, Optional[str]]:
+
+def _check_size(file_size: int) -> Tuple[bool, Optional[str]]:
     """
-    Validate file size.
+    Validate a file size in bytes.
     Returns (is_valid, error_message)
     """
-    if not os.path.exists(file_path):
-        return False, "File does not exist"
-    
-    file_size = os.path.getsize(file_path)
-    
     if file_size == 0:
         return False, "File is empty"
     
@@ -35,37 +37,88 @@ def validate_file_size(file_path: str) -> Tuple[bool, Optional[str]]:
     return True, None
 
 
-def validate_files(file_paths: List[str]) -> Tuple[bool, List[str], Optional[str]]:
+def validate_file_size(file_path: str) -> Tuple[bool, Optional[str]]:
     """
-    Validate multiple files.
-    Returns (is_valid, valid_files, error_message)
+    Validate file size.
+    Returns (is_valid, error_message)
+    """
+    try:
+        file_size = fast_size(file_path)
+    except OSError:
+        return False, "File does not exist"
+    
+    return _check_size(file_size)
+
+
+def _file_size(file: Union[str, os.DirEntry]) -> Optional[int]:
+    """
+    Size in bytes from a single stat (None if the file is gone).
+    A DirEntry reuses the stat cached from its directory scan.
+    """
+    try:
+        if isinstance(file, os.DirEntry):
+            return file.stat(follow_symlinks=False).st_size
+        return fast_size(file)
+    except OSError:
+        return None
+
+
+@functools.lru_cache(maxsize=1)
+def _get_stat_pool() -> ThreadPoolExecutor:
+    """Shared pool for batch stats (stat releases the GIL, so slow mounts overlap)."""
+    return ThreadPoolExecutor(max_workers=_STAT_WORKERS, thread_name_prefix="file-stat")
+
+
+def _file_name(file_path: str) -> str:
+    """Last path component for error messages (os.path.basename where there are two separators)."""
+    if os.altsep:
+        return os.path.basename(file_path)
+    return file_path[file_path.rfind(os.sep) + 1:]
+
+
+def _total_exceeded_error(file_path: str) -> str:
+    """Error for a file that no longer fits in the total size budget."""
+    return f"{_file_name(file_path)}: Total size would exceed {MAX_TOTAL_SIZE_MB} MB limit"
+
+
+def validate_files(file_paths: List[Union[str, os.DirEntry]]) -> Tuple[bool, List[str], Optional[str]]:
+    """
+    Validate multiple files (paths, or DirEntry objects from os.scandir).
+    Returns (is_valid, valid_files, error_message); valid_files are paths.
     """
     valid_files = []
     errors = []
-    total_size = 0
+    remaining_budget = MAX_TOTAL_SIZE_BYTES
     
-    for file_path in file_paths:
-        if not os.path.exists(file_path):
-            errors.append(f"{os.path.basename(file_path)}: File not found")
-            continue
+    # One stat per file (existence and size together), issued concurrently a batch at a
+    # time; the size checks stay sequential since the running total depends on order
+    for start in range(0, len(file_paths), _STAT_WORKERS):
+        batch = file_paths[start:start + _STAT_WORKERS]
+        if len(batch) > 1:
+            file_sizes = list(_get_stat_pool().map(_file_size, batch))
+        else:
+            file_sizes = [_file_size(file) for file in batch]
         
-        # Check individual file size
-        is_valid, error = validate_file_size(file_path)
-        if not is_valid:
-            errors.append(f"{os.path.basename(file_path)}: {error}")
-            continue
-        
-        file_size = os.path.getsize(file_path)
-        
-        # Check total size
-        if total_size + file_size > MAX_TOTAL_SIZE_BYTES:
-            errors.append(
-                f"{os.path.basename(file_path)}: Total size would exceed {MAX_TOTAL_SIZE_MB} MB limit"
-            )
-            continue
-        
-        valid_files.append(file_path)
-        total_size += file_size
+        for file, file_size in zip(batch, file_sizes):
+            file_path = os.fspath(file)
+            
+            if file_size is None:
+                errors.append(f"{_file_name(file_path)}: File not found")
+                continue
+            
+            # Check individual file size
+            is_valid, error = _check_size(file_size)
+            if not is_valid:
+                errors.append(f"{_file_name(file_path)}: {error}")
+                continue
+            
+            # Check total size
+            if file_size > remaining_budget:
+                errors.append(_total_exceeded_error(file_path))
+                continue
+            
+            valid_files.append(file_path)
+            remaining_budget -= file_size
     
     if not valid_files:
         error_msg = "No valid files found. " + "; ".join(errors) if errors else "No files provided"
@@ -78,5 +131,10 @@ def validate_files(file_paths: List[str]) -> Tuple[bool, List[str], Optional[str
     return True, valid_files, None
 
 
-
-
+def validate_files_from_entries(entries: Iterable[os.DirEntry]) -> Tuple[bool, List[str], Optional[str]]:
+    """
+    validate_files for a directory listing (e.g. os.scandir(uploads_dir)): sizes come from
+    each entry's cached stat instead of a new lookup by path.
+    Returns (is_valid, valid_files, error_message)
+    """
+    return validate_files(list(entries))
@@ -4,51 +4,105 @@ Simple utility to safely render markdown content that might contain regex patter
 Renders as HTML to completely bypass Streamlit's markdown parser.
 """
 import streamlit as st
-import html
+import functools
 import re
 
+# Same output as html.escape(text, quote=True), in a single pass
+_HTML_ESCAPES = str.maketrans({
+    '&': '&amp;',
+    '<': '&lt;',
+    '>': '&gt;',
+    '"': '&quot;',
+    "'": '&#x27;',
+})
 
-def safe_markdown(text: str) -> None:
+# Inline markdown patterns as one alternation, run once over the whole message.
+# No pattern crosses a line break, so this matches converting line by line.
+# Groups: 1 bold **text** (tried before italic), 2 italic *text* (but not part of **),
+# 3 code `text`, 4/5 link [text](url). The italic body can't contain *, so it is greedy:
+# it runs straight to the next * instead of re-trying the closing \*(?!\*) per character
+_MARKDOWN_INLINE = re.compile(
+    r'\*\*([^*\n]+)\*\*'
+    r'|(?<!\*)\*([^*\n]+)\*(?!\*)'
+    r'|`([^`\n]+)`'
+    r'|\[([^\]\n]+)\]\(([^\)\n]+)\)'
+)
+
+
+def _inline_to_html(match: "re.Match") -> str:
+    """Replacement for one _MARKDOWN_INLINE match; text inside bold, italic and links is formatted too."""
+    group = match.lastindex
+    if group == 1:
+        return f'<strong>{_MARKDOWN_INLINE.sub(_inline_to_html, match.group(1))}</strong>'
+    if group == 2:
+        return f'<em>{_MARKDOWN_INLINE.sub(_inline_to_html, match.group(2))}</em>'
+    if group == 3:
+        return f'<code>{match.group(3)}</code>'
+    text = _MARKDOWN_INLINE.sub(_inline_to_html, match.group(4))
+    return f'<a href="{match.group(5)}" target="_blank" rel="noopener">{text}</a>'
+
+
+def markdown_to_html(text: str) -> str:
     """
-    Safely render markdown by converting to HTML and bypassing Streamlit's parser.
-    This prevents JavaScript regex errors in the browser.
+    Convert the small markdown subset used in chat messages to escaped HTML.
+    Pure function, so callers can cache its output.
     """
-    if not text:
-        return
-    
     # Convert markdown to HTML manually to bypass Streamlit's markdown parser
-    # Process line by line to handle bullet points correctly
-    lines = text.split('\n')
+    # Escape HTML first, then convert inline markdown - both over the whole text at once
+    escaped = text.translate(_HTML_ESCAPES)
+    # Every inline pattern needs one of * ` [ - plain text skips the regex
+    if '*' in escaped or '`' in escaped or '[' in escaped:
+        escaped = _MARKDOWN_INLINE.sub(_inline_to_html, escaped)
+    
+    # Wrap line by line to handle bullet points correctly
+    # (inline HTML never starts with - or •, so bullets are still recognized)
     html_lines = []
+    # Bound once, outside the per-line loop
+    append = html_lines.append
+    # Consecutive bullet points share one <ul>
+    in_list = False
     
-    for line in lines:
-        if not line.strip():
-            html_lines.append('<br>')
-            continue
-            
-        # Escape HTML first
-        escaped_line = html.escape(line)
-        
-        # Convert markdown patterns to HTML
-        # Bold **text** - must come before italic
-        escaped_line = re.sub(r'\*\*([^*]+)\*\*', r'<strong>\1</strong>', escaped_line)
-        # Italic *text* (but not if it's part of **)
-        escaped_line = re.sub(r'(?<!\*)\*([^*\n]+?)\*(?!\*)', r'<em>\1</em>', escaped_line)
-        # Code `text`
-        escaped_line = re.sub(r'`([^`]+)`', r'<code>\1</code>', escaped_line)
-        # Links [text](url)
-        escaped_line = re.sub(r'\[([^\]]+)\]\(([^\)]+)\)', r'<a href="\2" target="_blank" rel="noopener">\1</a>', escaped_line)
+    for line in escaped.split('\n'):
+        stripped = line.strip()
+        is_bullet = stripped[:1] in ('-', '•')
+        if is_bullet != in_list:
+            append('<ul>' if is_bullet else '</ul>')
+            in_list = is_bullet
         
-        # Handle bullet points (- or •)
-        if line.strip().startswith('-') or line.strip().startswith('•'):
-            escaped_line = escaped_line.lstrip('-•').lstrip()
-            html_lines.append(f'<li>{escaped_line}</li>')
+        if not stripped:
+            append('<br>')
+        elif is_bullet:
+            # Handle bullet points (- or •)
+            # (tags and text appended as separate pieces - the final join copies them once)
+            append('<li>')
+            append(line.lstrip('-•').lstrip())
+            append('</li>')
         else:
-            html_lines.append(f'<div>{escaped_line}</div>')
+            append('<div>')
+            append(line)
+            append('</div>')
+    
+    if in_list:
+        append('</ul>')
     
     # Wrap in container
-    html_text = '<div style="line-height: 1.6;">' + ''.join(html_lines) + '</div>'
+    return '<div style="line-height: 1.6;">' + ''.join(html_lines) + '</div>'
+
+
+# Chat history is re-rendered on every Streamlit rerun, so unchanged messages hit this
+_cached_markdown_to_html = functools.lru_cache(maxsize=256)(markdown_to_html)
+
+
+def safe_markdown(text: str, cache: bool = True) -> None:
+    """
+    Safely render markdown by converting to HTML and bypassing Streamlit's parser.
+    This prevents JavaScript regex errors in the browser.
+    Pass cache=False for partial text (e.g. mid-stream) that won't be shown again.
+    """
+    if not text:
+        return
     
     # Render as HTML to completely bypass markdown parsing
+    html_text = _cached_markdown_to_html(text) if cache else markdown_to_html(text)
     st.markdown(html_text, unsafe_allow_html=True)
 